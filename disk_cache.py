@@ -0,0 +1,122 @@
+"""
+A directory of cache entries with a size budget, shared between processes.
+
+text_cache and svg_assets keep what they parse in such a directory: one
+file per key, named by a hash of the key, written atomically so readers
+in other processes never see half an entry. Each subclass decides what an
+entry holds and how it is read and written (get and put); this module only
+knows files, their sizes and their ages. Loaded entries are also kept in
+memory, up to a number of them per process.
+"""
+
+import hashlib
+import importlib.metadata
+import os
+import threading
+from collections import OrderedDict
+
+# Entries kept loaded in memory by each process
+MAX_LOADED = 512
+
+# Eviction frees the cache down to this share of its budget, so the next
+# rescan waits until that much has been written again
+EVICTION_TARGET = 0.8
+
+try:
+    MANIM_VERSION = importlib.metadata.version("manim")
+except importlib.metadata.PackageNotFoundError:
+    MANIM_VERSION = "unknown"
+
+
+class DiskCache:
+    """
+    Directory of cache entries, one file per key, evicted least recently used first.
+
+    Every hit is expected to bump the entry's modification time, which gives
+    the least recently used order for eviction. The directory is scanned
+    once per process for its size, which is then kept up to date with this
+    process's writes; only when that count goes over the budget is the
+    directory rescanned and shrunk to EVICTION_TARGET of it.
+    """
+
+    suffix = ".bin"
+
+    def __init__(self, root, budget, max_loaded=MAX_LOADED):
+        self.root = root
+        self.budget = budget
+        self.max_loaded = max_loaded
+        self.loaded = OrderedDict()
+        self.size = None
+        self.lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+
+    def path(self, key):
+        return os.path.join(self.root, hashlib.sha256(key.encode()).hexdigest() + self.suffix)
+
+    def recall(self, key):
+        """An entry this process loaded before, or None."""
+        with self.lock:
+            value = self.loaded.get(key)
+            if value is not None:
+                self.loaded.move_to_end(key)
+            return value
+
+    def remember(self, key, value):
+        """Keep a loaded entry in memory, dropping the least recently used ones."""
+        with self.lock:
+            self.loaded[key] = value
+            while len(self.loaded) > self.max_loaded:
+                self.loaded.popitem(last=False)
+
+    def write(self, key, save):
+        """Write an entry through save(file) to a temporary file and rename it into place."""
+        path = self.path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                save(f)
+            os.replace(tmp_path, path)
+            written = os.path.getsize(path)
+        except OSError:
+            return  # A read-only or full cache only costs speed
+        with self.lock:
+            if self.size is None:
+                self.size = self.scan()[1]
+            else:
+                self.size += written
+            over_budget = self.size > self.budget
+        if over_budget:
+            self.evict(self.budget * EVICTION_TARGET)
+
+    def scan(self):
+        """
+        List the entries in the cache directory.
+
+        Returns:
+            tuple: (mtime, size, path) of every entry, and their total size
+        """
+        entries = []
+        with os.scandir(self.root) as scan:
+            for entry in scan:
+                if entry.name.endswith(self.suffix):
+                    try:
+                        stat = entry.stat()
+                    except OSError:
+                        continue
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+        return entries, sum(size for _, size, _ in entries)
+
+    def evict(self, target=None):
+        """Delete the least recently used entries until at most target bytes (default: the budget) remain."""
+        target = self.budget if target is None else target
+        entries, total = self.scan()
+        for _, size, path in sorted(entries):
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            total -= size
+        with self.lock:
+            self.size = total
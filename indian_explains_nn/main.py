@@ -1,25 +1,26 @@
 # ruff: noqa
 from manim import *
+from text_cache import Text
+from svg_assets import LazySVG
+
+STYLE = dict(stroke_width=2, fill_opacity=0.7)
 
 # NEW: A mixin class to handle loading and styling of all SVG assets
 class NNMediaMixin:
+    # Each SVG is parsed once (and cached on disk) and only when a scene first uses it
+    complex_nn = LazySVG(r"media/excalidraw_exports/complex_nn.svg", scale=3, **STYLE)
+    simple_nn = LazySVG(r"media/excalidraw_exports/simple_nn.svg", scale=3, **STYLE)
+    simplest_nn = LazySVG(r"media/excalidraw_exports/simplest_nn.svg", **STYLE)
+    big_hidden_node = LazySVG(r"media/excalidraw_exports/big_hidden_node.svg", scale=2.5, **STYLE)
+    black_dot = LazySVG(r"media/excalidraw_exports/black_dot.svg", **STYLE)
+    hidden_node = LazySVG(r"media/excalidraw_exports/hidden_node.svg", **STYLE)
+    input_node = LazySVG(r"media/excalidraw_exports/input_node.svg", **STYLE)
+    output_node = LazySVG(r"media/excalidraw_exports/output_node.svg", **STYLE)
+    white_dot = LazySVG(r"media/excalidraw_exports/white_dot.svg", **STYLE)
+
     def setup_svgs(self):
-        """Loads, scales, and styles all SVG mobjects for the scenes."""
-        self.complex_nn = SVGMobject(r"media/excalidraw_exports/complex_nn.svg").scale(3)
-        self.simple_nn = SVGMobject(r"media/excalidraw_exports/simple_nn.svg").scale(3)
-        self.simplest_nn = SVGMobject(r"media/excalidraw_exports/simplest_nn.svg")
-        self.big_hidden_node = SVGMobject(r"media/excalidraw_exports/big_hidden_node.svg").scale(2.5)
-        self.black_dot = SVGMobject(r"media/excalidraw_exports/black_dot.svg")
-        self.hidden_node = SVGMobject(r"media/excalidraw_exports/hidden_node.svg")
-        self.input_node = SVGMobject(r"media/excalidraw_exports/input_node.svg")
-        self.output_node = SVGMobject(r"media/excalidraw_exports/output_node.svg")
-        self.white_dot = SVGMobject(r"media/excalidraw_exports/white_dot.svg")
-
-        # Style all the mobjects in one go
-        for mob in [self.complex_nn, self.simple_nn, self.simplest_nn, self.big_hidden_node, 
-                    self.black_dot, self.hidden_node, self.input_node, self.output_node, self.white_dot]:
-            mob.set_stroke(width=2)
-            mob.set_fill(opacity=0.7)
+        """Starts the scene with fresh copies of the SVG mobjects, loaded on first access."""
+        LazySVG.forget(self)
 
 
 
@@ -0,0 +1,22 @@
+"""
+The batch renderer behind manim_batch_renderer.py, one module per concern:
+
+    discovery     finding scene files and their Scene classes
+    planning      jobs, duration estimates, scheduling, chunks and stills
+    state         fingerprints, the render cache and the run journal
+    catalog       the SQLite catalog of past outputs
+    processes     one manim process per scene, under resource limits
+    warm          warm workers that import manim once
+    segments      private partial movie directories and the shared segment store
+    tex           the batched LaTeX prepass
+    media         probing, stitching and assembling videos with ffmpeg
+    render        the render loop, --watch and --promote
+    render_queue  the SQLite queue of a render farm
+    farm          farm coordinator and workers
+    events        the JSON lines event stream
+    dry_run, profiling, benchmark
+                  measuring scenes instead of (only) rendering them
+
+Nothing here imports manim at module level; manim is imported where a
+scene is actually run.
+"""
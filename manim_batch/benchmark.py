@@ -0,0 +1,265 @@
+"""
+Timing a fixed set of representative scenes against a stored baseline.
+"""
+import os
+import shutil
+import tempfile
+import time
+import traceback
+import contextlib
+
+from .discovery import expand_scene_paths, find_project_root
+from .planning import plan_jobs, quality_to_flag
+from .state import DEFAULT_STATE_DIR, installed_manim_version, load_state_file, save_state_file
+from .warm import WarmWorker, redirect_output, scene_environment
+
+@contextlib.contextmanager
+def timed_internals():
+    """
+    Time manim's rasterization and encoding while the block runs.
+
+    Wraps Camera.capture_mobjects, the file writer's encoder thread and the
+    methods the scene blocks on while frames are written, and restores them
+    afterwards.
+
+    Yields:
+        dict: Running 'rasterize', 'encode' and 'writer' seconds and the
+            number of 'frames' written
+    """
+    from manim.camera.camera import Camera
+    from manim.scene.scene_file_writer import SceneFileWriter
+
+    timers = {"rasterize": 0.0, "encode": 0.0, "writer": 0.0, "frames": 0}
+
+    def timed(method, *names):
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                for name in names:
+                    timers[name] += time.perf_counter() - start
+        return wrapper
+
+    def counted(method):
+        def wrapper(self, frame, num_frames=1):
+            timers["frames"] += num_frames
+            return method(self, frame, num_frames)
+        return wrapper
+
+    patches = {
+        (Camera, "capture_mobjects"): lambda m: timed(m, "rasterize"),
+        # Runs on the writer's encoder thread
+        (SceneFileWriter, "encode_and_write_frame"): lambda m: timed(m, "encode"),
+        (SceneFileWriter, "combine_to_movie"): lambda m: timed(m, "encode", "writer"),
+        (SceneFileWriter, "write_frame"): lambda m: timed(counted(m), "writer"),
+        (SceneFileWriter, "open_partial_movie_stream"): lambda m: timed(m, "writer"),
+        (SceneFileWriter, "close_partial_movie_stream"): lambda m: timed(m, "writer"),
+    }
+    originals = {target: getattr(*target) for target in patches}
+    for (cls, name), wrap in patches.items():
+        setattr(cls, name, wrap(originals[cls, name]))
+    try:
+        yield timers
+    finally:
+        for (cls, name), method in originals.items():
+            setattr(cls, name, method)
+
+def benchmark_in_process(job, output_dir, log_path=None):
+    """
+    Render a scene for real and measure where its time goes.
+
+    manim's caching is turned off so every animation is rendered. Time is
+    split with timed_internals into the camera's rasterization, encoding,
+    and the time the scene spends blocked on the file writer. Whatever is
+    left is spent in construct() itself: building mobjects, updaters and
+    interpolation.
+
+    Args:
+        job (dict): Render job from plan_jobs
+        output_dir (str): Directory to save output files
+        log_path (str, optional): File that receives manim's output
+
+    Returns:
+        dict: 'returncode', and on success 'metrics' with total, construct,
+            rasterize and encode seconds, frames and frames per second
+    """
+    with redirect_output(log_path):
+        try:
+            with scene_environment(job, output_dir) as scene_class:
+                from manim import config
+
+                config.disable_caching = True
+                with timed_internals() as timers:
+                    start = time.perf_counter()
+                    scene_class().render()
+                    total = time.perf_counter() - start
+
+            metrics = {
+                "total_seconds": round(total, 3),
+                "construct_seconds": round(total - timers["rasterize"] - timers["writer"], 3),
+                "rasterize_seconds": round(timers["rasterize"], 3),
+                "encode_seconds": round(timers["encode"], 3),
+                "frames": timers["frames"],
+                "fps": round(timers["frames"] / total, 2) if total else None,
+            }
+            return {"returncode": 0, "metrics": metrics}
+        except Exception:
+            traceback.print_exc()
+            return {"returncode": 1}
+
+# Representative scenes for --benchmark, relative to the repository root: updater-heavy
+# per-point animation, large tables of Tex, dense plotting, and full-screen grid transformations
+BENCHMARK_SCENES = tuple(
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), spec) for spec in (
+        "ml_basics/kld/kld.py::IndependentProbabilityDistributions",
+        "understanding_self_attention/self_attention.py::MatrixRepresentation",
+        "understanding_Positional_Encoding/positional_encoding.py::SinusoidalEncoding",
+        "maths_for_ml/linear_algebra/vectors.py::LinearTransformationsScene",
+    )
+)
+
+DEFAULT_BENCHMARK_TOLERANCE = 0.15
+# Timing differences below this are noise, whatever the relative change
+MIN_REGRESSION_SECONDS = 0.1
+
+def _benchmark_regressions(metrics, baseline, tolerance):
+    """List the metrics that are worse than the baseline by more than tolerance."""
+    regressions = []
+    for name in ("construct_seconds", "rasterize_seconds", "encode_seconds", "peak_rss_bytes"):
+        old, new = baseline.get(name), metrics.get(name)
+        if old is None or new is None:
+            continue
+        if new > old * (1 + tolerance) and (name == "peak_rss_bytes" or new - old > MIN_REGRESSION_SECONDS):
+            regressions.append(f"{name} {old:g} -> {new:g}")
+    old, new = baseline.get("fps"), metrics.get("fps")
+    if old and new and new < old / (1 + tolerance):
+        regressions.append(f"fps {old:g} -> {new:g}")
+    return regressions
+
+def baseline_mismatches(baseline, quality_flag, manim_version):
+    """
+    Find what makes a benchmark baseline incomparable with this run.
+
+    Args:
+        baseline (dict): Baseline loaded from its JSON file
+        quality_flag (str): Quality flag this run renders at
+        manim_version (str): The installed manim version
+
+    Returns:
+        list: A description of every mismatch, empty if the baseline fits
+    """
+    mismatches = []
+    if baseline.get("quality") != quality_flag:
+        mismatches.append(f"recorded at quality -q{baseline.get('quality')}, this run is -q{quality_flag}")
+    if baseline.get("manim_version") != manim_version:
+        mismatches.append(f"recorded with manim {baseline.get('manim_version')}, this is manim {manim_version}")
+    return mismatches
+
+def benchmark_scenes(specs=None, quality="low", repeat=3, baseline_path=None, update_baseline=False,
+                     tolerance=DEFAULT_BENCHMARK_TOLERANCE, state_dir=DEFAULT_STATE_DIR):
+    """
+    Benchmark a fixed set of scenes and compare them with a stored baseline.
+
+    Each scene is rendered repeat times, one at a time, each in a fresh
+    worker process so that peak RSS is measured per scene, with manim's
+    caching off (see benchmark_in_process). The median of every metric is
+    compared with the baseline; a scene regresses when a time or its peak
+    RSS grows, or its frames per second drop, by more than its tolerance.
+
+    Args:
+        specs (list, optional): 'file.py::Scene' names, or files to bench all
+            their scenes. Defaults to BENCHMARK_SCENES.
+        quality (str): Quality to render at
+        repeat (int): Renders per scene
+        baseline_path (str, optional): Baseline JSON file, defaults to
+            benchmark_baseline.json in state_dir
+        update_baseline (bool): Store these results as the new baseline
+            instead of comparing against it
+        tolerance (float): Allowed relative slowdown for scenes that have no
+            tolerance of their own in the baseline file
+        state_dir (str): Directory holding logs and the default baseline
+
+    Returns:
+        int: Number of scenes that failed or regressed, or 1 if the baseline
+        was recorded at another quality or with another manim version
+    """
+    quality_flag = quality_to_flag(quality)
+    baseline_path = baseline_path or os.path.join(state_dir, "benchmark_baseline.json")
+    baseline = load_state_file(baseline_path)
+    wanted = {}
+    for spec in specs or BENCHMARK_SCENES:
+        path, _, scene = spec.partition("::")
+        for file_path in expand_scene_paths([path]):
+            wanted.setdefault(os.path.abspath(file_path), set()).add(scene or None)
+
+    log_dir = os.path.join(state_dir, "logs", "benchmark")
+    jobs = []
+    for job in plan_jobs(list(wanted), quality_flag, "ast", log_dir, still_patterns=(), detect_stills=False):
+        names = wanted[job["file"]]
+        if None in names or job["scene"] in names:
+            jobs.append(dict(job, benchmark=True, still=False))
+    if not jobs:
+        print("No benchmark scenes found")
+        return 1
+
+    manim_version = installed_manim_version()
+    if baseline.get("scenes") and not update_baseline:
+        mismatches = baseline_mismatches(baseline, quality_flag, manim_version)
+        if mismatches:
+            # Timings from another quality or manim release say nothing about this code
+            print(f"✗ Baseline {baseline_path} was {' and '.join(mismatches)}; "
+                  f"rerun with the same settings or with --update-baseline")
+            return 1
+    print(f"Benchmarking {len(jobs)} scene(s) at {quality} quality, {repeat} run(s) each")
+
+    output_dir = tempfile.mkdtemp(prefix="manim_benchmark_")
+    # A fresh process per run, so peak RSS belongs to that scene alone
+    worker = WarmWorker(output_dir=output_dir, max_scenes=1)
+    failed = 0
+    scenes = baseline.setdefault("scenes", {}) if update_baseline else baseline.get("scenes", {})
+    try:
+        for job in jobs:
+            # Named relative to the project, so the baseline holds wherever this runs from
+            root = find_project_root(job["file"]) or os.getcwd()
+            name = f"{os.path.relpath(job['file'], root).replace(os.sep, '/')}::{job['scene']}"
+            runs = []
+            for _ in range(repeat):
+                result = worker.render(job, job["log"])
+                if result["returncode"] != 0:
+                    break
+                runs.append(dict(result["metrics"], **(result.get("usage") or {})))
+            if len(runs) < repeat:
+                print(f"✗ {name} failed (exit {result['returncode']}), see {result['log']}")
+                failed += 1
+                continue
+
+            metrics = {key: sorted(run[key] for run in runs)[len(runs) // 2]
+                       for key in runs[0] if runs[0][key] is not None}
+            print(f"  {name}: construct {metrics['construct_seconds']:.2f}s, "
+                  f"rasterize {metrics['rasterize_seconds']:.2f}s, encode {metrics['encode_seconds']:.2f}s, "
+                  f"{metrics.get('fps', 0):.1f} fps, peak RSS {metrics.get('peak_rss_bytes', 0) / 1024 ** 2:.0f} MB")
+
+            if update_baseline:
+                previous = scenes.get(name, {})
+                scenes[name] = {"metrics": metrics, "tolerance": previous.get("tolerance", tolerance)}
+                continue
+            if name not in scenes:
+                print(f"  • {name} has no baseline yet, run with --update-baseline")
+                continue
+            regressions = _benchmark_regressions(metrics, scenes[name]["metrics"],
+                                                 scenes[name].get("tolerance", tolerance))
+            if regressions:
+                print(f"✗ {name} regressed: {', '.join(regressions)}")
+                failed += 1
+            else:
+                print(f"✓ {name} within {scenes[name].get('tolerance', tolerance):.0%} of the baseline")
+    finally:
+        worker.close()
+        shutil.rmtree(output_dir, ignore_errors=True)
+
+    if update_baseline:
+        baseline.update(manim_version=manim_version, quality=quality_flag, recorded_at=time.time())
+        save_state_file(baseline_path, baseline)
+        print(f"Baseline saved to {baseline_path}")
+    return failed
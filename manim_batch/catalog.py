@@ -0,0 +1,206 @@
+"""
+SQLite catalog of every output the batch renderer has produced.
+"""
+import os
+import json
+import sqlite3
+import time
+import threading
+
+from .media import probe_duration
+from .planning import plan_jobs
+from .state import hash_file, installed_manim_version
+
+class OutputCatalog:
+    """
+    SQLite index of every render the batch renderer has produced.
+
+    Each successful render adds a row keyed by its scene and configuration:
+    the quality, the hash of the manim.cfg it used, the media directory and
+    whether it was a still. The row holds the scene's source fingerprint,
+    its output files, their duration and size, how long the render took, the
+    manim version and the plan_jobs options the scene was planned with, so
+    stale() can fingerprint it the same way again. Older rows for the same
+    scene and configuration are superseded by newer ones; their outputs can
+    be deleted with gc() unless a newer render wrote to the same path.
+    """
+
+    def __init__(self, path):
+        self.path = os.path.abspath(path)
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(self.path, timeout=60, check_same_thread=False)
+        with self.db:
+            self.db.execute("""
+                CREATE TABLE IF NOT EXISTS renders (
+                    id INTEGER PRIMARY KEY,
+                    file TEXT NOT NULL,
+                    scene TEXT NOT NULL,
+                    quality TEXT NOT NULL,
+                    config_hash TEXT NOT NULL,
+                    media_dir TEXT NOT NULL,
+                    still INTEGER NOT NULL,
+                    planning TEXT NOT NULL,
+                    source_hash TEXT,
+                    outputs TEXT NOT NULL,
+                    duration REAL,
+                    size INTEGER NOT NULL,
+                    render_seconds REAL,
+                    manim_version TEXT,
+                    rendered_at REAL NOT NULL
+                )""")
+            self.db.execute("CREATE INDEX IF NOT EXISTS renders_scene "
+                            "ON renders (scene, quality, config_hash, media_dir, still, rendered_at)")
+            self.db.execute("CREATE INDEX IF NOT EXISTS renders_source ON renders (source_hash)")
+
+    @staticmethod
+    def config_hash(config_file):
+        """Hash of a scene's manim.cfg, empty for scenes without one."""
+        return hash_file(config_file, {})[:16] if config_file and os.path.isfile(config_file) else ""
+
+    def record(self, result, outputs, media_dir):
+        """Add a successful render, its output files and the media directory it wrote them to."""
+        outputs = [os.path.abspath(path) for path in outputs]
+        movies = [path for path in outputs if not path.endswith(".png")]
+        row = (
+            os.path.abspath(result["file"]),
+            result["scene"],
+            result["quality"],
+            self.config_hash(result.get("config_file")),
+            os.path.abspath(media_dir),
+            int(bool(result.get("still"))),
+            json.dumps(result["planning"], sort_keys=True),
+            result.get("fingerprint"),
+            json.dumps(outputs),
+            probe_duration(movies[0]) if movies else None,
+            sum(os.path.getsize(path) for path in outputs if os.path.isfile(path)),
+            round(result["elapsed"], 3),
+            installed_manim_version(),
+            time.time(),
+        )
+        with self.lock, self.db:
+            self.db.execute("INSERT INTO renders (file, scene, quality, config_hash, media_dir, still, planning, "
+                            "source_hash, outputs, duration, size, render_seconds, manim_version, rendered_at) "
+                            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", row)
+
+    def _rows(self, where="1", params=()):
+        with self.lock:
+            cursor = self.db.execute(f"SELECT * FROM renders WHERE {where} ORDER BY rendered_at DESC", params)
+            columns = [column[0] for column in cursor.description]
+            rows = [dict(zip(columns, values)) for values in cursor.fetchall()]
+        for row in rows:
+            row["outputs"] = json.loads(row["outputs"])
+            row["planning"] = json.loads(row["planning"])
+            row["still"] = bool(row["still"])
+        return rows
+
+    def _current(self, rows):
+        """Split rows, newest first, into the latest per scene and configuration and the superseded rest."""
+        latest, superseded = {}, []
+        for row in rows:
+            key = (row["file"], row["scene"], row["quality"], row["config_hash"], row["media_dir"], row["still"])
+            if key in latest:
+                superseded.append(row)
+            else:
+                latest[key] = row
+        return list(latest.values()), superseded
+
+    def latest(self, scene, quality=None):
+        """
+        Find the newest render of a scene for every configuration.
+
+        Args:
+            scene (str): Scene class name, or 'file.py::Scene' to pick one file
+            quality (str, optional): Only renders at this quality flag
+
+        Returns:
+            list: Row dicts, newest first
+        """
+        file_path, _, name = scene.rpartition("::")
+        where, params = "scene = ?", [name]
+        if file_path:
+            where += " AND file = ?"
+            params.append(os.path.abspath(file_path))
+        if quality:
+            where += " AND quality = ?"
+            params.append(quality)
+        return self._current(self._rows(where, params))[0]
+
+    def by_hash(self, prefix):
+        """Find the renders of the scene source whose fingerprint starts with prefix."""
+        return self._rows("source_hash LIKE ?", (prefix.replace("%", "") + "%",))
+
+    def stale(self):
+        """
+        Find the latest renders whose scene has changed since, or is gone.
+
+        Scenes are planned again with the options their render was planned
+        with (quality, discovery and still settings), so a still or a scene
+        rendered at its still quality compares against a like fingerprint.
+
+        Returns:
+            list: Row dicts, each with a 'reason'
+        """
+        stale = []
+        fingerprints = {}
+        for row in self._current(self._rows())[0]:
+            key = (row["file"], json.dumps(row["planning"], sort_keys=True))
+            if key not in fingerprints:
+                jobs = plan_jobs([row["file"]], **row["planning"]) if os.path.isfile(row["file"]) else []
+                fingerprints[key] = {job["scene"]: job["fingerprint"] for job in jobs}
+            current = fingerprints[key]
+            if row["scene"] not in current:
+                stale.append(dict(row, reason="scene removed"))
+            elif current[row["scene"]] != row["source_hash"]:
+                stale.append(dict(row, reason="source changed"))
+            elif not all(os.path.isfile(path) for path in row["outputs"]):
+                stale.append(dict(row, reason="output missing"))
+        return stale
+
+    def gc(self, dry_run=False):
+        """
+        Delete the outputs of superseded renders and forget them.
+
+        Files that a newer render of any scene also lists are kept, since
+        manim writes the same scene and quality to the same path every time.
+
+        Args:
+            dry_run (bool): Only report what would be deleted
+
+        Returns:
+            tuple: (files deleted, bytes freed)
+        """
+        latest, superseded = self._current(self._rows())
+        kept = {path for row in latest for path in row["outputs"]}
+        deleted = freed = 0
+        for row in superseded:
+            for path in row["outputs"]:
+                if path in kept or not os.path.isfile(path):
+                    continue
+                size = os.path.getsize(path)
+                print(f"{'Would delete' if dry_run else 'Deleting'} {path} ({size / 1024 ** 2:.1f} MB)")
+                if not dry_run:
+                    os.remove(path)
+                deleted += 1
+                freed += size
+        if not dry_run and superseded:
+            with self.lock, self.db:
+                self.db.executemany("DELETE FROM renders WHERE id = ?", [(row["id"],) for row in superseded])
+        return deleted, freed
+
+    def close(self):
+        self.db.close()
+
+def print_catalog_rows(rows):
+    """Print catalog rows, one render per block."""
+    if not rows:
+        print("No matching renders")
+    for row in rows:
+        rendered_at = time.strftime("%Y-%m-%d %H:%M", time.localtime(row["rendered_at"]))
+        duration = f"{row['duration']:.1f}s" if row["duration"] is not None else "still"
+        reason = f"  [{row['reason']}]" if row.get("reason") else ""
+        print(f"{os.path.relpath(row['file'])}::{row['scene']} @{row['quality']}  {rendered_at}  "
+              f"source {(row['source_hash'] or '?')[:12]}  {duration}  {row['size'] / 1024 ** 2:.1f} MB  "
+              f"rendered in {row['render_seconds']:.1f}s  manim {row['manim_version']}{reason}")
+        for path in row["outputs"]:
+            print(f"    {path}")
@@ -0,0 +1,283 @@
+"""
+Finding scene files and the Scene classes in them, by parsing or importing.
+"""
+import os
+import sys
+import ast
+import glob
+import inspect
+import importlib.util
+
+# Scene base classes exported by manim. A class deriving from any of these,
+# directly or through other classes in the same file, is a renderable scene.
+MANIM_SCENE_BASES = {
+    "Scene",
+    "ThreeDScene",
+    "SpecialThreeDScene",
+    "MovingCameraScene",
+    "ZoomedScene",
+    "VectorSpaceScene",
+    "LinearTransformationScene",
+}
+
+def _base_class_name(node, manim_aliases):
+    """
+    Resolve a base class expression from a ClassDef to a plain name.
+
+    Args:
+        node (ast.expr): One entry of ClassDef.bases
+        manim_aliases (dict): Local names bound by 'from manim import X as Y'
+
+    Returns:
+        str or None: 'Scene' for 'Scene', 'manim.Scene' or an alias of it,
+            the bare name for other classes, None for anything dynamic
+    """
+    if isinstance(node, ast.Name):
+        return manim_aliases.get(node.id, node.id)
+    if isinstance(node, ast.Attribute):
+        # manim.Scene, mn.scene.scene.Scene, ...
+        return node.attr
+    if isinstance(node, ast.Subscript):
+        # Generic[...] style bases
+        return _base_class_name(node.value, manim_aliases)
+    return None
+
+def parse_scene_classes(source, filename="<unknown>"):
+    """
+    Find Scene classes by parsing source code, without importing it.
+
+    Mixins are resolved inside the file, so both
+    'class ExplainingInputNode(NNMediaMixin, Scene)' and a class that
+    derives from another local Scene subclass are found.
+
+    Args:
+        source (str): Python source of the scene file
+        filename (str): File name used in syntax error messages
+
+    Returns:
+        list: Scene class names in source order
+    """
+    tree = ast.parse(source, filename=filename)
+
+    manim_aliases = {}
+    for node in tree.body:
+        if isinstance(node, ast.ImportFrom) and node.module and node.module.split(".")[0] == "manim":
+            for alias in node.names:
+                if alias.asname:
+                    manim_aliases[alias.asname] = alias.name
+
+    classes = [node for node in tree.body if isinstance(node, ast.ClassDef)]
+    bases = {
+        cls.name: {_base_class_name(base, manim_aliases) for base in cls.bases}
+        for cls in classes
+    }
+
+    # Propagate "is a scene" through local base classes until nothing changes,
+    # so the order classes are defined in does not matter.
+    scene_names = set()
+    changed = True
+    while changed:
+        changed = False
+        for name, base_names in bases.items():
+            if name in scene_names:
+                continue
+            if base_names & MANIM_SCENE_BASES or base_names & scene_names:
+                scene_names.add(name)
+                changed = True
+
+    seen = set()
+    ordered = []
+    for cls in classes:
+        # A later definition with the same name replaces the earlier one at
+        # import time; keep the first position but only list it once.
+        if cls.name in scene_names and cls.name not in seen:
+            seen.add(cls.name)
+            ordered.append(cls.name)
+    return ordered
+
+def find_scene_classes(file_path, discovery="ast"):
+    """
+    Find all Scene classes in the given Manim Python file.
+    
+    Args:
+        file_path (str): Path to the Manim Python file
+        discovery (str): 'ast' parses the file statically and never imports
+            manim; 'import' executes the module and inspects its classes
+        
+    Returns:
+        list: List of scene class names
+    """
+    # Validate file path
+    if not os.path.isfile(file_path):
+        print(f"Error: File '{file_path}' does not exist")
+        return []
+    
+    if not file_path.endswith('.py'):
+        print(f"Error: File '{file_path}' is not a Python file")
+        return []
+    
+    if discovery == "ast":
+        try:
+            with open(file_path, encoding="utf-8") as f:
+                return parse_scene_classes(f.read(), file_path)
+        except SyntaxError as e:
+            print(f"Error parsing '{file_path}': {e}")
+            return []
+    
+    # Extract file information
+    file_name = os.path.basename(file_path)
+    module_name = os.path.splitext(file_name)[0]
+    
+    # Import the module
+    saved_path = list(sys.path)
+    try:
+        # Add the directory and project root to sys.path to handle imports within the module
+        sys.path[:0] = project_import_path(file_path)
+        
+        # Create a spec from the file path
+        spec = importlib.util.spec_from_file_location(module_name, file_path)
+        module = importlib.util.module_from_spec(spec)
+        # Add the module to sys.modules to handle potential imports within the module
+        sys.modules[module_name] = module
+        # Execute the module
+        spec.loader.exec_module(module)
+    except Exception as e:
+        print(f"Error importing module: {e}")
+        return []
+    finally:
+        sys.path[:] = saved_path
+    
+    # Find all Scene classes in the module
+    scene_classes = []
+    
+    # Import manim Scene class
+    try:
+        from manim import Scene
+        
+        for name, obj in inspect.getmembers(module):
+            # Skip scene classes pulled in by 'from manim import *'
+            if (inspect.isclass(obj) and issubclass(obj, Scene) and obj != Scene
+                    and obj.__module__ == module_name):
+                scene_classes.append(name)
+                
+    except ImportError:
+        print("Error: Could not import manim.Scene. Make sure manim is installed.")
+        return []
+    
+    return scene_classes
+
+def local_module_file(module, search_dirs):
+    """
+    Find the source file of an import that lives in this repository.
+
+    Args:
+        module (str): Dotted module name, e.g. 'helpers.warp'
+        search_dirs (list): Directories to look in, in import order
+
+    Returns:
+        str or None: Path to the module's .py file, None for installed packages
+    """
+    relative = module.replace(".", os.sep)
+    for directory in search_dirs:
+        for candidate in (relative + ".py", os.path.join(relative, "__init__.py")):
+            path = os.path.join(directory, candidate)
+            if os.path.isfile(path):
+                return path
+    return None
+
+# Files that mark the root of a project
+PROJECT_MARKERS = ("pyproject.toml", ".git")
+
+def find_project_root(file_path):
+    """
+    Find the project a scene file belongs to.
+
+    Scenes import shared modules such as warp_fields and text_cache from the
+    project root, which the renderer puts on their import path.
+
+    Returns:
+        str or None: The nearest directory at or above the file's with a
+            pyproject.toml or .git, None outside a project
+    """
+    directory = os.path.dirname(os.path.abspath(file_path))
+    while not any(os.path.exists(os.path.join(directory, marker)) for marker in PROJECT_MARKERS):
+        parent = os.path.dirname(directory)
+        if parent == directory:
+            return None
+        directory = parent
+    return directory
+
+def import_search_dirs(file_path, asset_root="."):
+    """
+    Directories a scene file's imports may resolve to inside the project.
+
+    These are the file's own directory, the directory manim runs in, and
+    every directory above the file up to the project root (see
+    find_project_root).
+    """
+    search_dirs = [os.path.dirname(os.path.abspath(file_path)), os.path.abspath(asset_root)]
+    root = find_project_root(file_path)
+    if root is None:
+        # Not inside a project: only the file's own directories count
+        return search_dirs
+    directory = search_dirs[0]
+    while directory != root:
+        directory = os.path.dirname(directory)
+        search_dirs.append(directory)
+    return search_dirs
+
+def project_import_path(file_path):
+    """
+    The import path a scene file runs with: its own directory, then its
+    project root.
+
+    Returns:
+        list: Absolute directories, in import order
+    """
+    directories = [os.path.dirname(os.path.abspath(file_path))]
+    root = find_project_root(file_path)
+    if root and root not in directories:
+        directories.append(root)
+    return directories
+
+# Directories never searched for scene files
+SKIPPED_DIRS = {"media", "__pycache__", "venv", "node_modules"}
+
+def expand_scene_paths(paths):
+    """
+    Expand files, directories and glob patterns into a list of Python files.
+
+    Directories are searched recursively, skipping hidden directories and
+    manim's media output. Files without scenes are filtered out later by
+    discovery, so helpers like nn.py can safely be included.
+
+    Args:
+        paths (list): Files, directories or glob patterns
+
+    Returns:
+        list: Absolute paths of .py files, in the order they were given
+    """
+    files = []
+    for path in paths:
+        if glob.has_magic(path):
+            matches = sorted(glob.glob(path, recursive=True))
+            if not matches:
+                print(f"Warning: Pattern '{path}' matched no files")
+        else:
+            matches = [path]
+
+        for match in matches:
+            if os.path.isdir(match):
+                for root, dirs, names in os.walk(match):
+                    dirs[:] = sorted(d for d in dirs if not d.startswith(".") and d not in SKIPPED_DIRS)
+                    files.extend(os.path.join(root, name) for name in sorted(names) if name.endswith(".py"))
+            elif match.endswith(".py") or not glob.has_magic(path):
+                # Explicit non-.py files are reported by find_scene_classes
+                files.append(match)
+
+    unique = []
+    for path in files:
+        path = os.path.abspath(path)
+        if path not in unique:
+            unique.append(path)
+    return unique
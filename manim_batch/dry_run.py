@@ -0,0 +1,153 @@
+"""
+Running scenes with animations skipped to report their length without rendering.
+"""
+import os
+import math
+import traceback
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from .discovery import expand_scene_paths
+from .planning import plan_jobs, quality_to_flag
+from .state import DEFAULT_STATE_DIR, cache_key, load_state_file, save_state_file
+from .warm import WarmWorkerPool, redirect_output, scene_environment
+
+def dry_run_in_process(job, log_path=None):
+    """
+    Run a scene's construct() with every animation skipped and measure it.
+
+    Nothing is rasterized or encoded: the renderer's frame capture methods
+    are replaced with no-ops and manim runs in dry_run mode, so only scene
+    logic, mobject construction and animation setup cost time.
+
+    Args:
+        job (dict): Render job from plan_jobs
+        log_path (str, optional): File that receives manim's output
+
+    Returns:
+        dict: 'returncode', and on success a 'plan' with the number of
+            plays and waits, total seconds, total frames at the target
+            frame rate, the frame rate and the peak mobject count
+    """
+    with redirect_output(log_path):
+        try:
+            with scene_environment(job) as scene_class:
+                from manim import Wait, config
+                from manim.renderer.cairo_renderer import CairoRenderer
+
+                config.dry_run = True
+                renderer = CairoRenderer(skip_animations=True)
+                for method in ("render", "update_frame", "save_static_frame_data", "freeze_current_frame"):
+                    setattr(renderer, method, lambda *args, **kwargs: None)
+
+                plan = {"plays": 0, "waits": 0, "seconds": 0.0, "frames": 0, "peak_mobjects": 0}
+                frame_rate = config.frame_rate
+                play = renderer.play
+
+                def measured_play(scene, *args, **kwargs):
+                    play(scene, *args, **kwargs)
+                    if len(scene.animations) == 1 and isinstance(scene.animations[0], Wait):
+                        plan["waits"] += 1
+                    else:
+                        plan["plays"] += 1
+                    plan["seconds"] += scene.duration
+                    plan["frames"] += math.ceil(scene.duration * frame_rate)
+                    plan["peak_mobjects"] = max(plan["peak_mobjects"], len(scene.get_mobject_family_members()))
+
+                renderer.play = measured_play
+                scene_class(renderer=renderer).render()
+                plan["frame_rate"] = frame_rate
+            return {"returncode": 0, "plan": plan}
+        except Exception:
+            traceback.print_exc()
+            return {"returncode": 1}
+
+def dry_run_scenes(paths, quality="high", jobs=1, discovery="ast", state_dir=DEFAULT_STATE_DIR):
+    """
+    Measure every scene without rasterizing anything and print a plan.
+
+    Scenes run in warm worker processes with animations skipped (see
+    dry_run_in_process). The measurements are stored in the state directory;
+    later renders of unchanged scenes use them in place of the source-based
+    estimate when no render timings exist yet, and to pick split points.
+
+    Args:
+        paths (str or list): Manim Python files, directories or glob patterns
+        quality (str): Quality whose frame rate frames are counted at
+        jobs (int): Number of scenes to measure at the same time (0 = one per core)
+        discovery (str): Scene discovery mode passed to find_scene_classes
+        state_dir (str): Directory holding the stored plans and logs
+
+    Returns:
+        list: One result dict per scene with a 'plan' for those that ran
+    """
+    if isinstance(paths, str):
+        paths = [paths]
+    quality_flag = quality_to_flag(quality)
+    log_dir = os.path.join(state_dir, "logs", "dry_run")
+    # Stills are measured like any other scene here
+    all_jobs = [dict(job, dry_run=True, still=False)
+                for job in plan_jobs(expand_scene_paths(paths), quality_flag, discovery, log_dir,
+                                     still_patterns=(), detect_stills=False)]
+    if not all_jobs:
+        print("No Scene classes found")
+        return []
+
+    if jobs <= 0:
+        jobs = os.cpu_count() or 1
+    jobs = min(jobs, len(all_jobs))
+    print(f"Dry-running {len(all_jobs)} scene(s) with {jobs} worker(s)...")
+
+    plans_path = os.path.join(state_dir, "plans.json")
+    plans = load_state_file(plans_path)
+    results = {}
+    worker_pool = WarmWorkerPool(jobs)
+    try:
+        with ThreadPoolExecutor(max_workers=jobs) as pool:
+            futures = [pool.submit(worker_pool.render, job, job["log"]) for job in all_jobs]
+            for future in as_completed(futures):
+                result = future.result()
+                key = cache_key(result["file"], result["scene"])
+                results[key] = result
+                if result["returncode"] == 0:
+                    plans.setdefault(key, {})[result["quality"]] = dict(
+                        result["plan"], fingerprint=result["fingerprint"])
+    finally:
+        worker_pool.close()
+    save_state_file(plans_path, plans)
+
+    ordered = [results[cache_key(job["file"], job["scene"])] for job in all_jobs]
+    width = max([len("scene")] + [len(r["label"]) for r in ordered])
+    print(f"\n  {'scene':<{width}}  {'plays':>5}  {'waits':>5}  {'seconds':>8}  {'frames':>7}  "
+          f"{'mobjects':>8}  {'time':>6}")
+    totals = {"plays": 0, "waits": 0, "seconds": 0.0, "frames": 0}
+    for r in ordered:
+        if r["returncode"] != 0:
+            print(f"  {r['label']:<{width}}  failed (exit {r['returncode']}), see {r['log']}")
+            continue
+        plan = r["plan"]
+        for field in totals:
+            totals[field] += plan[field]
+        print(f"  {r['label']:<{width}}  {plan['plays']:>5}  {plan['waits']:>5}  {plan['seconds']:>8.1f}  "
+              f"{plan['frames']:>7}  {plan['peak_mobjects']:>8}  {r['elapsed']:>5.1f}s")
+    print(f"  {'total':<{width}}  {totals['plays']:>5}  {totals['waits']:>5}  {totals['seconds']:>8.1f}  "
+          f"{totals['frames']:>7}")
+    return ordered
+
+def apply_dry_run_plans(jobs, plans):
+    """
+    Replace source-based estimates with stored dry-run measurements.
+
+    A plan is only used while the scene's fingerprint at the job's quality
+    is unchanged, i.e. when the scene was dry-run at the quality it is now
+    being rendered at and nothing it depends on has changed since.
+
+    Args:
+        jobs (list): Render jobs from plan_jobs
+        plans (dict): Loaded dry-run plans
+    """
+    for job in jobs:
+        if job.get("still"):
+            continue
+        plan = plans.get(cache_key(job["file"], job["scene"]), {}).get(job["quality"])
+        if plan and plan["fingerprint"] == job["fingerprint"]:
+            job["estimate"] = {"plays": plan["plays"], "waits": plan["waits"], "seconds": plan["seconds"]}
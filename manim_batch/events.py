@@ -0,0 +1,149 @@
+"""
+JSON lines of scene lifecycle events for dashboards and monitoring.
+"""
+import os
+import re
+import json
+import time
+import threading
+
+from .state import cache_key
+
+# One match per progress bar refresh, e.g.
+# "Animation 3: Write(Text('...')):  45%|####5     | 27/60 [00:01<00:01, 21.9it/s]"
+PROGRESS_PATTERN = re.compile(r"Animation (\d+):.*?\| *(\d+)/(\d+) \[")
+
+class EventStream:
+    """
+    Append-only JSON-lines record of scene lifecycle events.
+
+    Each scene gets a 'queued' record, a 'started' record when its first
+    render job starts, 'progress' records while it renders and a 'finished'
+    or 'failed' record. Every record carries the event, a Unix timestamp,
+    the scene, how many scenes are queued and running, and wall time, CPU
+    time, peak RSS, output size, frames and frames per second (null where
+    not known yet).
+
+    Progress comes from the frame counters of manim's progress bars in the
+    scenes' log files, so it is only reported for renders that have a log.
+    """
+
+    FIELDS = ("wall_seconds", "cpu_seconds", "peak_rss_bytes", "output_bytes", "frames", "fps")
+
+    def __init__(self, path, poll_interval=1.0):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.file = open(path, "a")
+        self.lock = threading.RLock()
+        self.queued = 0
+        self.running = 0
+        self.started = {}
+        self.logs = {}
+        self.poll_interval = poll_interval
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self._poll_logs, daemon=True)
+        self.thread.start()
+
+    def emit(self, event, job, **fields):
+        record = {
+            "event": event,
+            "time": round(time.time(), 3),
+            "file": job["file"],
+            "scene": job["scene"],
+            "label": job["label"].rsplit(" [part ", 1)[0],
+            "quality": job["quality"],
+            "queued": self.queued,
+            "running": self.running,
+        }
+        record.update(dict.fromkeys(self.FIELDS))
+        record.update(fields)
+        with self.lock:
+            self.file.write(json.dumps(record) + "\n")
+            self.file.flush()
+
+    def queue(self, job):
+        with self.lock:
+            self.queued += 1
+            self.emit("queued", job, expected_seconds=round(job["expected"], 3))
+
+    def start(self, job, log_path=None):
+        """Note that a render job started; the first job of a scene starts the scene."""
+        key = cache_key(job["file"], job["scene"])
+        with self.lock:
+            if log_path:
+                self.logs.setdefault(key, {"job": job, "files": {}})["files"][log_path] = {
+                    "offset": 0, "frames": {},
+                }
+            if key in self.started:
+                return
+            self.started[key] = time.monotonic()
+            self.queued -= 1
+            self.running += 1
+            self.emit("started", job)
+
+    def finish(self, result, frames=None, outputs=()):
+        """Record a scene's final result, once all of its render jobs are done."""
+        key = cache_key(result["file"], result["scene"])
+        with self.lock:
+            scene = self.logs.pop(key, None)
+            if frames is None and scene:
+                # Without ffprobe, fall back to the frames counted in the logs
+                frames = self._read_progress(scene)[1] or None
+            if key in self.started:
+                wall = time.monotonic() - self.started.pop(key)
+                self.running -= 1
+            else:
+                # Taken from the journal of an interrupted run without rendering
+                wall = result["elapsed"]
+                self.queued -= 1
+            fields = dict(result.get("usage") or {}, wall_seconds=round(wall, 3))
+            if result["returncode"] == 0:
+                fields["output_bytes"] = sum(os.path.getsize(path) for path in outputs
+                                             if os.path.exists(path))
+                if frames:
+                    fields.update(frames=frames, fps=round(frames / wall, 2) if wall else None)
+                self.emit("finished", result, **fields)
+            else:
+                self.emit("failed", result, returncode=result["returncode"], log=result["log"],
+                          limit=result.get("limit"), attempts=result.get("attempts"), **fields)
+
+    def close(self):
+        self.stopped.set()
+        self.thread.join()
+        self.file.close()
+
+    @staticmethod
+    def _read_progress(scene):
+        """Read new progress bar output from a scene's logs; returns (changed, frames done)."""
+        changed = False
+        for path, state in scene["files"].items():
+            try:
+                with open(path, "rb") as log_file:
+                    log_file.seek(state["offset"])
+                    data = log_file.read()
+            except OSError:
+                continue
+            # Only consume complete refreshes; the rest is read next time
+            data = data[:max(data.rfind(b"\r"), data.rfind(b"\n")) + 1]
+            state["offset"] += len(data)
+            for match in PROGRESS_PATTERN.finditer(data.decode("utf-8", errors="replace")):
+                animation, done = int(match.group(1)), int(match.group(2))
+                if done > state["frames"].get(animation, 0):
+                    state["frames"][animation] = done
+                    changed = True
+        return changed, sum(sum(state["frames"].values()) for state in scene["files"].values())
+
+    def _poll_logs(self):
+        while not self.stopped.wait(self.poll_interval):
+            with self.lock:
+                watched = list(self.logs.items())
+            for key, scene in watched:
+                changed, frames = self._read_progress(scene)
+                if not changed:
+                    continue
+                with self.lock:
+                    if key not in self.started:
+                        continue
+                    wall = time.monotonic() - self.started[key]
+                    self.emit("progress", scene["job"], frames=frames, wall_seconds=round(wall, 3),
+                              fps=round(frames / wall, 2) if wall else None)
@@ -0,0 +1,212 @@
+"""
+Render farm: queueing a batch for workers on other hosts, and the worker loop.
+"""
+import os
+import socket
+import sqlite3
+import time
+import threading
+import traceback
+import contextlib
+from concurrent.futures import ThreadPoolExecutor
+
+from .processes import build_scene_command, job_cpu_set, render_scene, render_with_retries
+from .render_queue import MAX_LEASES, RenderQueue
+from .segments import job_workspace, workspace_result
+from .warm import WarmWorkerPool
+
+def renew_leases(render_queue, worker, held, held_lock):
+    """
+    Renew a farm worker's leases, cancelling the jobs it no longer holds.
+    A database error is reported and left for the next heartbeat to retry.
+
+    Args:
+        render_queue (RenderQueue): Queue the jobs were leased from
+        worker (str): The worker's name in the queue
+        held (dict): Cancel event of every job id the worker is rendering
+        held_lock (threading.Lock): Guards held
+    """
+    with held_lock:
+        job_ids = list(held)
+    try:
+        still_held = render_queue.heartbeat(worker, job_ids)
+    except sqlite3.Error as e:
+        print(f"✗ Could not renew leases in {render_queue.path}, retrying: {e}")
+        return
+    with held_lock:
+        for job_id in job_ids:
+            if job_id not in still_held and job_id in held:
+                # Another worker has the job now; stop rendering it here
+                held[job_id].set()
+
+def farm_worker(queue_path, jobs=1, backend="cli", worker_max_scenes=0, limits=None,
+                threads_per_job=None, idle_exit=10.0, segment_store=None, retries=0, retry_backoff=5.0):
+    """
+    Render jobs from a shared RenderQueue until it stays empty.
+
+    Args:
+        queue_path (str): SQLite database of the queue
+        jobs (int): Number of jobs this worker renders at the same time
+            (0 = one per CPU core)
+        backend (str): 'cli' or 'warm', as for render_scenes
+        worker_max_scenes (int): With the warm backend, restart a warm
+            process after this many scenes (0 = never)
+        limits (ResourceLimits, optional): Caps for each render job
+        threads_per_job (int, optional): Cores each job is pinned to,
+            defaults to an even share when jobs > 1 (0 = no limit)
+        idle_exit (float): Exit after the queue has had nothing to lease for
+            this many seconds (0 = keep waiting for work)
+        segment_store (SegmentStore, optional): Shared store of partial movie
+            files that renders reuse animations from
+        retries (int): How many times to retry a failed job before
+            reporting it failed; the lease is held meanwhile
+        retry_backoff (float): Seconds before the first retry, doubled for
+            every further one
+
+    Returns:
+        int: Number of jobs that failed
+    """
+    if jobs <= 0:
+        jobs = os.cpu_count() or 1
+    if threads_per_job is None:
+        threads_per_job = max(1, (os.cpu_count() or 1) // jobs) if jobs > 1 else 0
+    worker = f"{socket.gethostname()}:{os.getpid()}"
+    render_queue = RenderQueue(queue_path)
+    print(f"Worker {worker} rendering up to {jobs} job(s) from {render_queue.path}")
+
+    held = {}
+    held_lock = threading.Lock()
+    stopped = threading.Event()
+
+    def keep_leases():
+        while not stopped.wait(render_queue.lease_seconds / 3):
+            renew_leases(render_queue, worker, held, held_lock)
+
+    # Jobs carry their own output directory, so warm processes are started without one
+    worker_pool = WarmWorkerPool(jobs, False, None, worker_max_scenes, limits, threads_per_job) \
+        if backend == "warm" else None
+    failures = []
+
+    def render_once(slot, job, cancel):
+        with job_workspace(job, job["output_dir"], segment_store) as render_job:
+            if worker_pool:
+                result = worker_pool.render(render_job, job["log"], cancel)
+            else:
+                result = render_scene(render_job, build_scene_command(render_job, False, job["output_dir"]),
+                                      job["log"], cancel, limits, job_cpu_set(slot, threads_per_job))
+            if segment_store and result["returncode"] == 0:
+                segment_store.publish(render_job)
+        return workspace_result(result, job)
+
+    def drain(slot):
+        idle_since = time.monotonic()
+        while True:
+            try:
+                leased = render_queue.lease(worker)
+            except sqlite3.Error as e:
+                print(f"✗ Could not lease a job from {render_queue.path}: {e}")
+                time.sleep(1)
+                continue
+            if leased is None:
+                if idle_exit and time.monotonic() - idle_since > idle_exit:
+                    return
+                time.sleep(1)
+                continue
+            job_id, job = leased
+            cancel = threading.Event()
+            with held_lock:
+                held[job_id] = cancel
+            print(f"Rendering {job['label']}...")
+            started_at = time.time()
+            start = time.monotonic()
+            try:
+                result = render_with_retries(job, lambda: render_once(slot, job, cancel),
+                                             retries, retry_backoff, cancel)
+            except Exception:
+                # Report the job failed rather than leave it leased until the lease runs out
+                error = traceback.format_exc()
+                print(f"✗ Error rendering {job['label']}:\n{error}")
+                if job["log"]:
+                    with contextlib.suppress(OSError):
+                        os.makedirs(os.path.dirname(job["log"]), exist_ok=True)
+                        with open(job["log"], "a") as f:
+                            f.write(error)
+                result = dict(job, returncode=1, elapsed=time.monotonic() - start, started_at=started_at,
+                              log=job["log"], cancelled=False, usage=None, limit=None, error=error)
+            finally:
+                with held_lock:
+                    del held[job_id]
+            result["worker"] = worker
+            try:
+                stored = not result["cancelled"] and render_queue.complete(job_id, worker, result)
+            except sqlite3.Error as e:
+                print(f"✗ Could not report {job['label']} to {render_queue.path}: {e}")
+                stored = False
+            if result["cancelled"]:
+                print(f"✗ Lost the lease on {job['label']}, another worker is rendering it")
+            elif stored:
+                mark = "✓" if result["returncode"] == 0 else "✗"
+                print(f"{mark} {job['label']} ({result['elapsed']:.1f}s)")
+                if result["returncode"] != 0:
+                    failures.append(result)
+            idle_since = time.monotonic()
+
+    heartbeat = threading.Thread(target=keep_leases, daemon=True)
+    heartbeat.start()
+    try:
+        with ThreadPoolExecutor(max_workers=jobs) as pool:
+            for future in [pool.submit(drain, slot) for slot in range(jobs)]:
+                future.result()
+    finally:
+        stopped.set()
+        if worker_pool:
+            worker_pool.close()
+    print(f"Queue drained, worker {worker} exiting")
+    return len(failures)
+
+def coordinate_farm(jobs, queue_path, output_dir, record, event_stream=None, poll_interval=1.0):
+    """
+    Queue render jobs for farm workers and collect their results.
+
+    The jobs are withdrawn from the queue if the coordinator stops early.
+
+    Args:
+        jobs (list): Scheduled render jobs
+        queue_path (str): SQLite database of the RenderQueue
+        output_dir (str, optional): Directory the workers save output files to
+        record (callable): Called with each job's result as it finishes
+        event_stream (EventStream, optional): Receives started records for
+            jobs as workers lease them
+        poll_interval (float): Seconds between looks at the queue
+    """
+    render_queue = RenderQueue(queue_path)
+    batch = f"{socket.gethostname()}:{os.getpid()}:{time.time():.0f}"
+    render_queue.submit(batch, jobs, output_dir)
+    print(f"Queued {len(jobs)} job(s) in {render_queue.path}, start workers with:\n"
+          f"  python manim_batch_renderer.py --worker {render_queue.path} --jobs N")
+
+    started = set()
+    finished = set()
+    try:
+        while len(finished) < len(jobs):
+            for job_id, state, job, result in render_queue.poll(batch):
+                if job_id in finished or state == "queued":
+                    continue
+                if job_id not in started:
+                    started.add(job_id)
+                    if event_stream:
+                        event_stream.start(job, job["log"])
+                if state not in ("done", "failed"):
+                    continue
+                finished.add(job_id)
+                if result.get("lease_expired"):
+                    print(f"✗ {job['label']}: {MAX_LEASES} workers stopped responding while rendering it")
+                    result = dict(job, returncode=-1, elapsed=0.0, started_at=time.time(), log=job["log"],
+                                  cancelled=False, lease_expired=True)
+                record(result)
+                mark = "✓" if result["returncode"] == 0 else "✗"
+                print(f"[{len(finished)}/{len(jobs)}] {mark} {result['label']} "
+                      f"({result['elapsed']:.1f}s on {result.get('worker', '?')})")
+            time.sleep(poll_interval)
+    finally:
+        render_queue.cancel(batch)
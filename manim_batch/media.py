@@ -0,0 +1,341 @@
+"""
+Probing, checking, stitching and assembling rendered video files with ffmpeg.
+"""
+import os
+import glob
+import re
+import shutil
+import tempfile
+import subprocess
+
+# File extensions manim writes for rendered scenes
+OUTPUT_EXTENSIONS = (".mp4", ".mov", ".webm", ".gif", ".png")
+
+def find_scene_outputs(media_dir, module_name, scene_class, since=0):
+    """
+    Locate the files manim wrote for a scene.
+
+    Args:
+        media_dir (str): manim's media directory
+        module_name (str): Name of the scene file without '.py'
+        scene_class (str): Name of the Scene class, or the output file name
+            the render was given with manim's -o option
+        since (float): Ignore files last modified before this timestamp
+
+    Returns:
+        list: Output paths, newest first
+    """
+    patterns = [
+        os.path.join(media_dir, "videos", glob.escape(module_name), "*", glob.escape(scene_class) + ".*"),
+        os.path.join(media_dir, "images", glob.escape(module_name), glob.escape(scene_class) + ".png"),
+        # Last-frame images get manim's version appended unless named with -o
+        os.path.join(media_dir, "images", glob.escape(module_name), glob.escape(scene_class) + "_ManimCE_v*.png"),
+    ]
+    outputs = []
+    for pattern in patterns:
+        for path in glob.glob(pattern):
+            if path.endswith(OUTPUT_EXTENSIONS) and os.path.getmtime(path) >= since:
+                outputs.append(path)
+    return sorted(outputs, key=os.path.getmtime, reverse=True)
+
+def probe_frame_count(path):
+    """
+    Read the number of video frames in a rendered file with ffprobe.
+
+    Returns:
+        int or None: Frame count, None if ffprobe is unavailable or the file
+            has no countable video stream (e.g. a PNG)
+    """
+    if not path.endswith((".mp4", ".mov", ".webm")):
+        return None
+    try:
+        output = subprocess.run(
+            ["ffprobe", "-v", "error", "-select_streams", "v:0",
+             "-show_entries", "stream=nb_frames", "-of", "csv=p=0", path],
+            capture_output=True, text=True, timeout=30,
+        ).stdout.strip()
+        return int(output)
+    except (OSError, subprocess.TimeoutExpired, ValueError):
+        return None
+
+def probe_duration(path):
+    """
+    Read a video's duration in seconds.
+
+    Uses ffprobe when it is installed and otherwise parses the header that
+    ffmpeg prints for its input.
+
+    Returns:
+        float or None: Duration, None if it could not be determined
+    """
+    try:
+        output = subprocess.run(
+            ["ffprobe", "-v", "error", "-show_entries", "format=duration", "-of", "csv=p=0", path],
+            capture_output=True, text=True, timeout=30,
+        ).stdout.strip()
+        return float(output)
+    except (OSError, subprocess.TimeoutExpired, ValueError):
+        pass
+    try:
+        stderr = subprocess.run([ffmpeg_executable(), "-i", path],
+                                capture_output=True, text=True, timeout=30).stderr
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    match = re.search(r"Duration: (\d+):(\d+):(\d+(?:\.\d+)?)", stderr)
+    if not match:
+        return None
+    hours, minutes, seconds = match.groups()
+    return int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+
+def _iso_media_complete(path):
+    """
+    Check that an MP4/MOV file's top-level boxes cover it exactly and include
+    the 'moov' index, which is written last and is missing from files whose
+    writer was cut off.
+    """
+    seen = set()
+    size = os.path.getsize(path)
+    with open(path, "rb") as f:
+        offset = 0
+        while offset < size:
+            f.seek(offset)
+            header = f.read(16)
+            if len(header) < 8:
+                return False
+            box_size, box_type = int.from_bytes(header[:4], "big"), header[4:8]
+            if box_size == 1:
+                if len(header) < 16:
+                    return False
+                box_size = int.from_bytes(header[8:16], "big")
+            elif box_size == 0:
+                box_size = size - offset  # Box runs to the end of the file
+            if box_size < 8:
+                return False
+            seen.add(box_type)
+            offset += box_size
+    return offset == size and b"moov" in seen
+
+def check_output_integrity(path):
+    """
+    Quickly check that a rendered file is complete and readable.
+
+    Videos are checked with ffprobe, which reads the container headers and
+    index without decoding frames. Where ffprobe is not installed, MP4/MOV
+    box structure is checked directly. PNGs must start with the PNG
+    signature and end with the IEND chunk.
+
+    Args:
+        path (str): Rendered output file
+
+    Returns:
+        bool: False if the file is empty, truncated or unreadable
+    """
+    try:
+        if os.path.getsize(path) == 0:
+            return False
+        if path.endswith(".png"):
+            with open(path, "rb") as f:
+                signature = f.read(8)
+                f.seek(-12, os.SEEK_END)
+                return signature == b"\x89PNG\r\n\x1a\n" and f.read(12)[4:8] == b"IEND"
+        if not path.endswith((".mp4", ".mov", ".webm")):
+            return True
+        try:
+            probe = subprocess.run(
+                ["ffprobe", "-v", "error", "-show_entries", "format=duration", "-of", "csv=p=0", path],
+                capture_output=True, text=True, timeout=30,
+            )
+            return probe.returncode == 0 and not probe.stderr.strip()
+        except OSError:
+            pass
+        if path.endswith(".webm"):
+            with open(path, "rb") as f:
+                return f.read(4) == b"\x1a\x45\xdf\xa3"
+        return _iso_media_complete(path)
+    except (OSError, subprocess.TimeoutExpired):
+        return False
+
+def ffmpeg_executable():
+    """
+    Find an ffmpeg binary: the one on PATH, else the one bundled with
+    imageio-ffmpeg (a dependency of this project).
+
+    Returns:
+        str: Path or name of the ffmpeg executable
+    """
+    path = shutil.which("ffmpeg")
+    if path:
+        return path
+    try:
+        import imageio_ffmpeg
+        return imageio_ffmpeg.get_ffmpeg_exe()
+    except (ImportError, RuntimeError):
+        return "ffmpeg"
+
+def concat_videos(inputs, output):
+    """
+    Join videos that share codec settings with ffmpeg's concat demuxer.
+
+    Streams are copied, not re-encoded, so this is lossless and takes about
+    as long as copying the files.
+
+    Args:
+        inputs (list): Video files, in playback order
+        output (str): Path of the joined video
+
+    Returns:
+        bool: True if ffmpeg succeeded
+    """
+    with tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False) as list_file:
+        for path in inputs:
+            escaped = os.path.abspath(path).replace("'", "'\\''")
+            list_file.write(f"file '{escaped}'\n")
+    try:
+        completed = subprocess.run(
+            [ffmpeg_executable(), "-y", "-v", "error", "-f", "concat", "-safe", "0",
+             "-i", list_file.name, "-c", "copy", output],
+            capture_output=True, text=True,
+        )
+    except OSError as e:
+        print(f"✗ Could not run ffmpeg: {e}")
+        return False
+    finally:
+        os.remove(list_file.name)
+    if completed.returncode != 0:
+        print(f"✗ ffmpeg failed to join into {output}: {completed.stderr.strip()}")
+    return completed.returncode == 0
+
+def stitch_chunks(chunk_results, media_dir):
+    """
+    Combine the results of a split scene's chunks into one scene result.
+
+    When every chunk succeeded, their movies are concatenated losslessly
+    into the file a whole-scene render would have produced and the chunk
+    files are removed.
+
+    Args:
+        chunk_results (list): Results of all chunks of one scene
+        media_dir (str): manim's media directory for the scene
+
+    Returns:
+        dict: A result shaped like a whole-scene render result
+    """
+    chunk_results = sorted(chunk_results, key=lambda r: r["chunk"]["index"])
+    first = chunk_results[0]
+    result = {k: v for k, v in first.items() if k != "chunk"}
+    result.update(
+        label=first["label"].rsplit(" [part ", 1)[0],
+        elapsed=sum(r["elapsed"] for r in chunk_results),
+        started_at=min(r["started_at"] for r in chunk_results),
+        chunks=len(chunk_results),
+    )
+    usages = [r["usage"] for r in chunk_results if r.get("usage")]
+    if usages:
+        result["usage"] = {
+            "cpu_seconds": round(sum(u["cpu_seconds"] for u in usages), 3),
+            "peak_rss_bytes": max(u["peak_rss_bytes"] for u in usages),
+        }
+
+    failed = [r for r in chunk_results if r["returncode"] != 0]
+    if failed:
+        result.update(returncode=failed[0]["returncode"], log=failed[0]["log"],
+                      limit=failed[0].get("limit"))
+        return result
+
+    videos = []
+    for r in chunk_results:
+        outputs = find_scene_outputs(media_dir, r["module"], r["chunk"]["output_name"],
+                                     since=r["started_at"] - 2)
+        outputs = [path for path in outputs if path.endswith((".mp4", ".mov", ".webm"))]
+        # A chunk that starts past the scene's real last animation has no movie
+        if outputs:
+            videos.append(outputs[0])
+
+    if not videos:
+        print(f"✗ {result['label']}: no chunk produced a movie")
+        result["returncode"] = 1
+        return result
+
+    extension = os.path.splitext(videos[0])[1]
+    output = os.path.join(os.path.dirname(videos[0]), result["scene"] + extension)
+    if len(videos) == 1:
+        shutil.move(videos[0], output)
+    elif concat_videos(videos, output):
+        for path in videos:
+            os.remove(path)
+    else:
+        result["returncode"] = 1
+        return result
+
+    result["returncode"] = 0
+    return result
+
+def format_timestamp(seconds):
+    """Format seconds as a YouTube chapter timestamp, e.g. 0:00, 4:05, 1:02:03."""
+    seconds = int(seconds)
+    hours, rest = divmod(seconds, 3600)
+    minutes, seconds = divmod(rest, 60)
+    if hours:
+        return f"{hours}:{minutes:02d}:{seconds:02d}"
+    return f"{minutes}:{seconds:02d}"
+
+def assemble_episodes(results, order=None, output_dir=None):
+    """
+    Join each file's rendered scenes into one episode video.
+
+    Scene movies are concatenated with stream copy, so a draft cut costs no
+    re-encode. Next to each episode a chapter file lists every scene's start
+    time in the format YouTube descriptions use.
+
+    Args:
+        results (list): Results from render_scenes, in source order
+        order (list, optional): Scene names in the order they should appear.
+            Scenes not listed are left out. Defaults to source order.
+        output_dir (str, optional): Media directory; defaults to 'media' next
+            to each scene file. Episodes go to its 'episodes' subdirectory.
+
+    Returns:
+        list: Paths of the episodes that were written
+    """
+    by_file = {}
+    for result in results:
+        by_file.setdefault(result["file"], []).append(result)
+
+    episodes = []
+    for file_path, scenes in by_file.items():
+        if order:
+            named = {r["scene"]: r for r in scenes}
+            scenes = [named[name] for name in order if name in named]
+        clips = []
+        for r in scenes:
+            videos = [path for path in r.get("outputs", []) if path.endswith((".mp4", ".mov", ".webm"))]
+            if r["returncode"] != 0 or not videos:
+                print(f"Warning: Leaving {r['label']} out of the episode, it has no rendered movie")
+                continue
+            clips.append((r["scene"], videos[0]))
+        if not clips:
+            continue
+
+        module_name = os.path.splitext(os.path.basename(file_path))[0]
+        media_dir = os.path.abspath(output_dir) if output_dir else os.path.join(os.path.dirname(file_path), "media")
+        episode_dir = os.path.join(media_dir, "episodes")
+        os.makedirs(episode_dir, exist_ok=True)
+        episode = os.path.join(episode_dir, module_name + os.path.splitext(clips[0][1])[1])
+
+        print(f"Assembling {len(clips)} scene(s) into {episode}")
+        if not concat_videos([path for _, path in clips], episode):
+            continue
+
+        chapters = []
+        start = 0.0
+        for scene_class, path in clips:
+            chapters.append(f"{format_timestamp(start)} {scene_class}")
+            duration = probe_duration(path)
+            if duration is None:
+                print(f"Warning: Could not read the duration of {path}, chapters after it are missing")
+                break
+            start += duration
+        with open(os.path.splitext(episode)[0] + ".chapters.txt", "w") as f:
+            f.write("\n".join(chapters) + "\n")
+        episodes.append(episode)
+    return episodes
@@ -0,0 +1,335 @@
+"""
+Turning scene files into render jobs: duration estimates, scheduling, chunking and stills.
+"""
+import os
+import ast
+import fnmatch
+import math
+import hashlib
+import time
+
+from .discovery import find_scene_classes
+from .state import cache_key, scene_fingerprints
+
+# Durations manim uses when play()/wait() are called without one
+DEFAULT_RUN_TIME = 1.0
+DEFAULT_WAIT_TIME = 1.0
+
+# Number of recent renders kept per scene and quality in the timing database
+TIMING_HISTORY = 5
+
+def _constant_number(node):
+    """Return the value of a numeric literal node, or None."""
+    if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)) and not isinstance(node.value, bool):
+        return float(node.value)
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.USub):
+        value = _constant_number(node.operand)
+        return -value if value is not None else None
+    return None
+
+def _loop_count(node):
+    """Iterations of 'for ... in range(<literal>)' loops, 1 for anything else."""
+    if (isinstance(node, ast.For) and isinstance(node.iter, ast.Call)
+            and isinstance(node.iter.func, ast.Name) and node.iter.func.id == "range"):
+        numbers = [_constant_number(arg) for arg in node.iter.args]
+        if 1 <= len(numbers) <= 3 and None not in numbers:
+            if len(numbers) == 1:
+                start, stop, step = 0.0, numbers[0], 1.0
+            elif len(numbers) == 2:
+                start, stop, step = numbers[0], numbers[1], 1.0
+            else:
+                start, stop, step = numbers
+            if step:
+                return max(0, math.ceil((stop - start) / step))
+    return 1
+
+def _count_animation_calls(node, multiplier, counts):
+    """Accumulate self.play/self.wait calls below node into counts."""
+    if isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute):
+        target = node.func.value
+        if isinstance(target, ast.Name) and target.id == "self":
+            keywords = {kw.arg: kw.value for kw in node.keywords if kw.arg}
+            if node.func.attr == "play":
+                run_time = _constant_number(keywords.get("run_time"))
+                counts["plays"] += multiplier
+                counts["seconds"] += multiplier * (run_time if run_time is not None else DEFAULT_RUN_TIME)
+            elif node.func.attr == "wait":
+                duration = _constant_number(node.args[0]) if node.args else _constant_number(keywords.get("duration"))
+                counts["waits"] += multiplier
+                counts["seconds"] += multiplier * (duration if duration is not None else DEFAULT_WAIT_TIME)
+
+    child_multiplier = multiplier * _loop_count(node)
+    for child in ast.iter_child_nodes(node):
+        if isinstance(node, ast.For) and child is node.iter:
+            _count_animation_calls(child, multiplier, counts)
+        else:
+            _count_animation_calls(child, child_multiplier, counts)
+
+def estimate_scene_durations(file_path, scene_classes):
+    """
+    Estimate each scene's animation length from its source alone.
+
+    Counts self.play() and self.wait() calls in the scene class and its
+    local base classes, using literal run_time/duration arguments where
+    present and manim's defaults otherwise. Loops over range(<literal>)
+    multiply their body; other loops count once.
+
+    Args:
+        file_path (str): Path to the Manim Python file
+        scene_classes (list): Scene class names to estimate
+
+    Returns:
+        dict: Scene class name to {'plays', 'waits', 'seconds'}
+    """
+    with open(file_path, encoding="utf-8") as f:
+        tree = ast.parse(f.read(), filename=file_path)
+    classes = {node.name: node for node in tree.body if isinstance(node, ast.ClassDef)}
+
+    estimates = {}
+    for scene_class in scene_classes:
+        counts = {"plays": 0, "waits": 0, "seconds": 0.0}
+        pending = [scene_class]
+        seen = set()
+        while pending:
+            name = pending.pop()
+            if name in seen or name not in classes:
+                continue
+            seen.add(name)
+            for statement in classes[name].body:
+                _count_animation_calls(statement, 1, counts)
+            pending.extend(base.id for base in classes[name].bases if isinstance(base, ast.Name))
+        estimates[scene_class] = counts
+    return estimates
+
+def record_timing(timings, result, frames=None):
+    """
+    Add a finished render to the timing database.
+
+    Args:
+        timings (dict): Loaded timing database
+        result (dict): Successful render result
+        frames (int, optional): Frame count of the rendered output
+    """
+    key = cache_key(result["file"], result["scene"])
+    entry = timings.setdefault(key, {}).setdefault(result["quality"], [])
+    entry.append({
+        "duration": round(result["elapsed"], 3),
+        "frames": frames,
+        "recorded_at": time.time(),
+    })
+    del entry[:-TIMING_HISTORY]
+
+def schedule_jobs(jobs, timings):
+    """
+    Order jobs longest-processing-time first.
+
+    A job's expected duration is the median of its recorded renders at the
+    same quality. Scenes without history are estimated from their animation
+    length, converted to render seconds with the median seconds-per-animation
+    -second ratio of scenes that do have history at that quality.
+
+    Args:
+        jobs (list): Render jobs from plan_jobs
+        timings (dict): Loaded timing database
+
+    Returns:
+        list: The same jobs, each with an 'expected' duration, longest first
+    """
+    def median(values):
+        values = sorted(values)
+        middle = len(values) // 2
+        return values[middle] if len(values) % 2 else (values[middle - 1] + values[middle]) / 2
+
+    ratios = {}
+    for job in jobs:
+        history = timings.get(cache_key(job["file"], job["scene"]), {}).get(job["quality"])
+        if history:
+            job["expected"] = median([run["duration"] for run in history])
+            job["expected_from"] = "history"
+            if job["estimate"]["seconds"]:
+                ratios.setdefault(job["quality"], []).append(job["expected"] / job["estimate"]["seconds"])
+        else:
+            job["expected"] = None
+
+    for job in jobs:
+        if job["expected"] is None:
+            # Without calibration, treat one animation second as one render second
+            ratio = median(ratios[job["quality"]]) if job["quality"] in ratios else 1.0
+            job["expected"] = job["estimate"]["seconds"] * ratio
+            job["expected_from"] = "estimate"
+
+    # sorted() is stable, so equal estimates keep discovery order
+    return sorted(jobs, key=lambda job: job["expected"], reverse=True)
+
+# Scenes are only split when each chunk still gets this many animations, so
+# the cost of fast-forwarding through earlier ones stays small
+MIN_ANIMATIONS_PER_CHUNK = 8
+
+def split_jobs(jobs, max_chunks):
+    """
+    Split long scenes into chunks of consecutive animations.
+
+    Each chunk renders its range with manim's -n option: animations before
+    the range are played with skip_animations to fast-forward scene state,
+    and the scene ends early after the range. The last chunk is left open
+    ended, so an estimate that is too low never drops animations.
+
+    Args:
+        jobs (list): Scheduled render jobs
+        max_chunks (int): Upper bound on chunks per scene (0 or 1 = no split)
+
+    Returns:
+        list: Jobs with split scenes replaced by their chunks, longest first
+    """
+    if max_chunks <= 1:
+        return jobs
+
+    split = []
+    for job in jobs:
+        animations = job["estimate"]["plays"] + job["estimate"]["waits"]
+        count = min(max_chunks, animations // MIN_ANIMATIONS_PER_CHUNK)
+        if count <= 1:
+            split.append(job)
+            continue
+
+        bounds = [round(i * animations / count) for i in range(count + 1)]
+        for index in range(count):
+            output_name = f"{job['scene']}_part{index:02d}"
+            split.append(dict(
+                job,
+                label=f"{job['label']} [part {index + 1}/{count}]",
+                chunk={
+                    "index": index,
+                    "count": count,
+                    "from": bounds[index],
+                    # -n ranges are inclusive; the last chunk runs to the end
+                    "upto": bounds[index + 1] - 1 if index < count - 1 else None,
+                    "output_name": output_name,
+                },
+                expected=job["expected"] / count,
+                log=job["log"][:-len(".log")] + f".part{index:02d}.log" if job["log"] else None,
+            ))
+    return sorted(split, key=lambda job: job["expected"], reverse=True)
+
+# Scenes matching these names are thumbnails or end cards that only need
+# their final frame
+DEFAULT_STILL_PATTERNS = ("*Thumbnail*", "ThankYou")
+
+def is_still_scene(scene_class, estimate, patterns=DEFAULT_STILL_PATTERNS, detect=False):
+    """
+    Decide whether a scene only needs its last frame.
+
+    Args:
+        scene_class (str): Name of the Scene class
+        estimate (dict): The scene's entry from estimate_scene_durations
+        patterns (iterable): fnmatch patterns of scene names that are stills
+        detect (bool): Also treat scenes without any play()/wait() in their
+            own body as stills. Off by default: a scene that animates through
+            a mixin or a module-level helper has none either
+
+    Returns:
+        bool: True if the scene should be rendered as a PNG
+    """
+    if any(fnmatch.fnmatchcase(scene_class, pattern) for pattern in patterns):
+        return True
+    return detect and estimate["plays"] == 0 and estimate["waits"] == 0
+
+# Map quality options to CLI flags
+QUALITY_FLAGS = {
+    "low": "l",
+    "medium": "m",
+    "high": "h",
+    "production": "p",
+    "4k": "k"
+}
+
+def quality_to_flag(quality):
+    """
+    Convert a quality name or flag to manim's single-letter quality flag.
+
+    Args:
+        quality (str): One of QUALITY_FLAGS' keys or values
+
+    Returns:
+        str: Quality flag, 'h' if quality is not recognised
+    """
+    quality_flag = QUALITY_FLAGS.get(quality, quality)
+    if len(quality_flag) > 1 or quality_flag not in QUALITY_FLAGS.values():
+        print(f"Warning: Invalid quality '{quality}', using 'high' quality")
+        quality_flag = "h"
+    return quality_flag
+
+def plan_jobs(files, quality_flag, discovery="ast", log_dir=None, still_patterns=DEFAULT_STILL_PATTERNS,
+              detect_stills=False, still_quality_flag=None):
+    """
+    Discover every scene in the given files and turn each into a render job.
+
+    Each job renders from its own file's directory, so relative asset paths
+    resolve as they do for a manual 'manim' run there, and uses the manim.cfg
+    next to that file when there is one. Stills (see is_still_scene) are
+    rendered with animations skipped, saving only the last frame as a PNG.
+
+    Args:
+        files (list): Python files to search for scenes
+        quality_flag (str): Single-letter manim quality flag
+        discovery (str): Scene discovery mode passed to find_scene_classes
+        log_dir (str, optional): Root directory for per-scene log files
+        still_patterns (iterable): Scene name patterns rendered as stills
+        detect_stills (bool): Also render scenes without animations as stills
+        still_quality_flag (str, optional): Quality flag for stills, defaults
+            to quality_flag
+
+    Returns:
+        list: Job dicts in file order, then source order within a file. Each
+        holds the options it was planned with under 'planning'.
+    """
+    still_patterns = tuple(still_patterns)
+    # Kept with every job, so the catalog can plan its scene the same way again
+    planning = {"quality_flag": quality_flag, "discovery": discovery, "still_patterns": list(still_patterns),
+                "detect_stills": detect_stills, "still_quality_flag": still_quality_flag}
+    jobs = []
+    for file_path in files:
+        scene_classes = find_scene_classes(file_path, discovery)
+        if not scene_classes:
+            continue
+
+        cwd = os.path.dirname(file_path)
+        module_name = os.path.splitext(os.path.basename(file_path))[0]
+        config_file = os.path.join(cwd, "manim.cfg")
+        if not os.path.isfile(config_file):
+            config_file = None
+        dependencies = {}
+        fingerprints = scene_fingerprints(file_path, scene_classes, quality_flag, asset_root=cwd,
+                                          config_files=[config_file] if config_file else [],
+                                          dependencies=dependencies)
+        estimates = estimate_scene_durations(file_path, scene_classes)
+        label_prefix = os.path.relpath(file_path)
+
+        for scene_class in scene_classes:
+            fingerprint = fingerprints.get(scene_class)
+            estimate = estimates[scene_class]
+            still = is_still_scene(scene_class, estimate, still_patterns, detect_stills)
+            job_quality = quality_flag
+            if still:
+                job_quality = still_quality_flag or quality_flag
+                # A still costs one frame, whatever play()/wait() it contains
+                estimate = {"plays": 0, "waits": 0, "seconds": 0.0}
+                if fingerprint:
+                    fingerprint = hashlib.sha256(f"{fingerprint}:still:{job_quality}".encode()).hexdigest()
+
+            jobs.append({
+                "file": file_path,
+                "scene": scene_class,
+                "label": f"{label_prefix}::{scene_class}" if len(files) > 1 else scene_class,
+                "module": module_name,
+                "cwd": cwd,
+                "config_file": config_file,
+                "quality": job_quality,
+                "still": still,
+                "fingerprint": fingerprint,
+                "dependencies": sorted(dependencies.get(scene_class, ())),
+                "estimate": estimate,
+                "log": os.path.join(log_dir, module_name, f"{scene_class}.log") if log_dir else None,
+                "planning": planning,
+            })
+    return jobs
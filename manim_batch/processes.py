@@ -0,0 +1,319 @@
+"""
+Rendering a scene in its own manim process, under CPU, memory and time limits.
+"""
+import os
+import sys
+import time
+import threading
+import signal
+import subprocess
+
+from .discovery import project_import_path
+
+def build_scene_command(job, play=False, output_dir=None):
+    """
+    Build the manim CLI command that renders a single scene.
+
+    The command is meant to run with the job's directory as working
+    directory, so it refers to the scene file by its base name.
+
+    Args:
+        job (dict): Render job from plan_jobs
+        play (bool): Whether to play the animation after rendering
+        output_dir (str, optional): Directory to save output files
+
+    Returns:
+        list: The command as an argument list for subprocess
+    """
+    cmd = ["manim"]
+    chunk = job.get("chunk")
+    if play and not chunk:
+        cmd.append("-p")
+    cmd.append(f"-q{job['quality']}")
+
+    if chunk:
+        upto = "" if chunk["upto"] is None else f",{chunk['upto']}"
+        cmd.extend(["-n", f"{chunk['from']}{upto}", "-o", chunk["output_name"]])
+    elif job.get("still"):
+        # Skip every animation and write only the final frame, named after
+        # the scene rather than with manim's version suffix
+        cmd.extend(["-s", "-o", job["scene"]])
+
+    if job["config_file"]:
+        cmd.extend(["--config_file", os.path.relpath(job["config_file"], job["cwd"])])
+
+    if output_dir:
+        # manim calls its output root the media directory
+        cmd.extend(["--media_dir", os.path.abspath(output_dir)])
+
+    cmd.append(os.path.basename(job["file"]))
+    cmd.append(job["scene"])
+    return cmd
+
+def usage_fields(usage, cpu_before=0.0):
+    """Convert a resource usage struct into CPU seconds and peak RSS bytes."""
+    # ru_maxrss is in kilobytes on Linux but in bytes on macOS
+    scale = 1 if sys.platform == "darwin" else 1024
+    return {
+        "cpu_seconds": round(usage.ru_utime + usage.ru_stime - cpu_before, 3),
+        "peak_rss_bytes": usage.ru_maxrss * scale,
+    }
+
+def parse_size(text):
+    """
+    Parse a byte size such as '4G', '512M' or '1500000'.
+
+    Args:
+        text (str): Number of bytes, optionally with a K, M, G or T suffix
+            (powers of 1024)
+
+    Returns:
+        int: Size in bytes
+    """
+    text = text.strip().upper().rstrip("B")
+    units = "KMGT"
+    if text and text[-1] in units:
+        return int(float(text[:-1]) * 1024 ** (units.index(text[-1]) + 1))
+    return int(text)
+
+def process_stats(pid):
+    """
+    Read a running process's CPU seconds and resident memory from /proc.
+
+    Returns:
+        tuple: (cpu_seconds, rss_bytes), or None where /proc is unavailable
+    """
+    try:
+        with open(f"/proc/{pid}/stat") as stat_file:
+            # Fields after the parenthesised command name, which may contain spaces
+            fields = stat_file.read().rsplit(")", 1)[1].split()
+    except (OSError, IndexError):
+        return None
+    ticks = os.sysconf("SC_CLK_TCK")
+    return (int(fields[11]) + int(fields[12])) / ticks, int(fields[21]) * os.sysconf("SC_PAGE_SIZE")
+
+# How each kind of resource limit shows up in the summary
+LIMIT_DESCRIPTIONS = {
+    "memory": "over the memory limit",
+    "cpu-time": "over the CPU time limit",
+    "wall-time": "timed out",
+    "killed": "killed by the system, likely out of memory",
+}
+
+class ResourceLimits:
+    """
+    Per-job caps on memory, CPU time and wall-clock time.
+
+    The caps are enforced by polling the job's process and killing it once
+    it goes over, so they work the same for manim processes and for warm
+    workers. Memory and CPU time are read from /proc and are only enforced
+    on Linux; the wall-clock timeout works everywhere.
+    """
+
+    def __init__(self, memory=None, cpu_time=None, wall_time=None):
+        self.memory = memory
+        self.cpu_time = cpu_time
+        self.wall_time = wall_time
+
+    def __bool__(self):
+        return bool(self.memory or self.cpu_time or self.wall_time)
+
+    def check(self, pid, start, cpu_before=0.0):
+        """
+        Check a running job against the limits.
+
+        Args:
+            pid (int): Process running the job
+            start (float): time.monotonic() when the job started
+            cpu_before (float): CPU seconds the process had used before the job
+
+        Returns:
+            str: The key of the exceeded limit in LIMIT_DESCRIPTIONS, or None
+        """
+        if self.wall_time and time.monotonic() - start > self.wall_time:
+            return "wall-time"
+        if self.memory or self.cpu_time:
+            stats = process_stats(pid)
+            if stats:
+                cpu_seconds, rss = stats
+                if self.memory and rss > self.memory:
+                    return "memory"
+                if self.cpu_time and cpu_seconds - cpu_before > self.cpu_time:
+                    return "cpu-time"
+        return None
+
+def job_cpu_set(slot, threads):
+    """
+    Pick the cores for the job running in a parallel slot.
+
+    Slots get consecutive, non-overlapping groups of cores for as long as
+    there are enough of them.
+
+    Args:
+        slot (int): Index of the parallel slot running the job
+        threads (int): Cores per job (0 = no limit)
+
+    Returns:
+        set: Core numbers, or None when not limiting or the platform has no
+            CPU affinity
+    """
+    if not threads or not hasattr(os, "sched_getaffinity"):
+        return None
+    cores = sorted(os.sched_getaffinity(0))
+    return {cores[(slot * threads + i) % len(cores)] for i in range(min(threads, len(cores)))}
+
+def thread_limit_env(threads):
+    """Environment variables capping the thread pools of numpy's math libraries."""
+    return {name: str(threads) for name in
+            ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS", "NUMEXPR_NUM_THREADS")}
+
+def limit_to_cpus(pid, cpus):
+    """Pin a process to cores. libavcodec sizes its encoder threads from this mask."""
+    try:
+        os.sched_setaffinity(pid, cpus)
+    except OSError:
+        pass  # Already exited
+
+def _wait_for_process(process, cancel=None, limits=None, start=None):
+    """
+    Wait for a child process, killing it early if cancel gets set or it
+    goes over its resource limits.
+
+    Where the platform has os.wait4 the child is reaped with it, which also
+    reports how much CPU time and memory the child used.
+
+    Args:
+        process (subprocess.Popen): The child to wait for
+        cancel (threading.Event, optional): Kills the child when set
+        limits (ResourceLimits, optional): Kills the child when exceeded
+        start (float, optional): time.monotonic() when the child started
+
+    Returns:
+        tuple: (return code, whether it was cancelled, usage dict or None,
+            key of the exceeded limit or None)
+    """
+    cancelled = False
+    limit = None
+    while True:
+        if not (cancelled or limit):
+            if cancel is not None and cancel.is_set():
+                process.kill()
+                cancelled = True
+            elif limits:
+                limit = limits.check(process.pid, start)
+                if limit:
+                    process.kill()
+        blocking = (cancel is None and not limits) or cancelled or limit
+        if hasattr(os, "wait4"):
+            pid, status, usage = os.wait4(process.pid, 0 if blocking else os.WNOHANG)
+            if pid:
+                process.returncode = os.waitstatus_to_exitcode(status)
+                usage = usage_fields(usage)
+                break
+            time.sleep(0.2)
+        else:
+            try:
+                process.wait(timeout=None if blocking else 0.2)
+                usage = None
+                break
+            except subprocess.TimeoutExpired:
+                pass
+
+    if not (cancelled or limit) and process.returncode == -signal.SIGKILL:
+        # Nobody here killed it, which usually means the kernel's OOM killer did
+        limit = "killed"
+    return process.returncode, cancelled, usage, limit
+
+def render_scene(job, cmd, log_path=None, cancel=None, limits=None, cpus=None, niceness=0):
+    """
+    Run a single manim render and capture its exit status.
+
+    Args:
+        job (dict): Render job from plan_jobs
+        cmd (list): The manim command to run
+        log_path (str, optional): File that receives the render's stdout/stderr.
+            When omitted the output goes straight to the terminal.
+        cancel (threading.Event, optional): Kills the render when set
+        limits (ResourceLimits, optional): Kills the render when exceeded
+        cpus (set, optional): Cores the render is pinned to; numpy's thread
+            pools are capped to the same number of threads
+        niceness (int): How much to lower the render's scheduling priority
+
+    Returns:
+        dict: The job extended with return code, elapsed seconds and log path.
+            'cancelled' is True if the render was killed through cancel.
+            'usage' holds manim's CPU seconds and peak RSS when known.
+            'limit' names the resource limit it was killed for, if any.
+    """
+    started_at = time.time()
+    start = time.monotonic()
+    cancelled = False
+    usage = None
+    limit = None
+    log_file = None
+    try:
+        if log_path:
+            os.makedirs(os.path.dirname(log_path), exist_ok=True)
+            log_file = open(log_path, "w")
+        env = dict(os.environ, **thread_limit_env(len(cpus))) if cpus else dict(os.environ)
+        # Shared modules are imported from the project root; manim adds only the file's directory
+        import_path = project_import_path(job["file"])[1:] + [env.get("PYTHONPATH", "")]
+        env["PYTHONPATH"] = os.pathsep.join(filter(None, import_path))
+        process = subprocess.Popen(cmd, cwd=job["cwd"], stdout=log_file, env=env,
+                                   stderr=subprocess.STDOUT if log_file else None)
+        if cpus:
+            limit_to_cpus(process.pid, cpus)
+        if niceness and hasattr(os, "setpriority"):
+            try:
+                os.setpriority(os.PRIO_PROCESS, process.pid, os.getpriority(os.PRIO_PROCESS, 0) + niceness)
+            except OSError:
+                pass  # Already exited
+        returncode, cancelled, usage, limit = _wait_for_process(process, cancel, limits, start)
+        if limit and log_file:
+            log_file.write(f"\nmanim was {LIMIT_DESCRIPTIONS[limit]}\n")
+    except OSError as e:
+        # manim is not on PATH or could not be started at all
+        print(f"✗ Could not start manim for {job['label']}: {e}")
+        returncode = -1
+    finally:
+        if log_file:
+            log_file.close()
+
+    return dict(
+        job,
+        returncode=returncode,
+        elapsed=time.monotonic() - start,
+        started_at=started_at,
+        log=log_path,
+        cancelled=cancelled,
+        usage=usage,
+        limit=limit,
+    )
+
+def render_with_retries(job, render, retries=0, retry_backoff=5.0, cancel=None):
+    """
+    Render a job, retrying failed renders with exponential backoff.
+
+    Args:
+        job (dict): The job, for messages
+        render (callable): Renders the job once and returns its result
+        retries (int): How many times to retry a failed render
+        retry_backoff (float): Seconds before the first retry, doubled for
+            every further one
+        cancel (threading.Event, optional): Stops retrying when set
+
+    Returns:
+        dict: The last attempt's result, with the number of 'attempts'
+    """
+    for attempt in range(1, retries + 2):
+        result = render()
+        result["attempts"] = attempt
+        if result["returncode"] == 0 or result.get("cancelled") or attempt > retries:
+            return result
+        delay = retry_backoff * 2 ** (attempt - 1)
+        reason = LIMIT_DESCRIPTIONS.get(result["limit"], f"exit {result['returncode']}")
+        print(f"↻ {job['label']} failed ({reason}), retrying in {delay:g}s "
+              f"(attempt {attempt + 1}/{retries + 1})")
+        if (cancel or threading.Event()).wait(delay):
+            return result
+    return result
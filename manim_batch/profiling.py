@@ -0,0 +1,214 @@
+"""
+Timing every play() and wait() call of a scene to find the slow ones.
+"""
+import os
+import sys
+import shutil
+import tempfile
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from .benchmark import timed_internals
+from .discovery import expand_scene_paths
+from .planning import plan_jobs, quality_to_flag
+from .state import DEFAULT_STATE_DIR, cache_key, save_state_file
+from .warm import WarmWorkerPool, redirect_output, scene_environment
+
+def _animation_names(args):
+    """Name the animations passed to Scene.play, e.g. 'Dot.animate' for builders."""
+    names = []
+    for arg in args:
+        name = type(arg).__name__
+        if name == "_AnimationBuilder":
+            name = f"{type(arg.mobject).__name__}.animate"
+        names.append(name)
+    return names
+
+def _family_size(args):
+    """Count the mobjects, submobjects included, that Scene.play animates."""
+    size = 0
+    for arg in args:
+        mobject = getattr(arg, "mobject", None)
+        if mobject is not None and hasattr(mobject, "get_family"):
+            size += len(mobject.get_family())
+    return size
+
+def profile_in_process(job, output_dir, log_path=None, cprofile_path=None):
+    """
+    Render a scene and time each of its play() and wait() calls.
+
+    Every call records the line of the scene file it came from, the
+    animations, how many mobjects they move, the frames written and how its
+    time splits between interpolation (updaters and animation code),
+    rasterization and encoding (see timed_internals). Encoding runs on
+    manim's writer thread, so a call's share of it is approximate. Caching
+    is turned off so every call is rendered.
+
+    Args:
+        job (dict): Render job from plan_jobs
+        output_dir (str): Directory to save output files
+        log_path (str, optional): File that receives manim's output
+        cprofile_path (str, optional): Also run the whole render under
+            cProfile and dump its stats here
+
+    Returns:
+        dict: 'returncode', and on success 'calls', one dict per call in order
+    """
+    with redirect_output(log_path):
+        try:
+            with scene_environment(job, output_dir) as scene_class:
+                from manim import Scene, config
+
+                config.disable_caching = True
+                calls = []
+                depth = 0
+                original_play, original_wait = Scene.play, Scene.wait
+
+                def profiled(method, kind):
+                    def wrapper(self, *args, **kwargs):
+                        nonlocal depth
+                        # wait() goes through play(); only the outer call counts
+                        if depth:
+                            return method(self, *args, **kwargs)
+                        frame = sys._getframe(1)
+                        while frame is not None and frame.f_code.co_filename != job["file"]:
+                            frame = frame.f_back
+                        before = dict(timers)
+                        depth += 1
+                        start = time.perf_counter()
+                        try:
+                            return method(self, *args, **kwargs)
+                        finally:
+                            seconds = time.perf_counter() - start
+                            depth -= 1
+                            delta = {key: timers[key] - before[key] for key in timers}
+                            calls.append({
+                                "index": len(calls),
+                                "line": frame.f_lineno if frame else None,
+                                "function": frame.f_code.co_name if frame else None,
+                                "kind": kind,
+                                "animations": _animation_names(args) if kind == "play" else ["Wait"],
+                                "family_size": _family_size(args) if kind == "play" else 0,
+                                "frames": delta["frames"],
+                                "seconds": round(seconds, 4),
+                                "interpolate_seconds": round(seconds - delta["rasterize"] - delta["writer"], 4),
+                                "rasterize_seconds": round(delta["rasterize"], 4),
+                                "encode_seconds": round(delta["encode"], 4),
+                            })
+                    return wrapper
+
+                profiler = None
+                if cprofile_path:
+                    import cProfile
+                    profiler = cProfile.Profile()
+                Scene.play = profiled(original_play, "play")
+                Scene.wait = profiled(original_wait, "wait")
+                try:
+                    with timed_internals() as timers:
+                        if profiler:
+                            profiler.enable()
+                        try:
+                            scene_class().render()
+                        finally:
+                            if profiler:
+                                profiler.disable()
+                finally:
+                    Scene.play, Scene.wait = original_play, original_wait
+                if profiler:
+                    os.makedirs(os.path.dirname(cprofile_path) or ".", exist_ok=True)
+                    profiler.dump_stats(cprofile_path)
+            return {"returncode": 0, "calls": calls}
+        except Exception:
+            traceback.print_exc()
+            return {"returncode": 1}
+
+def profile_scenes(paths, quality="low", jobs=1, discovery="ast", state_dir=DEFAULT_STATE_DIR,
+                   top=10, cprofile_dir=None):
+    """
+    Profile every play() and wait() call of the given scenes and rank them.
+
+    Scenes are rendered in warm worker processes into a temporary directory
+    (see profile_in_process). Each scene's calls are printed slowest first
+    and saved in full as JSON under profiles/ in the state directory.
+
+    Args:
+        paths (str or list): Manim Python files, directories or glob patterns
+        quality (str): Quality to render at
+        jobs (int): Number of scenes to profile at the same time (0 = one per core);
+            more than one skews the timings
+        discovery (str): Scene discovery mode passed to find_scene_classes
+        state_dir (str): Directory holding the reports and logs
+        top (int): Calls to print per scene (0 = all of them)
+        cprofile_dir (str, optional): Also dump cProfile stats per scene here,
+            for pstats, snakeviz or a flame graph tool such as flameprof
+
+    Returns:
+        list: One result dict per scene with its 'calls' for those that ran
+    """
+    if isinstance(paths, str):
+        paths = [paths]
+    quality_flag = quality_to_flag(quality)
+    log_dir = os.path.join(state_dir, "logs", "profile")
+    report_dir = os.path.join(state_dir, "profiles")
+    all_jobs = []
+    for job in plan_jobs(expand_scene_paths(paths), quality_flag, discovery, log_dir,
+                         still_patterns=(), detect_stills=False):
+        cprofile_path = None
+        if cprofile_dir:
+            cprofile_path = os.path.abspath(os.path.join(cprofile_dir, f"{job['module']}.{job['scene']}.prof"))
+        all_jobs.append(dict(job, profile=True, still=False, cprofile_path=cprofile_path))
+    if not all_jobs:
+        print("No Scene classes found")
+        return []
+
+    if jobs <= 0:
+        jobs = os.cpu_count() or 1
+    jobs = min(jobs, len(all_jobs))
+    print(f"Profiling {len(all_jobs)} scene(s) with {jobs} worker(s)...")
+
+    output_dir = tempfile.mkdtemp(prefix="manim_profile_")
+    results = {}
+    worker_pool = WarmWorkerPool(jobs, output_dir=output_dir)
+    try:
+        with ThreadPoolExecutor(max_workers=jobs) as pool:
+            futures = [pool.submit(worker_pool.render, job, job["log"]) for job in all_jobs]
+            for future in as_completed(futures):
+                result = future.result()
+                results[cache_key(result["file"], result["scene"])] = result
+    finally:
+        worker_pool.close()
+        shutil.rmtree(output_dir, ignore_errors=True)
+
+    ordered = [results[cache_key(job["file"], job["scene"])] for job in all_jobs]
+    for r in ordered:
+        if r["returncode"] != 0:
+            print(f"\n✗ {r['label']} failed (exit {r['returncode']}), see {r['log']}")
+            continue
+        calls = r["calls"]
+        report_path = os.path.join(report_dir, r["module"], f"{r['scene']}.json")
+        os.makedirs(os.path.dirname(report_path), exist_ok=True)
+        save_state_file(report_path, {"file": r["file"], "scene": r["scene"], "quality": r["quality"],
+                                      "calls": calls})
+
+        total = sum(call["seconds"] for call in calls) or 1.0
+        ranked = sorted(calls, key=lambda call: call["seconds"], reverse=True)
+        shown = ranked[:top] if top else ranked
+        print(f"\n{r['label']}: {len(calls)} call(s), {total:.2f}s (report: {report_path})")
+        print(f"  {'line':>5}  {'time':>7}  {'share':>5}  {'frames':>6}  {'family':>6}  "
+              f"{'interp':>7}  {'raster':>7}  {'encode':>7}  animations")
+        for call in shown:
+            counts = {}
+            for name in call["animations"]:
+                counts[name] = counts.get(name, 0) + 1
+            animations = ", ".join(f"{count}x {name}" if count > 1 else name for name, count in counts.items())
+            if len(animations) > 50:
+                animations = animations[:47] + "..."
+            print(f"  {call['line'] or '?':>5}  {call['seconds']:>6.2f}s  {call['seconds'] / total:>5.0%}  "
+                  f"{call['frames']:>6}  {call['family_size']:>6}  {call['interpolate_seconds']:>6.2f}s  "
+                  f"{call['rasterize_seconds']:>6.2f}s  {call['encode_seconds']:>6.2f}s  {animations}")
+        if len(shown) < len(ranked):
+            print(f"  ... {len(ranked) - len(shown)} faster call(s) in the report")
+        if r.get("cprofile_path"):
+            print(f"  cProfile stats: {r['cprofile_path']}")
+    return ordered
@@ -0,0 +1,653 @@
+"""
+Rendering batches of scenes: the cache-aware main loop, --watch and --promote.
+"""
+import os
+import heapq
+import itertools
+import time
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from .catalog import OutputCatalog
+from .discovery import expand_scene_paths
+from .dry_run import apply_dry_run_plans
+from .events import EventStream
+from .farm import coordinate_farm
+from .media import check_output_integrity, find_scene_outputs, probe_frame_count, stitch_chunks
+from .planning import (
+    DEFAULT_STILL_PATTERNS, plan_jobs, quality_to_flag, record_timing, schedule_jobs, split_jobs,
+)
+from .processes import (
+    LIMIT_DESCRIPTIONS, build_scene_command, job_cpu_set, render_scene, render_with_retries,
+)
+from .segments import job_workspace, workspace_result
+from .state import (
+    DEFAULT_STATE_DIR, RenderJournal, cache_entry, cache_key, is_cached, job_media_dir,
+    load_state_file, render_cache_key, save_state_file,
+)
+from .tex import precompile_tex
+from .warm import WarmWorkerPool
+
+def print_summary(results):
+    """
+    Print a per-scene summary table of a batch render.
+
+    Args:
+        results (list): Result dicts as returned by render_scene
+
+    Returns:
+        int: Number of scenes that failed
+    """
+    failed = [r for r in results if r["returncode"] != 0]
+    width = max(len(r["label"]) for r in results)
+
+    print("\nSummary:")
+    for r in results:
+        if r.get("cached"):
+            status = "cached"
+        elif r.get("resumed"):
+            status = "ok (earlier run)"
+        elif r["returncode"] == 0:
+            status = "ok"
+        elif r.get("limit"):
+            status = f"failed, {LIMIT_DESCRIPTIONS[r['limit']]}"
+        else:
+            status = f"failed (exit {r['returncode']})"
+        if r.get("attempts", 1) > 1:
+            status += f" after {r['attempts']} attempts"
+        line = f"  {r['label']:<{width}}  {r['elapsed']:7.1f}s  {status}"
+        if r["log"] and r["returncode"] != 0:
+            line += f"  see {r['log']}"
+        print(line)
+
+    limited = [r for r in failed if r.get("limit")]
+    if limited:
+        print("\nScenes stopped by resource limits:")
+        for r in limited:
+            print(f"  {r['label']}: {LIMIT_DESCRIPTIONS[r['limit']]}")
+
+    total = sum(r["elapsed"] for r in results)
+    cached = sum(1 for r in results if r.get("cached"))
+    print(f"{len(results) - len(failed) - cached}/{len(results)} scene(s) rendered, "
+          f"{cached} unchanged, {len(failed)} failed, {total:.1f}s of render time")
+    return len(failed)
+
+def render_scenes(paths, quality="high", play=False, output_dir=None, jobs=1, log_dir=None,
+                  discovery="ast", state_dir=DEFAULT_STATE_DIR, force=False, backend="cli",
+                  worker_max_scenes=0, split=0, still_patterns=DEFAULT_STILL_PATTERNS,
+                  detect_stills=False, still_quality=None, events=None, limits=None,
+                  threads_per_job=None, retries=0, retry_backoff=5.0, resume=False, farm=None,
+                  segment_store=None, tex_prepass=False):
+    """
+    Render all Scene classes in the given files using the Manim CLI.
+
+    Every scene of every file goes into one queue that is drained by a
+    single worker pool, so a slow file does not hold back the others.
+    
+    Args:
+        paths (str or list): Manim Python files, directories or glob patterns
+        quality (str): Quality flag for manim CLI ('l', 'm', 'h', 'p', 'k')
+        play (bool): Whether to play animations after rendering
+        output_dir (str, optional): Directory to save output files. Defaults
+            to a 'media' directory next to each scene file.
+        jobs (int): Number of scenes to render at the same time. 0 uses one
+            job per CPU core.
+        log_dir (str, optional): Directory for per-scene log files. Defaults to
+            'logs' inside state_dir. Only used when more than one job runs,
+            since parallel output would otherwise interleave on the terminal.
+        discovery (str): Scene discovery mode passed to find_scene_classes
+        state_dir (str): Directory holding the incremental render cache and
+            the timing database used to schedule the longest scenes first
+        force (bool): Render every scene even if its fingerprint is unchanged
+        backend (str): 'cli' starts one manim process per scene; 'warm' keeps
+            one long-lived worker process per job that imports manim once
+        worker_max_scenes (int): With the warm backend, restart a worker after
+            this many scenes (0 = never)
+        split (int): Render long scenes as up to this many chunks of
+            animations in parallel and join them losslessly (0 = off)
+        still_patterns (iterable): Scene name patterns rendered as a single
+            last-frame PNG instead of a movie
+        detect_stills (bool): Also render scenes without animations as stills
+        still_quality (str, optional): Quality for stills, defaults to quality
+        events (str, optional): JSON-lines file that receives a record for
+            every scene lifecycle event (see EventStream)
+        limits (ResourceLimits, optional): Memory, CPU time and wall-clock
+            caps for each render job
+        threads_per_job (int, optional): Cores each job is pinned to, which
+            also caps the encoder's and numpy's threads. Defaults to an even
+            share of the cores when jobs run in parallel (0 = no limit).
+        retries (int): How many times to retry a failed job
+        retry_backoff (float): Seconds before the first retry, doubled for
+            every further one
+        resume (bool): Continue an interrupted run: reuse the jobs and chunks
+            recorded in the state directory's journal, and re-render cached
+            scenes whose outputs fail the integrity check
+        farm (str, optional): Instead of rendering here, queue the jobs in
+            this RenderQueue database and wait for farm_worker processes to
+            render them. jobs, backend, limits and retries then apply to the
+            workers' own options, not to this process.
+        segment_store (SegmentStore, optional): Shared store of partial movie
+            files that renders reuse animations from
+        tex_prepass (bool): Compile the literal MathTex and Tex strings of the
+            files with scenes to render in one LaTeX run per file first (see
+            precompile_tex)
+
+    Returns:
+        list: One result dict per scene, in discovery order
+    """
+    if isinstance(paths, str):
+        paths = [paths]
+    quality_flag = quality_to_flag(quality)
+    if log_dir is None:
+        log_dir = os.path.join(state_dir, "logs")
+
+    # Find all scene classes
+    all_jobs = plan_jobs(expand_scene_paths(paths), quality_flag, discovery, log_dir, still_patterns,
+                         detect_stills, quality_to_flag(still_quality) if still_quality else None)
+    
+    if not all_jobs:
+        print("No Scene classes found")
+        return []
+
+    # Skip scenes whose fingerprint matches an output that is still on disk
+    cache_path = os.path.join(state_dir, "render_cache.json")
+    cache = load_state_file(cache_path)
+    results = {}
+    pending = []
+    for job in all_jobs:
+        entry_key = render_cache_key(job, output_dir)
+        if not force and is_cached(cache, entry_key, job["fingerprint"]):
+            if resume and not all(check_output_integrity(path) for path in cache[entry_key]["outputs"]):
+                print(f"✗ {job['label']}: cached output is corrupt, rendering it again")
+                pending.append(job)
+                continue
+            results[cache_key(job["file"], job["scene"])] = dict(
+                job, returncode=0, elapsed=0.0, log=None, cached=True, outputs=cache[entry_key]["outputs"])
+        else:
+            pending.append(job)
+
+    # Measured animation counts and lengths from --dry-run beat the source-based estimate
+    apply_dry_run_plans(pending, load_state_file(os.path.join(state_dir, "plans.json")))
+
+    # Start the longest scenes first so one of them cannot end up running alone at the end
+    timings_path = os.path.join(state_dir, "timings.json")
+    timings = load_state_file(timings_path)
+    pending = schedule_jobs(pending, timings)
+    event_stream = EventStream(events) if events else None
+    if event_stream:
+        for job in pending:
+            event_stream.queue(job)
+    journal = RenderJournal(os.path.join(state_dir, "journal.jsonl"), resume)
+    catalog = OutputCatalog(os.path.join(state_dir, "catalog.db"))
+    chunk_results = {}
+
+    def record(result):
+        key = cache_key(result["file"], result["scene"])
+        media_dir = job_media_dir(result, output_dir)
+        if result.get("chunk"):
+            if result["returncode"] == 0 and not result.get("resumed"):
+                chunk_outputs = find_scene_outputs(media_dir, result["module"],
+                                                   result["chunk"]["output_name"],
+                                                   since=result["started_at"] - 2)
+                if chunk_outputs:
+                    journal.record(result, chunk_outputs)
+            # Wait for the scene's last chunk, then join them into one result
+            done = chunk_results.setdefault(key, [])
+            done.append(result)
+            if len(done) < result["chunk"]["count"]:
+                return
+            result = stitch_chunks(done, media_dir)
+            result["resumed"] = all(r.get("resumed") for r in done)
+        results[key] = result
+        if result["returncode"] != 0:
+            if event_stream:
+                event_stream.finish(result)
+            return
+        # Allow for coarse filesystem timestamps when matching new outputs
+        outputs = find_scene_outputs(media_dir, result["module"], result["scene"],
+                                     since=result["started_at"] - 2)
+        result["outputs"] = outputs
+        frames = probe_frame_count(outputs[0]) if outputs else None
+        if not result.get("resumed"):
+            record_timing(timings, result, frames)
+            save_state_file(timings_path, timings)
+            if outputs:
+                journal.record(result, outputs)
+                catalog.record(result, outputs, media_dir)
+        if event_stream:
+            event_stream.finish(result, frames, outputs)
+        if outputs:
+            cache[render_cache_key(result, output_dir)] = cache_entry(result, outputs)
+            save_state_file(cache_path, cache)
+
+    def resumed(jobs):
+        """Take the jobs an interrupted run already completed out of jobs."""
+        remaining = []
+        for job in jobs:
+            entry = journal.completed(job) if resume else None
+            if entry:
+                record(dict(job, returncode=0, elapsed=entry["elapsed"], started_at=entry["started_at"],
+                            log=None, resumed=True))
+            else:
+                remaining.append(job)
+        return remaining
+
+    # Whole scenes first, so a finished split scene is not taken apart into chunks again
+    pending = resumed(pending)
+    scene_count = len(pending)
+    pending = resumed(split_jobs(pending, split))
+    if resume:
+        print(f"Resuming: {sum(1 for r in results.values() if r.get('resumed'))} "
+              f"scene(s) and {sum(len(done) for done in chunk_results.values())} chunk(s) "
+              f"completed by the interrupted run")
+
+    if jobs <= 0:
+        jobs = os.cpu_count() or 1
+    jobs = max(1, min(jobs, len(pending)))
+
+    # Render each scene
+    file_count = len({job["file"] for job in all_jobs})
+    cached = sum(1 for r in results.values() if r.get("cached"))
+    print(f"Found {len(all_jobs)} scene(s) in {file_count} file(s), {scene_count} to render "
+          f"({cached} unchanged):")
+    stills = [job["scene"] for job in pending if job.get("still")]
+    if stills:
+        print(f"Rendering {len(stills)} still(s) as last-frame PNGs: {', '.join(stills)}")
+    if len(pending) > scene_count:
+        print(f"Long scenes are split, giving {len(pending)} render job(s)")
+
+    if threads_per_job is None:
+        # Split the cores evenly so parallel encoders do not oversubscribe them
+        threads_per_job = max(1, (os.cpu_count() or 1) // jobs) if jobs > 1 else 0
+    if backend == "warm" and not farm:
+        worker_pool = WarmWorkerPool(jobs, play, output_dir, worker_max_scenes, limits, threads_per_job)
+    else:
+        worker_pool = None
+    slots = queue.Queue()
+    for slot in range(jobs):
+        slots.put(slot)
+
+    def render_direct(job, log_path):
+        if worker_pool:
+            return worker_pool.render(job, log_path)
+        slot = slots.get()
+        try:
+            return render_scene(job, build_scene_command(job, play, output_dir), log_path,
+                                limits=limits, cpus=job_cpu_set(slot, threads_per_job))
+        finally:
+            slots.put(slot)
+
+    def render_once(job, log_path):
+        with job_workspace(job, output_dir, segment_store) as render_job:
+            result = render_direct(render_job, log_path)
+            if segment_store and result["returncode"] == 0:
+                segment_store.publish(render_job)
+        return workspace_result(result, job)
+
+    def run(job, log_path=None):
+        if event_stream:
+            event_stream.start(job, log_path)
+        return render_with_retries(job, lambda: render_once(job, log_path), retries, retry_backoff)
+
+    try:
+        if tex_prepass and pending:
+            precompile_tex(pending, output_dir, jobs, log_dir, worker_pool)
+        if farm:
+            if pending:
+                coordinate_farm(pending, farm, output_dir, record, event_stream)
+        elif jobs == 1:
+            for i, job in enumerate(pending, 1):
+                print(f"[{i}/{len(pending)}] Rendering {job['label']}...")
+                result = run(job)
+                record(result)
+                if result["returncode"] == 0:
+                    print(f"✓ {job['label']} rendered successfully")
+                else:
+                    print(f"✗ Error rendering {job['label']}: exit status {result['returncode']}")
+        else:
+            print(f"Rendering with {jobs} parallel job(s), logs in {log_dir}")
+            with ThreadPoolExecutor(max_workers=jobs) as pool:
+                # Each thread only waits on its own manim process, so the pool
+                # size bounds how many renders run at once.
+                futures = [pool.submit(run, job, job["log"]) for job in pending]
+                for done, future in enumerate(as_completed(futures), 1):
+                    result = future.result()
+                    record(result)
+                    mark = "✓" if result["returncode"] == 0 else "✗"
+                    print(f"[{done}/{len(pending)}] {mark} {result['label']} "
+                          f"({result['elapsed']:.1f}s)")
+    finally:
+        if worker_pool:
+            worker_pool.close()
+        if event_stream:
+            event_stream.close()
+        journal.close()
+        catalog.close()
+
+    ordered = [results[cache_key(job["file"], job["scene"])] for job in all_jobs]
+    print_summary(ordered)
+    print("\nRendering complete!")
+    return ordered
+
+def _file_mtimes(paths):
+    """Modification times of paths; missing files map to None."""
+    mtimes = {}
+    for path in paths:
+        try:
+            mtimes[path] = os.path.getmtime(path)
+        except OSError:
+            mtimes[path] = None
+    return mtimes
+
+def _log_tail(log_path, lines=15):
+    """Last lines of a log file, for showing why a render failed."""
+    try:
+        with open(log_path, errors="replace") as f:
+            return "".join(f.readlines()[-lines:])
+    except OSError:
+        return ""
+
+def watch_scenes(paths, quality="low", output_dir=None, jobs=1, discovery="ast",
+                 state_dir=DEFAULT_STATE_DIR, backend="cli", interval=0.5):
+    """
+    Re-render scenes whenever their code or assets change, until interrupted.
+
+    Scene files, the local modules they import, their manim.cfg and any
+    referenced assets are polled for changes. When one changes, every scene
+    depending on it is fingerprinted again and only those whose fingerprint
+    moved are rendered, so editing one construct() re-renders one scene.
+    A render still running for a scene that changed again is cancelled and
+    restarted with the new code. Finished renders go into the OutputCatalog.
+
+    Args:
+        paths (str or list): Manim Python files, directories or glob patterns
+        quality (str): Quality for the previews (defaults to low)
+        output_dir (str, optional): Directory to save output files
+        jobs (int): Number of scenes to render at the same time (0 = one per core)
+        discovery (str): Scene discovery mode passed to find_scene_classes
+        state_dir (str): Directory for per-scene render logs
+        backend (str): 'cli' or 'warm', as for render_scenes
+        interval (float): Seconds between polls of the watched files
+    """
+    if isinstance(paths, str):
+        paths = [paths]
+    quality_flag = quality_to_flag(quality)
+    log_dir = os.path.join(state_dir, "logs")
+    if jobs <= 0:
+        jobs = os.cpu_count() or 1
+
+    def snapshot(previous):
+        files = expand_scene_paths(paths)
+        planned = {}
+        for job in plan_jobs(files, quality_flag, discovery, log_dir):
+            planned[cache_key(job["file"], job["scene"])] = job
+        # A file that fails to parse mid-edit yields no scenes; keep its old
+        # jobs so the next good save is compared against the last good state
+        found = {job["file"] for job in planned.values()}
+        for key, job in previous.items():
+            if job["file"] in files and job["file"] not in found:
+                planned[key] = job
+        watched = set(files)
+        for job in planned.values():
+            watched.update(job["dependencies"])
+        return planned, _file_mtimes(watched)
+
+    planned, mtimes = snapshot({})
+    catalog = OutputCatalog(os.path.join(state_dir, "catalog.db"))
+    print(f"Watching {len(planned)} scene(s) in {len(mtimes)} file(s) at {quality} quality, "
+          f"press Ctrl+C to stop")
+
+    if backend == "warm":
+        worker_pool = WarmWorkerPool(jobs, False, output_dir)
+        run = worker_pool.render
+    else:
+        worker_pool = None
+
+        def run(job, log_path=None, cancel=None):
+            return render_scene(job, build_scene_command(job, False, output_dir), log_path, cancel)
+
+    running = {}
+    pool = ThreadPoolExecutor(max_workers=jobs)
+    try:
+        while True:
+            time.sleep(interval)
+
+            # Report renders that finished since the last poll
+            for key, (future, _) in list(running.items()):
+                if not future.done():
+                    continue
+                del running[key]
+                result = future.result()
+                if result.get("cancelled"):
+                    continue
+                if result["returncode"] == 0:
+                    print(f"✓ {result['label']} ({result['elapsed']:.1f}s)")
+                    media_dir = job_media_dir(result, output_dir)
+                    outputs = find_scene_outputs(media_dir, result["module"], result["scene"],
+                                                 since=result["started_at"] - 2)
+                    if outputs:
+                        catalog.record(result, outputs, media_dir)
+                else:
+                    print(f"✗ {result['label']} failed (exit {result['returncode']}), see {result['log']}")
+                    print(_log_tail(result["log"]), end="")
+
+            if _file_mtimes(mtimes) == mtimes and set(expand_scene_paths(paths)) <= mtimes.keys():
+                continue
+
+            current, mtimes = snapshot(planned)
+
+            changed = [
+                job for key, job in current.items()
+                if key not in planned or planned[key]["fingerprint"] != job["fingerprint"]
+            ]
+            planned = current
+            for job in changed:
+                key = cache_key(job["file"], job["scene"])
+                if key in running:
+                    # The running render is for code that no longer exists
+                    print(f"• {job['label']} changed again, cancelling its render")
+                    running[key][1].set()
+                print(f"• {job['label']} changed, rendering")
+                cancel = threading.Event()
+                running[key] = (pool.submit(run, job, job["log"], cancel), cancel)
+    except KeyboardInterrupt:
+        print("\nStopping watch")
+    finally:
+        for _, cancel in running.values():
+            cancel.set()
+        pool.shutdown(wait=True)
+        if worker_pool:
+            worker_pool.close()
+        catalog.close()
+
+# Preview renders always go before final ones, which also run at lower CPU priority
+PREVIEW_TIER, FINAL_TIER = 0, 1
+FINAL_NICENESS = 10
+
+def tiered_render(paths, preview_quality="low", final_quality="high", output_dir=None, jobs=1,
+                  discovery="ast", state_dir=DEFAULT_STATE_DIR, backend="cli", interval=1.0):
+    """
+    Render every scene as a quick preview first, then promote it to final quality.
+
+    Previews of all scenes are queued ahead of any final render. A scene's
+    final render is queued once its preview succeeds and runs with a lower
+    CPU priority (CLI backend), so previews of other scenes still get the
+    machine first. While the batch runs, scene files and their dependencies
+    are polled like in watch_scenes: when a scene changes, its queued or
+    running renders are cancelled and it starts over with a new preview.
+    Both tiers are recorded in the OutputCatalog, and in the render cache
+    under their own quality (see render_cache_key): scenes whose final
+    output is already cached at their current fingerprint are skipped, and
+    ones with a current preview are promoted straight away.
+
+    Args:
+        paths (str or list): Manim Python files, directories or glob patterns
+        preview_quality (str): Quality of the first pass
+        final_quality (str): Quality scenes are promoted to
+        output_dir (str, optional): Directory to save output files
+        jobs (int): Number of renders to run at the same time (0 = one per core)
+        discovery (str): Scene discovery mode passed to find_scene_classes
+        state_dir (str): Directory holding the render cache and logs
+        backend (str): 'cli' or 'warm', as for render_scenes
+        interval (float): Seconds between polls of the scene files
+
+    Returns:
+        list: One final result dict per scene, in discovery order
+    """
+    if isinstance(paths, str):
+        paths = [paths]
+    preview_flag, final_flag = quality_to_flag(preview_quality), quality_to_flag(final_quality)
+    log_dir = os.path.join(state_dir, "logs")
+    if jobs <= 0:
+        jobs = os.cpu_count() or 1
+    cache_path = os.path.join(state_dir, "render_cache.json")
+    cache = load_state_file(cache_path)
+    catalog = OutputCatalog(os.path.join(state_dir, "catalog.db"))
+
+    def snapshot(previous):
+        files = expand_scene_paths(paths)
+        planned = {}
+        for tier, flag, tier_log_dir in ((PREVIEW_TIER, preview_flag, os.path.join(log_dir, "preview")),
+                                         (FINAL_TIER, final_flag, log_dir)):
+            for job in plan_jobs(files, flag, discovery, tier_log_dir):
+                planned.setdefault(cache_key(job["file"], job["scene"]), {})[tier] = job
+        # Keep the last good jobs of a file that fails to parse mid-edit
+        found = {tiers[FINAL_TIER]["file"] for tiers in planned.values()}
+        for key, tiers in previous.items():
+            if tiers[FINAL_TIER]["file"] in files and tiers[FINAL_TIER]["file"] not in found:
+                planned[key] = tiers
+        watched = set(files)
+        for tiers in planned.values():
+            watched.update(tiers[FINAL_TIER]["dependencies"])
+        return planned, _file_mtimes(watched)
+
+    if backend == "warm":
+        worker_pool = WarmWorkerPool(jobs, False, output_dir)
+    else:
+        worker_pool = None
+
+    heap = []
+    order = itertools.count()
+    condition = threading.Condition()
+    stopping = threading.Event()
+    finished = queue.Queue()
+    active = {}
+    outstanding = 0
+
+    def submit(tier, job):
+        nonlocal outstanding
+        cancel = threading.Event()
+        active.setdefault(cache_key(job["file"], job["scene"]), {})[tier] = cancel
+        outstanding += 1
+        with condition:
+            # Within a tier, longest scenes first
+            heapq.heappush(heap, (tier, -job["estimate"]["seconds"], next(order), job, cancel))
+            condition.notify()
+
+    def work():
+        while True:
+            with condition:
+                while not heap and not stopping.is_set():
+                    condition.wait()
+                if stopping.is_set():
+                    return
+                tier, _, _, job, cancel = heapq.heappop(heap)
+            if cancel.is_set():
+                finished.put((tier, job, cancel, None))
+                continue
+            if worker_pool:
+                result = worker_pool.render(job, job["log"], cancel)
+            else:
+                result = render_scene(job, build_scene_command(job, False, output_dir), job["log"], cancel,
+                                      niceness=FINAL_NICENESS if tier == FINAL_TIER else 0)
+            finished.put((tier, job, cancel, result))
+
+    planned, mtimes = snapshot({})
+    finals = {}
+    promoted = 0
+    for key, tiers in planned.items():
+        final = tiers[FINAL_TIER]
+        final_key = render_cache_key(final, output_dir)
+        preview = tiers[PREVIEW_TIER]
+        if is_cached(cache, final_key, final["fingerprint"]):
+            finals[key] = dict(final, returncode=0, elapsed=0.0, log=None, cached=True,
+                               outputs=cache[final_key]["outputs"])
+        elif is_cached(cache, render_cache_key(preview, output_dir), preview["fingerprint"]):
+            submit(FINAL_TIER, final)
+            promoted += 1
+        else:
+            submit(PREVIEW_TIER, preview)
+    print(f"Rendering {outstanding - promoted} scene(s) at {preview_quality} quality, then promoting them to "
+          f"{final_quality} ({len(finals)} final(s) unchanged, {promoted} preview(s) unchanged)")
+
+    threads = [threading.Thread(target=work, daemon=True) for _ in range(jobs)]
+    for thread in threads:
+        thread.start()
+    try:
+        while outstanding:
+            try:
+                tier, job, cancel, result = finished.get(timeout=interval)
+            except queue.Empty:
+                pass
+            else:
+                outstanding -= 1
+                key = cache_key(job["file"], job["scene"])
+                if active.get(key, {}).get(tier) is cancel:
+                    del active[key][tier]
+                if result and not result["cancelled"]:
+                    name = "Preview" if tier == PREVIEW_TIER else "Final"
+                    if result["returncode"] != 0:
+                        print(f"✗ {name} of {result['label']} failed (exit {result['returncode']}), "
+                              f"see {result['log']}")
+                    else:
+                        print(f"✓ {name} of {result['label']} ({result['elapsed']:.1f}s)")
+                    if tier == FINAL_TIER or result["returncode"] != 0:
+                        # A failed preview is the scene's final word until it is edited
+                        finals[key] = result
+                    if result["returncode"] == 0:
+                        media_dir = job_media_dir(result, output_dir)
+                        outputs = find_scene_outputs(media_dir, result["module"], result["scene"],
+                                                     since=result["started_at"] - 2)
+                        result["outputs"] = outputs
+                        if outputs:
+                            cache[render_cache_key(result, output_dir)] = cache_entry(result, outputs)
+                            save_state_file(cache_path, cache)
+                            catalog.record(result, outputs, media_dir)
+                    if tier == PREVIEW_TIER and result["returncode"] == 0 and key in planned and \
+                            planned[key][PREVIEW_TIER]["fingerprint"] == result["fingerprint"]:
+                        submit(FINAL_TIER, planned[key][FINAL_TIER])
+
+            if _file_mtimes(mtimes) == mtimes and set(expand_scene_paths(paths)) <= mtimes.keys():
+                continue
+            current, mtimes = snapshot(planned)
+            for key, tiers in current.items():
+                if key in planned and planned[key][FINAL_TIER]["fingerprint"] == tiers[FINAL_TIER]["fingerprint"]:
+                    continue
+                for tier, cancel in active.pop(key, {}).items():
+                    cancel.set()
+                    if tier == FINAL_TIER:
+                        print(f"• {tiers[FINAL_TIER]['label']} changed, cancelling its stale final render")
+                finals.pop(key, None)
+                print(f"• {tiers[FINAL_TIER]['label']} changed, rendering a new preview")
+                submit(PREVIEW_TIER, tiers[PREVIEW_TIER])
+            planned = current
+    except KeyboardInterrupt:
+        print("\nStopping")
+        for tiers in active.values():
+            for cancel in tiers.values():
+                cancel.set()
+    finally:
+        stopping.set()
+        with condition:
+            condition.notify_all()
+        for thread in threads:
+            thread.join()
+        if worker_pool:
+            worker_pool.close()
+        catalog.close()
+
+    ordered = [finals[key] for key in planned if key in finals]
+    if ordered:
+        print_summary(ordered)
+    return ordered
@@ -0,0 +1,154 @@
+"""
+SQLite render queue shared by a farm's coordinator and its workers.
+"""
+import os
+import json
+import sqlite3
+import time
+import threading
+import contextlib
+
+# How long a worker holds a job without renewing its lease, and how often a
+# job may be leased before a worker crash on it counts as a failure
+LEASE_SECONDS = 60
+MAX_LEASES = 3
+
+class RenderQueue:
+    """
+    Render job queue in a SQLite database, shared by one coordinator and any
+    number of worker processes on one host, or on hosts that mount the same
+    local or cluster filesystem with working POSIX locks at the same path.
+    NFS and SMB are not supported: their locking does not give SQLite the
+    guarantees it relies on, and a queue there can lease a job twice or be
+    corrupted.
+
+    Workers lease a job at a time and renew the lease with heartbeats while
+    they render. A job whose lease expires, because its worker crashed or
+    lost its host, is handed to the next worker that asks, up to MAX_LEASES
+    times. The database uses SQLite's rollback journal rather than WAL,
+    which needs shared memory and does not work across hosts.
+    """
+
+    def __init__(self, path, lease_seconds=LEASE_SECONDS):
+        self.path = os.path.abspath(path)
+        self.lease_seconds = lease_seconds
+        self.local = threading.local()
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with self.transaction() as db:
+            db.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id INTEGER PRIMARY KEY,
+                    batch TEXT NOT NULL,
+                    priority REAL NOT NULL,
+                    job TEXT NOT NULL,
+                    state TEXT NOT NULL DEFAULT 'queued',
+                    worker TEXT,
+                    lease_expires REAL,
+                    leases INTEGER NOT NULL DEFAULT 0,
+                    result TEXT
+                )""")
+            db.execute("CREATE INDEX IF NOT EXISTS jobs_state ON jobs (state, priority)")
+
+    @contextlib.contextmanager
+    def transaction(self):
+        """An immediate (write-locked) transaction on this thread's connection."""
+        db = getattr(self.local, "db", None)
+        if db is None:
+            db = self.local.db = sqlite3.connect(self.path, timeout=60, isolation_level=None)
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            yield db
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        db.execute("COMMIT")
+
+    def submit(self, batch, jobs, output_dir=None):
+        """Queue jobs for a batch, longest first. Paths are made absolute for other hosts."""
+        rows = []
+        for job in jobs:
+            job = dict(
+                job,
+                file=os.path.abspath(job["file"]),
+                cwd=os.path.abspath(job["cwd"]),
+                config_file=os.path.abspath(job["config_file"]) if job["config_file"] else None,
+                log=os.path.abspath(job["log"]) if job["log"] else None,
+                output_dir=os.path.abspath(output_dir) if output_dir else None,
+            )
+            rows.append((batch, job.get("expected") or 0.0, json.dumps(job)))
+        with self.transaction() as db:
+            db.executemany("INSERT INTO jobs (batch, priority, job) VALUES (?, ?, ?)", rows)
+
+    def _expire_leases(self, db):
+        now = time.time()
+        db.execute("UPDATE jobs SET state = 'queued', worker = NULL "
+                   "WHERE state = 'leased' AND lease_expires < ? AND leases < ?", (now, MAX_LEASES))
+        failed = {"returncode": -1, "lease_expired": True}
+        db.execute("UPDATE jobs SET state = 'failed', result = ? "
+                   "WHERE state = 'leased' AND lease_expires < ?", (json.dumps(failed), now))
+
+    def lease(self, worker):
+        """
+        Take the longest queued job.
+
+        Args:
+            worker (str): Name of the leasing worker
+
+        Returns:
+            tuple: (job id, job dict), or None if nothing is queued
+        """
+        with self.transaction() as db:
+            self._expire_leases(db)
+            row = db.execute("SELECT id, job FROM jobs WHERE state = 'queued' "
+                             "ORDER BY priority DESC, id LIMIT 1").fetchone()
+            if row is None:
+                return None
+            db.execute("UPDATE jobs SET state = 'leased', worker = ?, lease_expires = ?, "
+                       "leases = leases + 1 WHERE id = ?",
+                       (worker, time.time() + self.lease_seconds, row[0]))
+        return row[0], json.loads(row[1])
+
+    def heartbeat(self, worker, job_ids):
+        """
+        Renew a worker's leases.
+
+        Returns:
+            set: The ids the worker still holds; the others were re-issued
+        """
+        held = set()
+        with self.transaction() as db:
+            for job_id in job_ids:
+                renewed = db.execute("UPDATE jobs SET lease_expires = ? "
+                                     "WHERE id = ? AND worker = ? AND state = 'leased'",
+                                     (time.time() + self.lease_seconds, job_id, worker)).rowcount
+                if renewed:
+                    held.add(job_id)
+        return held
+
+    def complete(self, job_id, worker, result):
+        """Store a job's result, unless the worker's lease on it was lost. Returns True if stored."""
+        state = "done" if result["returncode"] == 0 else "failed"
+        with self.transaction() as db:
+            return bool(db.execute("UPDATE jobs SET state = ?, result = ? "
+                                   "WHERE id = ? AND worker = ? AND state = 'leased'",
+                                   (state, json.dumps(result), job_id, worker)).rowcount)
+
+    def poll(self, batch):
+        """
+        Look at a batch's jobs, re-issuing expired leases on the way.
+
+        Returns:
+            list: (job id, state, job dict, result dict or None) per job
+        """
+        with self.transaction() as db:
+            self._expire_leases(db)
+            rows = db.execute("SELECT id, state, job, result FROM jobs WHERE batch = ?",
+                              (batch,)).fetchall()
+        return [(job_id, state, json.loads(job), json.loads(result) if result else None)
+                for job_id, state, job, result in rows]
+
+    def cancel(self, batch):
+        """Drop a batch's unfinished jobs."""
+        with self.transaction() as db:
+            db.execute("UPDATE jobs SET state = 'cancelled' WHERE batch = ? AND state IN ('queued', 'leased')",
+                       (batch,))
@@ -0,0 +1,181 @@
+"""
+Partial movie directories private to one render, and the shared segment store.
+"""
+import os
+import shutil
+import hashlib
+import tempfile
+import configparser
+import contextlib
+
+from .state import installed_manim_version, job_media_dir
+
+DEFAULT_SEGMENT_CACHE = os.path.join(os.path.expanduser("~"), ".cache", "manim_batch", "segments")
+DEFAULT_SEGMENT_BUDGET = 20 * 1024 ** 3
+
+@contextlib.contextmanager
+def private_partial_movies(job, work_root, prefill_dir=None):
+    """
+    Give a job a partial movie directory of its own for the length of a render.
+
+    manim writes each play() and wait() to partial_movie_files/<Scene>, lists
+    them in a partial_movie_file_list.txt there to combine them, and deletes
+    the oldest once there are more than max_files_cached. Renders of the same
+    scene running at the same time, such as the chunks of a split scene,
+    would race on that list and delete each other's files.
+
+    Args:
+        job (dict): Render job from plan_jobs
+        work_root (str): Directory for the private directory, which is
+            deleted afterwards
+        prefill_dir (str, optional): Directory of partial movies to hard link
+            in first, so manim skips the animations they hold
+
+    Yields:
+        dict: A copy of the job whose config_file is a generated manim.cfg
+            that points partial_movie_dir at the job's private directory
+            ('partial_dir') and turns off manim's partial movie eviction
+    """
+    os.makedirs(work_root, exist_ok=True)
+    work_dir = tempfile.mkdtemp(prefix=f"{job['scene']}-", dir=work_root)
+    partial_dir = os.path.join(work_dir, "partial_movie_files")
+    os.makedirs(partial_dir)
+    try:
+        for name in os.listdir(prefill_dir) if prefill_dir else ():
+            try:
+                os.link(os.path.join(prefill_dir, name), os.path.join(partial_dir, name))
+            except FileNotFoundError:
+                pass  # Evicted meanwhile
+
+        parser = configparser.ConfigParser()
+        if job["config_file"]:
+            parser.read(job["config_file"])
+        if not parser.has_section("CLI"):
+            parser.add_section("CLI")
+        parser.set("CLI", "partial_movie_dir", partial_dir)
+        parser.set("CLI", "max_files_cached", "-1")
+        config_file = os.path.join(work_dir, "manim.cfg")
+        with open(config_file, "w") as f:
+            parser.write(f)
+
+        yield dict(job, config_file=config_file, partial_dir=partial_dir)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+class SegmentStore:
+    """
+    Content-addressed store of manim's partial movie files, shared by every
+    project, checkout and parallel job that uses the same store directory.
+
+    manim names each partial movie after the hash of its play() or wait()
+    call and skips the call when a file of that name exists. Segments are
+    grouped by manim version, quality and the project's manim.cfg, since
+    those change the encoded frames without changing the hash.
+
+    Every job renders into a private directory prefilled with hard links to
+    its group's segments, and the segments it encodes are linked into the
+    store once it succeeds. Parallel jobs rendering the same animation thus
+    never write to the same file, and a segment evicted while a job uses it
+    stays readable through the job's link. manim updates the access time of
+    every segment a render uses, which gives the least recently used order
+    for eviction once the store goes over its byte budget.
+    """
+
+    MOVIE_EXTENSIONS = (".mp4", ".mov", ".webm")
+
+    def __init__(self, root=DEFAULT_SEGMENT_CACHE, budget=DEFAULT_SEGMENT_BUDGET):
+        self.root = os.path.abspath(root)
+        self.budget = budget
+        self.manim_version = installed_manim_version()
+        os.makedirs(os.path.join(self.root, "work"), exist_ok=True)
+
+    def segment_dir(self, job):
+        """Directory holding the segments a job can reuse."""
+        digest = hashlib.sha256()
+        if job["config_file"]:
+            with open(job["config_file"], "rb") as f:
+                digest.update(f.read())
+        return os.path.join(self.root, f"manim-{self.manim_version}",
+                            f"{job['quality']}-{digest.hexdigest()[:12]}")
+
+    @contextlib.contextmanager
+    def checkout(self, job):
+        """
+        Prepare a job to render against the store.
+
+        Yields:
+            dict: The job as from private_partial_movies, its private
+                directory prefilled with the group's segments. Pass it to
+                publish() if the render succeeds.
+        """
+        segment_dir = self.segment_dir(job)
+        os.makedirs(segment_dir, exist_ok=True)
+        with private_partial_movies(job, os.path.join(self.root, "work"), segment_dir) as store_job:
+            yield dict(store_job, segment_dir=segment_dir)
+
+    def publish(self, store_job):
+        """
+        Add the segments a successful render encoded to the store.
+
+        Segments of failed or killed renders are never published, since the
+        last one may be cut short.
+        """
+        published = False
+        for name in os.listdir(store_job["partial_dir"]):
+            path = os.path.join(store_job["partial_dir"], name)
+            if name.endswith(self.MOVIE_EXTENSIONS) and os.stat(path).st_nlink == 1:
+                try:
+                    # Fails rather than replace a segment a parallel job published first
+                    os.link(path, os.path.join(store_job["segment_dir"], name))
+                    published = True
+                except FileExistsError:
+                    pass
+        if published:
+            self.evict()
+
+    def evict(self):
+        """Delete least recently used segments until the store fits its budget."""
+        segments = []
+        for dir_path, dir_names, file_names in os.walk(self.root):
+            if dir_path == self.root:
+                dir_names[:] = [name for name in dir_names if name != "work"]
+            for name in file_names:
+                path = os.path.join(dir_path, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                segments.append((stat.st_atime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in segments)
+        for _, size, path in sorted(segments):
+            if total <= self.budget:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass  # Another process evicted it
+            total -= size
+
+def job_workspace(job, output_dir=None, segment_store=None):
+    """
+    Context in which to render a job: the segment store's checkout, a
+    private partial movie directory for a chunk of a split scene (see
+    private_partial_movies), or else the job as it is.
+
+    Returns:
+        contextlib.AbstractContextManager: Yields the job to render
+    """
+    if segment_store:
+        return segment_store.checkout(job)
+    if job.get("chunk"):
+        media_dir = job_media_dir(job, output_dir)
+        return private_partial_movies(job, os.path.join(media_dir, "partial_chunks"))
+    return contextlib.nullcontext(job)
+
+def workspace_result(result, job):
+    """Strip a render result of the workspace job_workspace set up."""
+    result = dict(result, config_file=job["config_file"])
+    result.pop("segment_dir", None)
+    result.pop("partial_dir", None)
+    return result
@@ -0,0 +1,340 @@
+"""
+Scene fingerprints, the render cache and the journal of interrupted runs.
+"""
+import os
+import ast
+import json
+import hashlib
+import importlib.metadata
+import time
+import threading
+
+from .discovery import import_search_dirs, local_module_file
+from .media import check_output_integrity
+
+# Bump when the fingerprint recipe changes so old cache entries stop matching
+RENDER_CACHE_VERSION = 1
+
+# Directory for the batch renderer's own bookkeeping (cache, logs of past runs)
+DEFAULT_STATE_DIR = ".manim_batch"
+
+def hash_file(path, memo):
+    """Hash a file's bytes, reusing earlier results from memo."""
+    path = os.path.abspath(path)
+    if path not in memo:
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+        memo[path] = digest.hexdigest()
+    return memo[path]
+
+def imported_files(nodes, search_dirs, package_dir=None):
+    """
+    Find the local module files the import statements among nodes load.
+
+    Args:
+        nodes (iterable): AST nodes, of which only imports are looked at
+        search_dirs (list): Directories absolute imports resolve against
+        package_dir (str, optional): Directory relative imports resolve
+            against; they are ignored without one
+
+    Returns:
+        list: Paths of the imported modules that live in this repository
+    """
+    files = []
+    for node in nodes:
+        if isinstance(node, ast.Import):
+            targets = [(alias.name, search_dirs) for alias in node.names]
+        elif isinstance(node, ast.ImportFrom) and not node.level and node.module:
+            targets = [(node.module, search_dirs)]
+        elif isinstance(node, ast.ImportFrom) and node.level and package_dir:
+            base = package_dir
+            for _ in range(node.level - 1):
+                base = os.path.dirname(base)
+            names = [node.module] if node.module else [alias.name for alias in node.names]
+            targets = [(name, [base]) for name in names]
+        else:
+            continue
+        for module, dirs in targets:
+            module_file = local_module_file(module, dirs)
+            if module_file:
+                files.append(os.path.abspath(module_file))
+    return files
+
+def local_import_closure(module_files, search_dirs):
+    """
+    Follow local imports from the given module files, transitively.
+
+    Imports anywhere in a module count, including ones inside functions,
+    since they run when the scene calls that function.
+
+    Returns:
+        set: The given files and every local module they reach
+    """
+    seen = set()
+    pending = list(module_files)
+    while pending:
+        module_file = pending.pop()
+        if module_file in seen:
+            continue
+        seen.add(module_file)
+        try:
+            with open(module_file, encoding="utf-8") as f:
+                tree = ast.parse(f.read(), filename=module_file)
+        except (OSError, SyntaxError, ValueError):
+            continue  # Still hashed as it is; python reports the error when it runs
+        pending.extend(imported_files(ast.walk(tree), search_dirs, os.path.dirname(module_file)))
+    return seen
+
+def scene_fingerprints(file_path, scene_classes, quality_flag, asset_root=".", config_files=(),
+                       dependencies=None):
+    """
+    Compute a content fingerprint for each scene in a file.
+
+    A scene's fingerprint covers the AST of its class, of every module-level
+    class or function it reaches by name (base classes such as NNMediaMixin),
+    the module's imports and other top-level statements, the local modules it
+    imports, including shared ones such as warp_fields at the project root,
+    and the local modules those import in turn, any asset files whose paths
+    appear as string literals in that code, the manim config files in effect
+    and the quality flag. Comment and whitespace edits to the scene file do
+    not change it.
+
+    Args:
+        file_path (str): Path to the Manim Python file
+        scene_classes (list): Scene class names to fingerprint
+        quality_flag (str): Single-letter manim quality flag
+        asset_root (str): Directory relative asset paths are resolved against,
+            i.e. the working directory manim runs in
+        config_files (iterable): manim.cfg files that apply to the render
+        dependencies (dict, optional): If given, filled with each scene's
+            set of input files other than file_path itself
+
+    Returns:
+        dict: Scene class name to hex digest
+    """
+    with open(file_path, encoding="utf-8") as f:
+        source = f.read()
+    tree = ast.parse(source, filename=file_path)
+
+    definitions = {}
+    preamble = []
+    for node in tree.body:
+        if isinstance(node, (ast.ClassDef, ast.FunctionDef, ast.AsyncFunctionDef)):
+            # Later definitions shadow earlier ones, as they would at import time
+            definitions[node.name] = node
+        elif not (isinstance(node, ast.Expr) and isinstance(node.value, ast.Constant)):
+            # Imports, constants and config tweaks can affect every scene
+            preamble.append(node)
+
+    file_memo = {}
+    search_dirs = import_search_dirs(file_path, asset_root)
+
+    shared = hashlib.sha256()
+    shared.update(f"v{RENDER_CACHE_VERSION}:q{quality_flag}".encode())
+    for node in preamble:
+        shared.update(ast.dump(node).encode())
+    shared_files = local_import_closure(imported_files(preamble, search_dirs), search_dirs)
+    for module_file in sorted(shared_files):
+        shared.update(hash_file(module_file, file_memo).encode())
+    for config_file in config_files:
+        if os.path.isfile(config_file):
+            shared.update(hash_file(config_file, file_memo).encode())
+            shared_files.add(os.path.abspath(config_file))
+
+    fingerprints = {}
+    for scene_class in scene_classes:
+        if scene_class not in definitions:
+            continue
+
+        # Walk everything the scene reaches through module-level names
+        reached = []
+        pending = [scene_class]
+        while pending:
+            name = pending.pop()
+            if name in reached or name not in definitions:
+                continue
+            reached.append(name)
+            for sub in ast.walk(definitions[name]):
+                if isinstance(sub, ast.Name) and sub.id in definitions:
+                    pending.append(sub.id)
+
+        digest = shared.copy()
+        scene_nodes = [definitions[name] for name in sorted(reached)]
+        for node in scene_nodes:
+            digest.update(ast.dump(node).encode())
+
+        # Assets such as media/excalidraw_exports/*.svg are referenced by path
+        assets = set()
+        for node in scene_nodes + preamble:
+            for sub in ast.walk(node):
+                if (isinstance(sub, ast.Constant) and isinstance(sub.value, str)
+                        and 0 < len(sub.value) < 260 and "\n" not in sub.value):
+                    candidate = os.path.join(asset_root, sub.value)
+                    if os.path.isfile(candidate):
+                        assets.add(candidate)
+        for asset in sorted(assets):
+            digest.update(os.path.relpath(asset, asset_root).replace(os.sep, "/").encode())
+            digest.update(hash_file(asset, file_memo).encode())
+
+        fingerprints[scene_class] = digest.hexdigest()
+        if dependencies is not None:
+            dependencies[scene_class] = shared_files | {os.path.abspath(asset) for asset in assets}
+    return fingerprints
+
+def load_state_file(path):
+    """Load a JSON state file, returning an empty dict if it is missing or unreadable."""
+    try:
+        with open(path) as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return cache if isinstance(cache, dict) else {}
+
+def save_state_file(path, data):
+    """Atomically write a JSON state file so an interrupted run cannot corrupt it."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(data, f, indent=1, sort_keys=True)
+    os.replace(tmp_path, path)
+
+def cache_key(file_path, scene_class):
+    """Key identifying a scene across runs, e.g. in timings and results."""
+    return f"{os.path.abspath(file_path)}::{scene_class}"
+
+def job_media_dir(job, output_dir=None):
+    """Media directory a job's render writes to: output_dir, or media/ beside the scene file."""
+    return os.path.abspath(output_dir) if output_dir else os.path.join(job["cwd"], "media")
+
+def render_cache_key(job, output_dir=None):
+    """
+    Key of a job's render in the render cache.
+
+    Everything that changes which files a render writes is part of the key:
+    the quality, whether the scene is rendered as a still and the media
+    directory. Renders of a scene at different settings are kept side by
+    side, so switching back to a setting finds its render still cached.
+    """
+    media_dir = job_media_dir(job, output_dir)
+    kind = "still" if job.get("still") else "movie"
+    return f"{cache_key(job['file'], job['scene'])}@{job['quality']}:{kind}:{media_dir}"
+
+def cache_entry(result, outputs):
+    """Render cache entry for a successful render and the files it wrote."""
+    return {
+        "fingerprint": result["fingerprint"],
+        "quality": result["quality"],
+        "outputs": [os.path.abspath(path) for path in outputs],
+        "rendered_at": time.time(),
+    }
+
+def is_cached(cache, key, fingerprint):
+    """
+    Check whether a scene's last recorded render is still current.
+
+    Args:
+        cache (dict): Loaded render cache
+        key (str): Key from render_cache_key
+        fingerprint (str): Fingerprint of the scene as it is now
+
+    Returns:
+        bool: True when the fingerprint matches and every recorded output exists
+    """
+    entry = cache.get(key)
+    if not entry or entry.get("fingerprint") != fingerprint or not entry.get("outputs"):
+        return False
+    return all(os.path.isfile(path) for path in entry["outputs"])
+
+def installed_manim_version():
+    """Version of the installed manim package, 'unknown' if it cannot be found."""
+    try:
+        return importlib.metadata.version("manim")
+    except importlib.metadata.PackageNotFoundError:
+        return "unknown"
+
+class RenderJournal:
+    """
+    Append-only on-disk record of the render jobs a batch has completed.
+
+    Each completed job, a whole scene or one chunk of a split scene, is
+    appended as a JSON line with its outputs' paths, sizes and hashes, and
+    synced to disk, so the journal survives a crash or reboot in the middle
+    of a run. A fresh run starts a new journal; a resumed run keeps it and
+    skips the jobs whose outputs are still intact.
+    """
+
+    def __init__(self, path, resume=False):
+        self.path = path
+        self.entries = {}
+        if resume:
+            try:
+                with open(path) as f:
+                    for line in f:
+                        try:
+                            entry = json.loads(line)
+                        except ValueError:
+                            continue  # A line cut short by the crash
+                        self.entries[entry["job"]] = entry
+            except OSError:
+                pass
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.file = open(path, "a" if resume else "w")
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def job_key(job):
+        """Key of a render job: its scene, quality and, for chunks, the animation range."""
+        key = f"{cache_key(job['file'], job['scene'])}@{job['quality']}"
+        chunk = job.get("chunk")
+        if chunk:
+            key += f"#{chunk['from']}-{chunk['upto']}/{chunk['count']}"
+        return key
+
+    def record(self, result, outputs):
+        """Append a completed job and its output files to the journal."""
+        entry = {
+            "job": self.job_key(result),
+            "fingerprint": result["fingerprint"],
+            "outputs": [
+                {"path": os.path.abspath(path), "size": os.path.getsize(path),
+                 "sha256": hash_file(path, {})}
+                for path in outputs
+            ],
+            "started_at": result["started_at"],
+            "elapsed": round(result["elapsed"], 3),
+            "completed_at": time.time(),
+        }
+        with self.lock:
+            self.file.write(json.dumps(entry) + "\n")
+            self.file.flush()
+            os.fsync(self.file.fileno())
+            self.entries[entry["job"]] = entry
+
+    def completed(self, job):
+        """
+        Look up a job that an earlier run of this batch completed.
+
+        Args:
+            job (dict): Render job, or chunk of one
+
+        Returns:
+            dict: The journal entry, or None if the job is not journaled, its
+                code changed since, or an output is missing, resized or fails
+                the container integrity check
+        """
+        entry = self.entries.get(self.job_key(job))
+        if not entry or entry["fingerprint"] != job["fingerprint"] or not entry["outputs"]:
+            return None
+        for output in entry["outputs"]:
+            path = output["path"]
+            if not os.path.isfile(path) or os.path.getsize(path) != output["size"]:
+                return None
+            if not check_output_integrity(path):
+                print(f"✗ {path} is corrupt, rendering it again")
+                return None
+        return entry
+
+    def close(self):
+        self.file.close()
@@ -0,0 +1,256 @@
+"""
+Compiling a file's literal MathTex/Tex strings in one LaTeX run before its scenes render.
+"""
+import os
+import ast
+import re
+import shutil
+import tempfile
+import time
+import traceback
+import subprocess
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+from .state import installed_manim_version
+from .warm import WarmWorkerPool, job_config, redirect_output
+
+TEX_CLASSES = ("MathTex", "Tex")
+
+def _literal_strings(node):
+    """The strings of a str constant or a list/tuple of them, None for anything else."""
+    if isinstance(node, ast.Constant) and isinstance(node.value, str):
+        return [node.value]
+    if isinstance(node, (ast.List, ast.Tuple)):
+        strings = [sub.value for sub in node.elts if isinstance(sub, ast.Constant) and isinstance(sub.value, str)]
+        return strings if len(strings) == len(node.elts) else None
+    return None
+
+def collect_tex_calls(file_path):
+    """
+    Find the MathTex and Tex objects a file builds from literal strings.
+
+    Calls with anything computed, such as f-strings, variables or a custom
+    tex_template, are left out; manim compiles those one by one as usual.
+
+    Args:
+        file_path (str): Path to the Manim Python file
+
+    Returns:
+        list: [class name, tex strings, keyword arguments] per distinct call
+    """
+    with open(file_path, encoding="utf-8") as f:
+        tree = ast.parse(f.read(), filename=file_path)
+    calls = []
+    for node in ast.walk(tree):
+        if not isinstance(node, ast.Call):
+            continue
+        func = node.func
+        name = func.id if isinstance(func, ast.Name) else func.attr if isinstance(func, ast.Attribute) else None
+        if name not in TEX_CLASSES or not node.args:
+            continue
+        strings = [_literal_strings(arg) for arg in node.args]
+        if any(s is None or len(s) != 1 for s in strings):
+            continue
+        kwargs = {}
+        for keyword in node.keywords:
+            if keyword.arg in ("arg_separator", "tex_environment"):
+                value = _literal_strings(keyword.value)
+                if value is None or len(value) != 1:
+                    break
+                kwargs[keyword.arg] = value[0]
+            elif keyword.arg == "substrings_to_isolate":
+                value = _literal_strings(keyword.value)
+                if value is None:
+                    break
+                kwargs[keyword.arg] = value
+            elif keyword.arg == "tex_to_color_map":
+                # Only the keys change how the string is split up
+                if not isinstance(keyword.value, ast.Dict):
+                    break
+                keys = [_literal_strings(key) for key in keyword.value.keys if key is not None]
+                if len(keys) != len(keyword.value.keys) or any(k is None or len(k) != 1 for k in keys):
+                    break
+                kwargs["substrings_to_isolate"] = kwargs.get("substrings_to_isolate", []) + [k[0] for k in keys]
+            elif keyword.arg is None or keyword.arg in ("tex_template",):
+                break
+        else:
+            call = [name, [s[0] for s in strings], kwargs]
+            if call not in calls:
+                calls.append(call)
+    return calls
+
+# manim releases whose private MathTex string handling _tex_expressions
+# reuses (_break_up_tex_strings, _get_modified_expression and the attributes
+# they read); the LaTeX prepass is skipped for any other
+TEX_PREPASS_MANIM_VERSIONS = ("0.18.", "0.19.")
+
+def _tex_expressions(tex_calls):
+    """
+    Work out the (expression, environment) pairs manim will compile for
+    collected MathTex and Tex calls, using manim's own string handling.
+
+    A MathTex compiles its joined strings and then each substring on its
+    own, to find which glyphs belong to which substring. The constructors
+    cannot be used for this, since they compile the LaTeX themselves.
+    """
+    from manim import MathTex, Tex
+
+    classes = {"MathTex": MathTex, "Tex": Tex}
+    defaults = {"MathTex": (" ", "align*"), "Tex": ("", "center")}
+    expressions = []
+    for name, strings, kwargs in tex_calls:
+        separator, environment = defaults[name]
+        mob = classes[name].__new__(classes[name])
+        mob.arg_separator = kwargs.get("arg_separator", separator)
+        mob.substrings_to_isolate = kwargs.get("substrings_to_isolate", [])
+        mob.tex_to_color_map = {}
+        mob.brace_notation_split_occurred = False
+        pieces = mob._break_up_tex_strings(strings)
+        for piece in [mob.arg_separator.join(pieces)] + pieces:
+            pair = (mob._get_modified_expression(piece), kwargs.get("tex_environment", environment))
+            if pair not in expressions:
+                expressions.append(pair)
+    return expressions
+
+def precompile_tex_in_process(job, output_dir=None, log_path=None):
+    """
+    Compile every missing LaTeX expression of a file in one LaTeX run.
+
+    The expressions are typeset as the pages of a single multi-page
+    document, which dvisvgm splits into one SVG per page, saved in manim's
+    Tex directory under the names manim looks for. Scenes then find them
+    there and skip their own latex and dvisvgm runs. If the batch fails,
+    for instance on one malformed expression, nothing is saved and manim
+    compiles every expression itself as before.
+
+    Args:
+        job (dict): Render job from plan_jobs with the file's 'tex_calls'
+        output_dir (str, optional): Directory manim saves output files to
+        log_path (str, optional): File that receives the compilers' output
+
+    Returns:
+        dict: 'returncode' and 'tex' with the number of expressions 'found',
+            'compiled' and whether the 'batch' worked
+    """
+    with redirect_output(log_path):
+        try:
+            with job_config(job, output_dir) as config:
+                from manim.utils.tex_file_writing import make_tex_compilation_command, tex_hash
+
+                template = config.tex_template
+                tex_dir = config.get_dir("tex_dir")
+                tex_dir.mkdir(parents=True, exist_ok=True)
+                pages = {}
+                expressions = _tex_expressions(job["tex_calls"])
+                for expression, environment in expressions:
+                    texcode = template.get_texcode_for_expression_in_env(expression, environment)
+                    svg_file = tex_dir / (tex_hash(texcode) + ".svg")
+                    if not svg_file.exists():
+                        pages[svg_file] = texcode
+                stats = {"found": len(expressions), "compiled": 0, "batch": True}
+                multi_class = re.sub(r"\\documentclass(?:\[([^\]]*)\])?\{standalone\}",
+                                     lambda m: "\\documentclass[%smulti]{standalone}"
+                                               % (m.group(1) + "," if m.group(1) else ""),
+                                     template.documentclass)
+                if not pages or multi_class == template.documentclass:
+                    # Nothing to do, or a template that is not standalone-based
+                    stats["batch"] = bool(not pages)
+                    return {"returncode": 0, "tex": stats}
+
+                # Each page is the body of the document manim would have compiled
+                head, _, _ = next(iter(pages.values())).partition("\\begin{document}")
+                head = head.replace(template.documentclass, multi_class, 1)
+                bodies = []
+                for texcode in pages.values():
+                    body = texcode.partition("\\begin{document}")[2].rpartition("\\end{document}")[0]
+                    bodies.append(f"\\begin{{standalone}}{body}\\end{{standalone}}")
+                document = head + "\\begin{document}\n" + "\n".join(bodies) + "\n\\end{document}\n"
+
+                work_dir = Path(tempfile.mkdtemp(prefix="batch_", dir=tex_dir))
+                try:
+                    tex_file = work_dir / "batch.tex"
+                    tex_file.write_text(document, encoding="utf-8")
+                    command = make_tex_compilation_command(template.tex_compiler, template.output_format,
+                                                           tex_file, work_dir)
+                    compiled = subprocess.run(command, stdout=subprocess.DEVNULL).returncode == 0
+                    dvi_file = tex_file.with_suffix(template.output_format)
+                    if compiled:
+                        subprocess.run(["dvisvgm", *(["--pdf"] if template.output_format == ".pdf" else []),
+                                        "--page=1-", "--no-fonts", "--verbosity=0",
+                                        f"--output={(work_dir / 'page-%p.svg').as_posix()}", dvi_file.as_posix()],
+                                       stdout=subprocess.DEVNULL)
+                    page_files = sorted(work_dir.glob("page-*.svg"), key=lambda path: int(path.stem[5:]))
+                    if not compiled or len(page_files) != len(pages):
+                        print(f"Batch LaTeX compilation failed ({len(page_files)} of {len(pages)} pages)")
+                        if tex_file.with_suffix(".log").exists():
+                            print(tex_file.with_suffix(".log").read_text(errors="replace")[-3000:])
+                        stats["batch"] = False
+                        return {"returncode": 0, "tex": stats}
+                    for page_file, svg_file in zip(page_files, pages):
+                        os.replace(page_file, svg_file)
+                    stats["compiled"] = len(pages)
+                finally:
+                    shutil.rmtree(work_dir, ignore_errors=True)
+            return {"returncode": 0, "tex": stats}
+        except Exception:
+            traceback.print_exc()
+            return {"returncode": 1}
+
+def precompile_tex(jobs, output_dir=None, workers=1, log_dir=None, worker_pool=None):
+    """
+    Compile the LaTeX of the given jobs' files ahead of rendering.
+
+    Every file with literal MathTex or Tex strings (see collect_tex_calls)
+    gets one multi-page LaTeX run in a warm worker (see
+    precompile_tex_in_process), several files at a time. Failures only
+    cost the speed-up: the scenes compile whatever is missing themselves.
+    Nothing is started without dvisvgm on the PATH, with a manim release
+    outside TEX_PREPASS_MANIM_VERSIONS, or when no file has such strings.
+
+    Args:
+        jobs (list): Render jobs; each distinct file is compiled once
+        output_dir (str, optional): Directory manim saves output files to
+        workers (int): Number of files to compile at the same time
+        log_dir (str, optional): Root directory for the compilers' logs
+        worker_pool (WarmWorkerPool, optional): The warm backend's workers,
+            reused instead of starting workers only for the prepass
+    """
+    if shutil.which("dvisvgm") is None:
+        return  # No LaTeX toolchain; manim reports the missing tools if a scene needs them
+    manim_version = installed_manim_version()
+    if not manim_version.startswith(TEX_PREPASS_MANIM_VERSIONS):
+        print(f"• Skipping the LaTeX prepass: it has not been checked against manim {manim_version}")
+        return
+    prepass = []
+    for job in jobs:
+        if any(other["file"] == job["file"] for other in prepass):
+            continue
+        try:
+            tex_calls = collect_tex_calls(job["file"])
+        except (OSError, SyntaxError, ValueError):
+            continue
+        if tex_calls:
+            log = os.path.join(log_dir, "tex", f"{job['module']}.log") if log_dir else None
+            prepass.append(dict(job, tex_calls=tex_calls, log=log))
+    if not prepass:
+        return
+
+    start = time.monotonic()
+    workers = max(1, min(workers, len(prepass)))
+    print(f"Compiling the LaTeX of {len(prepass)} file(s), one batch per file...")
+    own_pool = worker_pool is None
+    if own_pool:
+        worker_pool = WarmWorkerPool(workers, output_dir=output_dir)
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(lambda job: worker_pool.render(job, job["log"]), prepass))
+    finally:
+        if own_pool:
+            worker_pool.close()
+    compiled = sum(r["tex"]["compiled"] for r in results if r["returncode"] == 0)
+    print(f"✓ Compiled {compiled} LaTeX expression(s) in {time.monotonic() - start:.1f}s")
+    for r in results:
+        if r["returncode"] != 0 or not r["tex"]["batch"]:
+            print(f"✗ Could not batch the LaTeX of {os.path.relpath(r['file'])}, its scenes will compile "
+                  f"it themselves" + (f" (see {r['log']})" if r["log"] else ""))
@@ -0,0 +1,351 @@
+"""
+Warm workers: long-lived processes that import manim once and render scenes in-process.
+"""
+import os
+import sys
+import importlib.util
+import time
+import queue
+import traceback
+import contextlib
+import signal
+import multiprocessing
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from .discovery import project_import_path
+from .processes import (
+    LIMIT_DESCRIPTIONS, job_cpu_set, limit_to_cpus, process_stats, thread_limit_env, usage_fields,
+)
+
+# manim's names for the single-letter quality flags
+MANIM_QUALITIES = {
+    "l": "low_quality",
+    "m": "medium_quality",
+    "h": "high_quality",
+    "p": "production_quality",
+    "k": "fourk_quality",
+}
+
+@contextlib.contextmanager
+def redirect_output(log_path):
+    """
+    Send everything written to stdout/stderr, including by child processes
+    such as ffmpeg, to log_path at the file descriptor level.
+    """
+    if not log_path:
+        yield
+        return
+
+    os.makedirs(os.path.dirname(log_path), exist_ok=True)
+    sys.stdout.flush()
+    sys.stderr.flush()
+    saved_stdout, saved_stderr = os.dup(1), os.dup(2)
+    try:
+        with open(log_path, "w") as log_file:
+            os.dup2(log_file.fileno(), 1)
+            os.dup2(log_file.fileno(), 2)
+            try:
+                yield
+            finally:
+                sys.stdout.flush()
+                sys.stderr.flush()
+    finally:
+        os.dup2(saved_stdout, 1)
+        os.dup2(saved_stderr, 2)
+        os.close(saved_stdout)
+        os.close(saved_stderr)
+
+def _load_scene_module(file_path, module_name):
+    """Execute a scene file as a fresh module and return it."""
+    spec = importlib.util.spec_from_file_location(module_name, file_path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    return module
+
+@contextlib.contextmanager
+def job_config(job, output_dir=None):
+    """
+    Set up manim's global config for a job, in the job's directory, and undo
+    it afterwards.
+
+    manim's global config is rebuilt from the library defaults and the job's
+    manim.cfg inside a tempconfig block, so nothing set by one job leaks
+    into the next.
+
+    Yields:
+        ManimConfig: manim's config
+    """
+    from manim import config, tempconfig
+    from manim._config.utils import make_config_parser
+
+    saved_cwd = os.getcwd()
+    try:
+        os.chdir(job["cwd"])
+        with tempconfig({}):
+            config.digest_parser(make_config_parser(job["config_file"]))
+            config.quality = MANIM_QUALITIES[job["quality"]]
+            config.input_file = job["file"]
+            config.scene_names = [job["scene"]]
+            config.output_file = None
+            if output_dir:
+                config.media_dir = os.path.abspath(output_dir)
+            yield config
+    finally:
+        os.chdir(saved_cwd)
+
+# Size and mtime of each shared project module's file when this process
+# imported it (see scene_environment)
+_shared_module_stamps = {}
+
+def _file_stamp(path):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_size, stat.st_mtime_ns)
+
+@contextlib.contextmanager
+def scene_environment(job, output_dir=None):
+    """
+    Prepare the current process to run a job's scene and undo it afterwards.
+
+    The config comes from job_config and the scene file is executed fresh
+    for every job. Shared project modules it imports (its dependencies, such
+    as warp_fields or svg_assets) stay imported for later jobs, keeping
+    their in-process caches, until one of their files changes; then all of
+    them are imported afresh, so a warm worker never runs old code.
+
+    Yields:
+        type: The job's Scene class
+    """
+    if any(_file_stamp(path) != stamp for path, stamp in _shared_module_stamps.items()):
+        for name, module in list(sys.modules.items()):
+            if getattr(module, "__file__", None) in _shared_module_stamps:
+                del sys.modules[name]
+        _shared_module_stamps.clear()
+    # Stamped before the import, so an edit made during the job counts as a change
+    stamps = {path: _file_stamp(path) for path in job.get("dependencies", ())}
+    saved_path = list(sys.path)
+    try:
+        sys.path[:0] = project_import_path(job["file"])
+        with job_config(job, output_dir) as config:
+            chunk = job.get("chunk")
+            if chunk:
+                config.from_animation_number = chunk["from"]
+                config.upto_animation_number = -1 if chunk["upto"] is None else chunk["upto"]
+                config.output_file = chunk["output_name"]
+            elif job.get("still"):
+                config.save_last_frame = True
+                config.write_to_movie = False
+                config.output_file = job["scene"]
+
+            module = _load_scene_module(job["file"], job["module"])
+            yield getattr(module, job["scene"])
+    finally:
+        sys.modules.pop(job["module"], None)
+        for module in list(sys.modules.values()):
+            path = getattr(module, "__file__", None)
+            if path in stamps:
+                _shared_module_stamps.setdefault(path, stamps[path])
+        sys.path[:] = saved_path
+
+def render_in_process(job, play=False, output_dir=None, log_path=None):
+    """
+    Render one scene through manim's Python API in the current process.
+
+    Args:
+        job (dict): Render job from plan_jobs
+        play (bool): Whether to play the animation after rendering
+        output_dir (str, optional): Directory to save output files
+        log_path (str, optional): File that receives the render's output
+
+    Returns:
+        dict: 'returncode' 0 on success, 1 if the scene raised an exception
+    """
+    with redirect_output(log_path):
+        try:
+            with scene_environment(job, output_dir) as scene_class:
+                scene_class().render(preview=play and not job.get("chunk"))
+            return {"returncode": 0}
+        except Exception:
+            traceback.print_exc()
+            return {"returncode": 1}
+
+def _warm_worker_main(conn, play, output_dir, cpus=None):
+    """Entry point of a warm worker process: import manim once, then serve jobs."""
+    if cpus:
+        # Before importing manim, so numpy's thread pools pick up the caps
+        os.environ.update(thread_limit_env(len(cpus)))
+        limit_to_cpus(0, cpus)
+    import manim  # noqa: F401 - paid once per worker instead of once per scene
+    # These tasks build on this module's scene environment, so they are imported here
+    from .benchmark import benchmark_in_process
+    from .dry_run import dry_run_in_process
+    from .profiling import profile_in_process
+    from .tex import precompile_tex_in_process
+
+    while True:
+        try:
+            message = conn.recv()
+        except EOFError:
+            break
+        if message is None:
+            break
+        job, log_path = message
+        before = resource.getrusage(resource.RUSAGE_SELF) if resource else None
+        if job.get("dry_run"):
+            reply = dry_run_in_process(job, log_path)
+        elif job.get("benchmark"):
+            reply = benchmark_in_process(job, output_dir, log_path)
+        elif job.get("tex_calls"):
+            reply = precompile_tex_in_process(job, job.get("output_dir", output_dir), log_path)
+        elif job.get("profile"):
+            reply = profile_in_process(job, output_dir, log_path, job.get("cprofile_path"))
+        else:
+            # Jobs from a render farm queue carry their batch's output directory
+            reply = render_in_process(job, play, job.get("output_dir", output_dir), log_path)
+        if resource:
+            # Peak RSS is the worker's high-water mark, which includes earlier jobs
+            reply["usage"] = usage_fields(resource.getrusage(resource.RUSAGE_SELF),
+                                           before.ru_utime + before.ru_stime)
+        conn.send(reply)
+
+class WarmWorker:
+    """
+    A long-lived worker process that imports manim once and renders scenes
+    in-process. A worker that dies mid-render is replaced before its next job.
+    """
+
+    def __init__(self, play=False, output_dir=None, max_scenes=0, limits=None, cpus=None):
+        self.play = play
+        self.output_dir = output_dir
+        self.max_scenes = max_scenes
+        self.limits = limits
+        self.cpus = cpus
+        self.process = None
+        self.conn = None
+        self.rendered = 0
+
+    def start(self):
+        # spawn rather than fork: the parent runs a thread pool
+        context = multiprocessing.get_context("spawn")
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(
+            target=_warm_worker_main,
+            args=(child_conn, self.play, self.output_dir, self.cpus),
+            daemon=True,
+        )
+        self.process.start()
+        child_conn.close()
+        self.rendered = 0
+
+    def close(self):
+        if self.process is None:
+            return
+        try:
+            self.conn.send(None)
+        except OSError:
+            pass
+        self.process.join(timeout=5)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.conn.close()
+        self.process = None
+
+    def render(self, job, log_path=None, cancel=None):
+        """
+        Render a job on this worker, restarting the process first if it died
+        or has reached max_scenes. Setting cancel, or going over the worker's
+        resource limits, kills the worker mid-render; it is restarted for the
+        next job.
+
+        Returns:
+            dict: The job extended with return code, elapsed seconds and log path
+        """
+        if self.process is None or not self.process.is_alive():
+            self.close()
+            self.start()
+        elif self.max_scenes and self.rendered >= self.max_scenes:
+            self.close()
+            self.start()
+
+        started_at = time.time()
+        start = time.monotonic()
+        cancelled = False
+        limit = None
+        extra = {}
+        stats = process_stats(self.process.pid) if self.limits else None
+        cpu_before = stats[0] if stats else 0.0
+        try:
+            self.conn.send((job, log_path))
+            while (cancel is not None or self.limits) and not self.conn.poll(0.2):
+                if cancel is not None and cancel.is_set():
+                    self.process.kill()
+                    cancelled = True
+                    break
+                limit = self.limits.check(self.process.pid, start, cpu_before) if self.limits else None
+                if limit:
+                    self.process.kill()
+                    break
+            extra = self.conn.recv()
+            returncode = extra.pop("returncode")
+        except (EOFError, OSError):
+            # The worker died mid-render (segfault, OOM kill, ...); report its
+            # exit status and let the next job start a fresh process.
+            self.process.join()
+            returncode = self.process.exitcode or -1
+            if not (cancelled or limit) and returncode == -signal.SIGKILL:
+                limit = "killed"
+            if limit:
+                message = f"worker process was {LIMIT_DESCRIPTIONS[limit]}"
+            else:
+                message = f"worker process died with exit status {returncode}"
+            if not cancelled:
+                print(f"✗ Worker {self.process.pid} stopped while rendering {job['label']} "
+                      f"({message}), restarting it")
+            if log_path and not cancelled:
+                with open(log_path, "a") as log_file:
+                    log_file.write(f"\n{message}\n")
+            self.conn.close()
+            self.process = None
+        self.rendered += 1
+
+        return dict(
+            job,
+            returncode=returncode,
+            elapsed=time.monotonic() - start,
+            started_at=started_at,
+            log=log_path,
+            cancelled=cancelled,
+            limit=limit,
+            **extra,
+        )
+
+class WarmWorkerPool:
+    """A fixed set of WarmWorkers shared by the render threads."""
+
+    def __init__(self, size, play=False, output_dir=None, max_scenes=0, limits=None, threads=0):
+        self.workers = [WarmWorker(play, output_dir, max_scenes, limits, job_cpu_set(slot, threads))
+                        for slot in range(size)]
+        self.idle = queue.Queue()
+        for worker in self.workers:
+            # Start every worker up front so the manim imports overlap
+            worker.start()
+            self.idle.put(worker)
+
+    def render(self, job, log_path=None, cancel=None):
+        worker = self.idle.get()
+        try:
+            return worker.render(job, log_path, cancel)
+        finally:
+            self.idle.put(worker)
+
+    def close(self):
+        for worker in self.workers:
+            worker.close()
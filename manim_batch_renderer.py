@@ -1,150 +1,287 @@
 #!/usr/bin/env python3
 import os
 import sys
-import inspect
-import importlib.util
-import subprocess
 import argparse
 
-def find_scene_classes(file_path):
-    """
-    Find all Scene classes in the given Manim Python file.
-    
-    Args:
-        file_path (str): Path to the Manim Python file
-        
-    Returns:
-        list: List of scene class names
-    """
-    # Validate file path
-    if not os.path.isfile(file_path):
-        print(f"Error: File '{file_path}' does not exist")
-        return []
-    
-    if not file_path.endswith('.py'):
-        print(f"Error: File '{file_path}' is not a Python file")
-        return []
-    
-    # Extract file information
-    file_dir = os.path.dirname(os.path.abspath(file_path))
-    file_name = os.path.basename(file_path)
-    module_name = os.path.splitext(file_name)[0]
-    
-    # Import the module
-    try:
-        # Add the directory to sys.path to handle imports within the module
-        sys.path.insert(0, file_dir)
-        
-        # Create a spec from the file path
-        spec = importlib.util.spec_from_file_location(module_name, file_path)
-        module = importlib.util.module_from_spec(spec)
-        # Add the module to sys.modules to handle potential imports within the module
-        sys.modules[module_name] = module
-        # Execute the module
-        spec.loader.exec_module(module)
-        
-        # Remove the directory from sys.path
-        sys.path.pop(0)
-    except Exception as e:
-        print(f"Error importing module: {e}")
-        return []
-    
-    # Find all Scene classes in the module
-    scene_classes = []
-    
-    # Import manim Scene class
-    try:
-        from manim import Scene
-        
-        for name, obj in inspect.getmembers(module):
-            if inspect.isclass(obj) and issubclass(obj, Scene) and obj != Scene:
-                scene_classes.append(name)
-                
-    except ImportError:
-        print("Error: Could not import manim.Scene. Make sure manim is installed.")
-        return []
-    
-    return scene_classes
-
-def render_scenes(file_path, quality="high", play=False, output_dir=None):
-    """
-    Render all Scene classes in the given Manim Python file using the Manim CLI.
-    
-    Args:
-        file_path (str): Path to the Manim Python file
-        quality (str): Quality flag for manim CLI ('l', 'm', 'h', 'p', 'k')
-        play (bool): Whether to play animations after rendering
-        output_dir (str, optional): Directory to save output files
-    """
-    # Map quality options to CLI flags
-    quality_map = {
-        "low": "l",
-        "medium": "m",
-        "high": "h",
-        "production": "p",
-        "4k": "k"
-    }
-    
-    # Convert to CLI flag format
-    quality_flag = quality_map.get(quality, quality)
-    if len(quality_flag) > 1:
-        print(f"Warning: Invalid quality '{quality}', using 'high' quality")
-        quality_flag = "h"
-    
-    # Find all scene classes
-    scene_classes = find_scene_classes(file_path)
-    
-    if not scene_classes:
-        print("No Scene classes found in the file")
-        return
-    
-    # Construct base command
-    base_cmd = ["manim"]
-    if play:
-        base_cmd.append("-p")
-    base_cmd.append(f"-q{quality_flag}")
-    
-    if output_dir:
-        base_cmd.extend(["--output_dir", output_dir])
-    
-    base_cmd.append(file_path)
-    
-    # Render each scene
-    print(f"Found {len(scene_classes)} scene(s) to render:")
-    for i, scene_class in enumerate(scene_classes, 1):
-        print(f"[{i}/{len(scene_classes)}] Rendering {scene_class}...")
-        
-        # Build the command for this scene
-        cmd = base_cmd.copy()
-        cmd.append(scene_class)
-        
-        # Run the command
-        try:
-            subprocess.run(cmd, check=True)
-            print(f"✓ {scene_class} rendered successfully")
-        except subprocess.CalledProcessError as e:
-            print(f"✗ Error rendering {scene_class}: {e}")
-    
-    print("\nRendering complete!")
+from manim_batch.benchmark import DEFAULT_BENCHMARK_TOLERANCE, benchmark_scenes
+from manim_batch.catalog import OutputCatalog, print_catalog_rows
+from manim_batch.discovery import expand_scene_paths, find_scene_classes
+from manim_batch.dry_run import dry_run_scenes
+from manim_batch.farm import farm_worker
+from manim_batch.media import assemble_episodes
+from manim_batch.planning import DEFAULT_STILL_PATTERNS, quality_to_flag
+from manim_batch.processes import ResourceLimits, parse_size
+from manim_batch.profiling import profile_scenes
+from manim_batch.render import render_scenes, tiered_render, watch_scenes
+from manim_batch.segments import DEFAULT_SEGMENT_BUDGET, DEFAULT_SEGMENT_CACHE, SegmentStore
+from manim_batch.state import DEFAULT_STATE_DIR
 
 if __name__ == "__main__":
-    parser = argparse.ArgumentParser(description='Render all Manim scenes in a file using the Manim CLI')
-    parser.add_argument('file_path', help='Path to the Manim Python file')
-    parser.add_argument('--quality', '-q', default='high', 
+    parser = argparse.ArgumentParser(description='Render all Manim scenes in files or directories using the Manim CLI')
+    parser.add_argument('paths', nargs='*', metavar='path',
+                        help='Manim Python files, directories to search recursively, or glob patterns')
+    parser.add_argument('--quality', '-q', default=None,
                         choices=['low', 'medium', 'high', 'production', '4k'],
-                        help='Quality setting for rendering (defaults to high)')
+                        help='Quality setting for rendering (defaults to high, or low with --watch)')
     parser.add_argument('--play', '-p', action='store_true',
                         help='Play the animations after rendering')
     parser.add_argument('--output', '-o', help='Directory to save output files')
+    parser.add_argument('--jobs', '-j', type=int, default=1,
+                        help='Number of scenes to render in parallel (0 = one per CPU core, defaults to 1)')
+    parser.add_argument('--log-dir', help='Directory for per-scene render logs when running parallel jobs')
+    parser.add_argument('--discovery', default='ast', choices=['ast', 'import'],
+                        help='Find scenes by parsing the file (ast, default) or by importing it with manim (import)')
+    parser.add_argument('--list', action='store_true',
+                        help='List the scenes that would be rendered and exit')
+    parser.add_argument('--force', '-f', action='store_true',
+                        help='Re-render every scene, even those whose code and assets are unchanged')
+    parser.add_argument('--backend', default='cli', choices=['cli', 'warm'],
+                        help='cli runs one manim process per scene (default); warm keeps worker '
+                             'processes that import manim once and render scenes in-process')
+    parser.add_argument('--worker-max-scenes', type=int, default=0,
+                        help='With --backend warm, restart a worker after this many scenes (0 = never)')
+    parser.add_argument('--split', type=int, default=0, metavar='N',
+                        help='Render long scenes as up to N chunks of animations in parallel, '
+                             'joined losslessly with ffmpeg (0 = off, defaults to 0)')
+    parser.add_argument('--assemble', action='store_true',
+                        help='Join each file\'s scenes into one episode video with a chapter file, '
+                             'without re-encoding')
+    parser.add_argument('--order', help='Comma-separated scene names giving the episode order for '
+                                        '--assemble (defaults to source order)')
+    parser.add_argument('--watch', '-w', action='store_true',
+                        help='Keep running and re-render scenes whose code or assets change '
+                             '(uses low quality unless --quality is given)')
+    parser.add_argument('--dry-run', action='store_true',
+                        help='Run each scene with animations skipped and report its animations, '
+                             'duration and frame count without rendering anything')
+    parser.add_argument('--still', action='append', default=[], metavar='PATTERN',
+                        help='Render scenes matching this name pattern as a last-frame PNG '
+                             f'(repeatable; {", ".join(DEFAULT_STILL_PATTERNS)} are stills by default)')
+    parser.add_argument('--detect-stills', action='store_true',
+                        help='Also render scenes whose construct() has no play()/wait() as stills '
+                             '(misses scenes that animate through a mixin or helper function)')
+    parser.add_argument('--no-default-stills', action='store_true',
+                        help='Only treat scenes named with --still as stills')
+    parser.add_argument('--still-quality', choices=['low', 'medium', 'high', 'production', '4k'],
+                        help='Quality for stills (defaults to --quality)')
+    parser.add_argument('--events', metavar='FILE',
+                        help='Append a JSON record per scene lifecycle event (queued, started, progress, '
+                             'finished, failed) with timing, CPU, memory and output metrics to FILE')
+    parser.add_argument('--memory-limit', type=parse_size, metavar='SIZE',
+                        help='Kill a render whose memory use goes over SIZE, e.g. 4G (Linux only)')
+    parser.add_argument('--cpu-timeout', type=float, metavar='SECONDS',
+                        help='Kill a render that uses more than SECONDS of CPU time (Linux only)')
+    parser.add_argument('--timeout', type=float, metavar='SECONDS',
+                        help='Kill a render that runs longer than SECONDS of wall-clock time')
+    parser.add_argument('--threads-per-job', type=int, metavar='N',
+                        help='Pin each render to N cores, capping its encoder and numpy threads '
+                             '(defaults to an even share of the cores with --jobs, 0 = no limit)')
+    parser.add_argument('--retries', type=int, default=0,
+                        help='Retry a failed render up to this many times (defaults to 0)')
+    parser.add_argument('--retry-backoff', type=float, default=5.0, metavar='SECONDS',
+                        help='Wait before the first retry, doubled for each further one (defaults to 5)')
+    parser.add_argument('--resume', action='store_true',
+                        help='Continue an interrupted run: skip the scenes and chunks it completed '
+                             'and re-render any output that is missing or corrupt')
+    parser.add_argument('--farm', metavar='QUEUE_DB',
+                        help='Queue the render jobs in this SQLite database for --worker processes, '
+                             'on this host or others sharing the filesystem (not NFS or SMB, whose '
+                             'locking SQLite cannot rely on), and wait for them')
+    parser.add_argument('--worker', metavar='QUEUE_DB',
+                        help='Render jobs from the --farm queue in this database until it stays empty '
+                             '(takes no paths; honours --jobs, --backend and the resource limits)')
+    parser.add_argument('--idle-exit', type=float, default=10.0, metavar='SECONDS',
+                        help='With --worker, exit once the queue has been empty this long '
+                             '(0 = keep waiting, defaults to 10)')
+    parser.add_argument('--segment-cache', nargs='?', const=DEFAULT_SEGMENT_CACHE, metavar='DIR',
+                        help='Reuse animations across scenes, projects and runs through a shared store of '
+                             f'partial movie files (defaults to {DEFAULT_SEGMENT_CACHE} when DIR is omitted)')
+    parser.add_argument('--segment-budget', type=parse_size, default=DEFAULT_SEGMENT_BUDGET, metavar='SIZE',
+                        help='Evict the least recently used segments once the store is larger than SIZE '
+                             '(defaults to 20G)')
+    parser.add_argument('--promote', choices=['low', 'medium', 'high', 'production', '4k'], metavar='QUALITY',
+                        help='Render every scene at --quality (defaults to low) first, then again at '
+                             'QUALITY at lower priority; a scene edited meanwhile drops its stale final render')
+    parser.add_argument('--benchmark', action='store_true',
+                        help='Time a fixed set of representative scenes (or the given file.py::Scene '
+                             'paths) and fail if one regressed past the stored baseline')
+    parser.add_argument('--bench-repeat', type=int, default=3, metavar='N',
+                        help='With --benchmark, render each scene N times and compare medians (defaults to 3)')
+    parser.add_argument('--baseline', metavar='FILE',
+                        help='Benchmark baseline file (defaults to benchmark_baseline.json in --state-dir)')
+    parser.add_argument('--update-baseline', action='store_true',
+                        help='With --benchmark, store the results as the new baseline')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_BENCHMARK_TOLERANCE,
+                        help='With --benchmark, allowed relative slowdown for scenes without their own '
+                             f'tolerance in the baseline (defaults to {DEFAULT_BENCHMARK_TOLERANCE})')
+    parser.add_argument('--profile', action='store_true',
+                        help='Render the scenes with every play() and wait() call timed and print the '
+                             'slowest calls of each scene')
+    parser.add_argument('--profile-top', type=int, default=10, metavar='N',
+                        help='With --profile, calls to print per scene (0 = all, defaults to 10)')
+    parser.add_argument('--cprofile', metavar='DIR',
+                        help='With --profile, also dump cProfile stats per scene into DIR')
+    parser.add_argument('--catalog', nargs='+', metavar='QUERY',
+                        help="Query the catalog of past renders instead of rendering: 'latest SCENE' "
+                             "(or file.py::SCENE, narrowed by --quality), 'hash PREFIX', 'stale', or 'gc' "
+                             "to delete superseded outputs (with --dry-run, only list them)")
+    parser.add_argument('--tex-prepass', action='store_true',
+                        help='Compile the literal MathTex/Tex strings of each file in one LaTeX run '
+                             'before rendering, instead of one run per expression (experimental)')
+    parser.add_argument('--state-dir', default=DEFAULT_STATE_DIR,
+                        help=f'Directory for the render cache and logs (defaults to {DEFAULT_STATE_DIR})')
     
     args = parser.parse_args()
-    render_scenes(args.file_path, args.quality, args.play, args.output)
+    limits = ResourceLimits(args.memory_limit, args.cpu_timeout, args.timeout)
+    segment_store = SegmentStore(args.segment_cache, args.segment_budget) if args.segment_cache else None
+    if args.worker:
+        failed = farm_worker(args.worker, jobs=args.jobs, backend=args.backend,
+                             worker_max_scenes=args.worker_max_scenes, limits=limits,
+                             threads_per_job=args.threads_per_job, idle_exit=args.idle_exit,
+                             segment_store=segment_store, retries=args.retries,
+                             retry_backoff=args.retry_backoff)
+        sys.exit(1 if failed else 0)
+    if args.catalog:
+        catalog = OutputCatalog(os.path.join(args.state_dir, "catalog.db"))
+        query, *query_args = args.catalog
+        if query == 'latest' and len(query_args) == 1:
+            quality = quality_to_flag(args.quality) if args.quality else None
+            print_catalog_rows(catalog.latest(query_args[0], quality))
+        elif query == 'hash' and len(query_args) == 1:
+            print_catalog_rows(catalog.by_hash(query_args[0]))
+        elif query == 'stale' and not query_args:
+            print_catalog_rows(catalog.stale())
+        elif query == 'gc' and not query_args:
+            deleted, freed = catalog.gc(dry_run=args.dry_run)
+            print(f"{'Would free' if args.dry_run else 'Freed'} {freed / 1024 ** 2:.1f} MB in {deleted} file(s)")
+        else:
+            parser.error("--catalog takes 'latest SCENE', 'hash PREFIX', 'stale' or 'gc'")
+        catalog.close()
+        sys.exit(0)
+    if args.benchmark:
+        failed = benchmark_scenes(args.paths or None, args.quality or 'low', args.bench_repeat,
+                                  args.baseline, args.update_baseline, args.tolerance, args.state_dir)
+        sys.exit(1 if failed else 0)
+    if not args.paths:
+        parser.error('at least one path is required')
+
+    if args.list:
+        found = False
+        for file_path in expand_scene_paths(args.paths):
+            for scene_class in find_scene_classes(file_path, args.discovery):
+                print(f"{os.path.relpath(file_path)}::{scene_class}")
+                found = True
+        sys.exit(0 if found else 1)
+
+    if args.no_default_stills:
+        still_patterns = tuple(args.still)
+    else:
+        still_patterns = DEFAULT_STILL_PATTERNS + tuple(args.still)
+
+    if args.dry_run:
+        plans = dry_run_scenes(args.paths, args.quality or 'high', jobs=args.jobs,
+                               discovery=args.discovery, state_dir=args.state_dir)
+        sys.exit(0 if plans and all(r["returncode"] == 0 for r in plans) else 1)
+
+    if args.profile:
+        profiles = profile_scenes(args.paths, args.quality or 'low', jobs=args.jobs, discovery=args.discovery,
+                                  state_dir=args.state_dir, top=args.profile_top, cprofile_dir=args.cprofile)
+        sys.exit(0 if profiles and all(r["returncode"] == 0 for r in profiles) else 1)
+
+    if args.promote:
+        finals = tiered_render(args.paths, args.quality or 'low', args.promote, args.output, jobs=args.jobs,
+                               discovery=args.discovery, state_dir=args.state_dir, backend=args.backend)
+        sys.exit(0 if finals and all(r["returncode"] == 0 for r in finals) else 1)
+
+    if args.watch:
+        watch_scenes(args.paths, args.quality or 'low', args.output, jobs=args.jobs,
+                     discovery=args.discovery, state_dir=args.state_dir, backend=args.backend)
+        sys.exit(0)
+
+    results = render_scenes(args.paths, args.quality or 'high', args.play, args.output,
+                            jobs=args.jobs, log_dir=args.log_dir, discovery=args.discovery,
+                            state_dir=args.state_dir, force=args.force, backend=args.backend,
+                            worker_max_scenes=args.worker_max_scenes, split=args.split,
+                            still_patterns=still_patterns, detect_stills=args.detect_stills,
+                            still_quality=args.still_quality, events=args.events,
+                            limits=limits,
+                            threads_per_job=args.threads_per_job, retries=args.retries,
+                            retry_backoff=args.retry_backoff, resume=args.resume, farm=args.farm,
+                            segment_store=segment_store, tex_prepass=args.tex_prepass)
+    if results and args.assemble:
+        order = [name.strip() for name in args.order.split(",") if name.strip()] if args.order else None
+        assemble_episodes(results, order, args.output)
+    if not results or any(r["returncode"] != 0 for r in results):
+        sys.exit(1)
 
 
 # RUN AS 
 
 # # Basic usage (renders all scenes at high quality)
-# python manim_batch_cli.py your_file.py
+# python manim_batch_renderer.py your_file.py
 
 # # With options
-# python manim_batch_cli.py your_file.py --quality 4k --play
\ No newline at end of file
+# python manim_batch_renderer.py your_file.py --quality 4k --play
+
+# # Render 4 scenes at a time, one log file per scene
+# python manim_batch_renderer.py your_file.py --jobs 4
+
+# # Rebuild the whole channel from one queue, one job per core
+# python manim_batch_renderer.py . --jobs 0
+# python manim_batch_renderer.py "understanding_*/*.py" ml_basics/ --jobs 8
+
+# # Quick previews without paying manim's import for every scene
+# python manim_batch_renderer.py understanding_Positional_Encoding/ -q low --jobs 4 --backend warm
+
+# # Let a single long scene use several cores
+# python manim_batch_renderer.py maths_for_ml/linear_algebra/vectors.py --jobs 8 --split 4
+
+# # Draft cut of an episode, with chapters for the video description
+# python manim_batch_renderer.py ml_basics/kld/kld.py --jobs 4 --assemble
+
+# # Thumbnails and end cards as 4K PNGs, one frame each
+# python manim_batch_renderer.py understanding_self_attention/ --still-quality 4k
+
+# # Unattended overnight run: cap each scene at 6 GB and 20 minutes, retry twice
+# python manim_batch_renderer.py . --jobs 0 --memory-limit 6G --timeout 1200 --retries 2
+
+# # Pick a 4K rebuild back up after the render box rebooted
+# python manim_batch_renderer.py maths_for_ml/linear_algebra/vectors.py -q 4k --force --jobs 8 --split 4
+# python manim_batch_renderer.py maths_for_ml/linear_algebra/vectors.py -q 4k --force --jobs 8 --split 4 --resume
+
+# # Render farm: queue every episode in 4K, then drain the queue from as many hosts as
+# # mount the repository (and the queue) at the same path. The queue needs working
+# # file locks: keep it on a local or cluster filesystem, not on NFS or SMB
+# python manim_batch_renderer.py . -q 4k --split 4 --farm /srv/render/queue.db
+# python manim_batch_renderer.py --worker /srv/render/queue.db --jobs 8 --backend warm
+
+# # Share rendered animations (e.g. the series intro) between scenes, projects and runs
+# python manim_batch_renderer.py . --jobs 8 --segment-cache --segment-budget 50G
+
+# # Review everything at low quality first; 4K finals follow in the background
+# python manim_batch_renderer.py understanding_self_attention/ --promote 4k --jobs 4
+
+# # Did the manim upgrade make rendering slower? Record a baseline first, then compare
+# python manim_batch_renderer.py --benchmark --update-baseline
+# python manim_batch_renderer.py --benchmark
+
+# # Which play() calls make this scene slow? Keep cProfile stats for a flame graph too
+# python manim_batch_renderer.py ml_basics/kld/kld.py --profile --cprofile profiles/
+
+# # Where is the latest 1080p render of a scene, and which renders are out of date?
+# python manim_batch_renderer.py --catalog latest QKVtoAttentionScore2 -q high
+# python manim_batch_renderer.py --catalog stale
+# python manim_batch_renderer.py --catalog gc --dry-run
+
+# # First render after clearing media/: each file's MathTex/Tex compile in one LaTeX run
+# # instead of one per expression
+# python manim_batch_renderer.py understanding_Positional_Encoding/ --jobs 4 --tex-prepass
+
+# # Feed the render box dashboard: one JSON line per queued/started/progress/finished/failed event
+# python manim_batch_renderer.py . --jobs 0 --events /var/log/manim/events.jsonl
+
+# # How long will the episode be, and how many frames will it take? Nothing is rendered
+# python manim_batch_renderer.py ml_basics/kld/kld.py --dry-run --jobs 4
+
+# # Re-render scenes at low quality as you edit them
+# python manim_batch_renderer.py understanding_Positional_Encoding/positional_encoding.py --watch --jobs 2
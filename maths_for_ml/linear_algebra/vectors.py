@@ -1252,6 +1252,7 @@
 #         )
 
 from manim import *
+from text_cache import Text
 import numpy as np
 
 """
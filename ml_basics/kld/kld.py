@@ -1,40 +1,6 @@
 from manim import *
-
-class WobbleTransform(Animation):
-    CONFIG = {
-        "amplitude": 0.2,
-        "wave_freq": 2,
-    }
-    
-    def __init__(self, mobject, **kwargs):
-        super().__init__(mobject, **kwargs)
-        # Store original points for reference
-        self.original_points = {
-            mob: mob.get_points().copy() 
-            for mob in self.mobject.family_members_with_points()
-        }
-
-    def interpolate_mobject(self, alpha):
-        # Use a smooth transition for the wave effect
-        time_var = alpha * 2 * PI
-        
-        for mob in self.mobject.family_members_with_points():
-            original_points = self.original_points[mob]
-            points = mob.get_points()
-            
-            for i in range(len(points)):
-                x, y, z = original_points[i]
-                
-                # Create organic distortion using multiple sine waves
-                dx = self.CONFIG["amplitude"] * np.sin(self.CONFIG["wave_freq"] * y + time_var)
-                dy = self.CONFIG["amplitude"] * np.sin(self.CONFIG["wave_freq"] * x + time_var)
-                
-                # Add secondary wave for more organic feel
-                dx += self.CONFIG["amplitude"] * 0.5 * np.sin(self.CONFIG["wave_freq"] * 2 * y - time_var)
-                dy += self.CONFIG["amplitude"] * 0.5 * np.sin(self.CONFIG["wave_freq"] * 2 * x - time_var)
-                
-                # Apply distortion
-                points[i] = [x + dx, y + dy, z]
+from text_cache import Text
+from warp_fields import Wobble
 
 class TextCrossEntropy(Scene):
     def construct(self):
@@ -287,7 +253,7 @@ class IndependentProbabilityDistributions(Scene):
         wobble_group = VGroup(weather_rect, weather_parts, clothing_rect, clothing_parts)
         
         # Create the wobble effect
-        wobble = WobbleTransform(
+        wobble = Wobble(
             wobble_group,
             run_time=5,
             rate_func=there_and_back_with_pause,  # This will create a nice wobble and hold
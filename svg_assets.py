@@ -0,0 +1,223 @@
+"""
+SVG assets that are parsed once per file content and handed out as copies.
+
+Building an SVGMobject parses the file's XML and converts every path into
+Bézier points, which for a large Excalidraw export costs far more than the
+rest of a short scene. This module parses each SVG once: the resulting
+points and colours are stored in a cache directory keyed by a hash of the
+file's bytes, so later scenes, processes and runs build the mobject
+straight from the cached arrays, and editing the SVG invalidates its entry.
+
+Within a process, load_svg keeps the built (scaled and styled) mobject and
+returns a copy on every call; the batch renderer's warm workers keep this
+module imported from scene to scene, so the registry lasts for the
+worker's lifetime. LazySVG wraps load_svg in a class attribute that loads
+its asset the first time a scene touches it:
+
+    class Diagrams:
+        network = LazySVG("media/excalidraw_exports/complex_nn.svg", scale=3, stroke_width=2)
+
+The disk cache relies on SVGMobject internals, so on a manim release
+outside CACHED_SVG_MANIM_VERSIONS manim parses every SVG as usual; load_svg
+and LazySVG work either way.
+
+The cache directory and budget can be set with the MANIM_SVG_CACHE and
+MANIM_SVG_CACHE_BUDGET (bytes) environment variables.
+"""
+
+import hashlib
+import os
+import threading
+import warnings
+
+import manim
+import numpy as np
+from manim import config
+from manim.utils.images import get_full_vector_image_path
+
+from disk_cache import MANIM_VERSION, DiskCache
+
+DEFAULT_SVG_CACHE = os.path.join(os.path.expanduser("~"), ".cache", "manim_batch", "svgs")
+DEFAULT_SVG_BUDGET = 256 * 1024 ** 2
+
+ARRAYS = ("points", "fill_rgbas", "stroke_rgbas")
+
+# manim releases whose SVGMobject internals SVGMobject.generate_mobject
+# relies on (svg_default, path_string_config and the Cairo colour arrays)
+# it was checked against; on other releases every SVG is parsed by manim
+CACHED_SVG_MANIM_VERSIONS = ("0.18.", "0.19.")
+CACHING = MANIM_VERSION.startswith(CACHED_SVG_MANIM_VERSIONS)
+if not CACHING:
+    warnings.warn(f"svg_assets has not been checked against manim {MANIM_VERSION}, "
+                  f"SVGs are parsed without its disk cache")
+
+
+class SVGCache(DiskCache):
+    """
+    Directory of parsed SVGs, one .npz file per key.
+
+    Each entry holds, for every submobject, its points, fill and stroke
+    colours and stroke width, concatenated across submobjects with a count
+    array per field to split them again. Writes and eviction work as in
+    DiskCache.
+    """
+
+    suffix = ".npz"
+
+    def get(self, key):
+        """
+        Look up the SVG stored under key.
+
+        Returns:
+            list: (points, fill_rgbas, stroke_rgbas, stroke_width) per submobject, or None
+        """
+        parts = self.recall(key)
+        if parts is not None:
+            return parts
+        path = self.path(key)
+        try:
+            with np.load(path) as data:
+                arrays = {name: data[name] for name in data.files}
+            os.utime(path)
+        except (OSError, ValueError, KeyError):
+            return None
+        columns = [
+            np.split(arrays[name], np.cumsum(arrays[name + "_counts"])[:-1])
+            for name in ARRAYS
+        ]
+        parts = list(zip(*columns, arrays["stroke_widths"]))
+        self.remember(key, parts)
+        return parts
+
+    def put(self, key, parts):
+        """Store (points, fill_rgbas, stroke_rgbas, stroke_width) per submobject under key."""
+        arrays = {"stroke_widths": np.array([part[3] for part in parts], dtype=float)}
+        for index, name in enumerate(ARRAYS):
+            arrays[name] = np.concatenate([part[index] for part in parts])
+            arrays[name + "_counts"] = np.array([len(part[index]) for part in parts], dtype=int)
+        self.write(key, lambda f: np.savez(f, **arrays))
+
+
+_cache = None
+_content_hashes = {}
+_loaded = {}
+_lock = threading.Lock()
+
+
+def svg_cache():
+    """The process-wide SVGCache, created on first use."""
+    global _cache
+    if _cache is None:
+        _cache = SVGCache(os.environ.get("MANIM_SVG_CACHE", DEFAULT_SVG_CACHE),
+                          int(os.environ.get("MANIM_SVG_CACHE_BUDGET", DEFAULT_SVG_BUDGET)))
+    return _cache
+
+
+def content_hash(path):
+    """sha256 of the file at path, re-read only when its size or mtime changes."""
+    stat = os.stat(path)
+    stamp = (stat.st_size, stat.st_mtime_ns)
+    cached = _content_hashes.get(path)
+    if cached is None or cached[0] != stamp:
+        with open(path, "rb") as f:
+            cached = (stamp, hashlib.sha256(f.read()).hexdigest())
+        _content_hashes[path] = cached
+    return cached[1]
+
+
+class SVGMobject(manim.SVGMobject):
+    """
+    manim's SVGMobject, with its parsed paths cached by SVGCache.
+
+    manim's own in-process cache is keyed by file name and would hand out
+    stale paths once the file changes under --watch, so it is off by default
+    here; the disk cache is keyed by content instead.
+    """
+
+    def __init__(self, file_name=None, use_svg_cache=False, **kwargs):
+        super().__init__(file_name, use_svg_cache=use_svg_cache, **kwargs)
+
+    def _svg_key(self):
+        return repr((
+            MANIM_VERSION, content_hash(self.get_file_path()),
+            sorted(self.svg_default.items()), sorted(self.path_string_config.items()),
+        ))
+
+    def generate_mobject(self):
+        # The cached arrays are Cairo renderer attributes
+        if config.renderer != "cairo" or not CACHING:
+            return super().generate_mobject()
+        key = self._svg_key()
+        parts = svg_cache().get(key)
+        if parts is not None:
+            for points, fill_rgbas, stroke_rgbas, stroke_width in parts:
+                shape = manim.VMobject()
+                shape.set_points(np.array(points))
+                shape.fill_rgbas = np.array(fill_rgbas)
+                shape.stroke_rgbas = np.array(stroke_rgbas)
+                shape.stroke_width = float(stroke_width)
+                self.add(shape)
+            return
+        super().generate_mobject()
+        svg_cache().put(key, [
+            (shape.points, shape.get_fill_rgbas(), shape.get_stroke_rgbas(), shape.get_stroke_width())
+            for shape in self.submobjects
+        ])
+
+
+def load_svg(file_name, scale=1, **style):
+    """
+    A copy of an SVG asset, built at most once per process.
+
+    Args:
+        file_name: SVG path, resolved like SVGMobject's (cwd, then assets_dir)
+        scale: Factor applied after SVGMobject's default sizing
+        **style: Passed to set_style(), e.g. stroke_width=2, fill_opacity=0.7
+
+    Returns:
+        SVGMobject: A fresh copy the caller may modify freely
+    """
+    path = str(get_full_vector_image_path(file_name))
+    key = (content_hash(path), config.renderer, scale, repr(sorted(style.items())))
+    with _lock:
+        mob = _loaded.get(key)
+        if mob is None:
+            mob = SVGMobject(path).scale(scale)
+            if style:
+                mob.set_style(**style)
+            _loaded[key] = mob
+    return mob.copy()
+
+
+class LazySVG:
+    """
+    Class attribute for an SVG asset that is loaded on first access.
+
+    Each instance gets its own copy from load_svg the first time the
+    attribute is read, and keeps it until forget() is called, so an asset a
+    scene never touches is never parsed or copied.
+    """
+
+    def __init__(self, file_name, scale=1, **style):
+        self.file_name = file_name
+        self.scale = scale
+        self.style = style
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        mob = load_svg(self.file_name, self.scale, **self.style)
+        # Stored on the instance, which shadows this (non-data) descriptor
+        instance.__dict__[self.name] = mob
+        return mob
+
+    @staticmethod
+    def forget(instance):
+        """Drop the instance's loaded assets so the next access gets fresh copies."""
+        for klass in type(instance).__mro__:
+            for name, value in vars(klass).items():
+                if isinstance(value, LazySVG):
+                    instance.__dict__.pop(name, None)
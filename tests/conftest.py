@@ -0,0 +1,74 @@
+import os
+import sys
+
+import pytest
+
+
+@pytest.fixture
+def make_job(tmp_path):
+    """Factory for render jobs as plan_jobs builds them, for a scene file in tmp_path/ep."""
+    def make(**overrides):
+        cwd = str(tmp_path / "ep")
+        job = {
+            "file": os.path.join(cwd, "scenes.py"),
+            "scene": "Intro",
+            "label": "Intro",
+            "module": "scenes",
+            "cwd": cwd,
+            "config_file": None,
+            "quality": "l",
+            "still": False,
+            "fingerprint": "fingerprint",
+            "estimate": {"plays": 1, "waits": 0, "seconds": 1.0},
+            "dependencies": [],
+            "planning": {"quality_flag": "l"},
+            "log": None,
+        }
+        job.update(overrides)
+        return job
+    return make
+
+
+FAKE_MANIM = '''
+import os
+import sys
+import sys
+
+args = sys.argv[1:]
+quality = next(arg for arg in args if arg.startswith("-q"))[2:]
+media_dir = args[args.index("--media_dir") + 1] if "--media_dir" in args else "media"
+name = args[args.index("-o") + 1] if "-o" in args else args[-1]
+module = os.path.splitext(args[-2])[0]
+with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), "calls.log"), "a") as calls:
+    calls.write(" ".join(args) + "\\n")
+if args[-1] in os.environ.get("FAKE_MANIM_FAIL", "").split(","):
+    sys.exit(3)
+if "-s" in args:
+    directory = os.path.join(media_dir, "images", module)
+    output = os.path.join(directory, name + ".png")
+else:
+    directory = os.path.join(media_dir, "videos", module, {"l": "480p15", "h": "1080p60", "k": "2160p60"}[quality])
+    output = os.path.join(directory, name + ".mp4")
+os.makedirs(directory, exist_ok=True)
+with open(output, "wb") as f:
+    f.write(b"rendered")
+'''
+
+
+@pytest.fixture
+def fake_manim(tmp_path, monkeypatch):
+    """
+    Put a stand-in for the manim CLI on PATH that writes an output file where
+    manim would. Returns a function listing the command lines it was run with.
+    """
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    script = bin_dir / "manim"
+    script.write_text(f"#!{sys.executable}\n" + FAKE_MANIM)
+    script.chmod(0o755)
+    monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+
+    def calls():
+        log = bin_dir / "calls.log"
+        return log.read_text().splitlines() if log.exists() else []
+    return calls
@@ -0,0 +1,36 @@
+import json
+import os
+
+from manim_batch.benchmark import BENCHMARK_SCENES, baseline_mismatches, benchmark_scenes
+
+
+def test_benchmark_scenes_exist():
+    for spec in BENCHMARK_SCENES:
+        path, _, scene = spec.partition("::")
+        assert os.path.isfile(path)
+        with open(path, encoding="utf-8") as f:
+            assert f"class {scene}(" in f.read()
+
+
+def test_baseline_mismatches():
+    baseline = {"quality": "l", "manim_version": "0.19.0"}
+    assert baseline_mismatches(baseline, "l", "0.19.0") == []
+    assert baseline_mismatches(baseline, "h", "0.19.0") == ["recorded at quality -ql, this run is -qh"]
+    assert baseline_mismatches(baseline, "l", "0.18.1") == [
+        "recorded with manim 0.19.0, this is manim 0.18.1",
+    ]
+    assert len(baseline_mismatches({}, "l", "0.19.0")) == 2
+
+
+def test_benchmark_scenes_refuses_a_baseline_from_another_quality(tmp_path, capsys):
+    scene_file = tmp_path / "scenes.py"
+    scene_file.write_text("class Intro(Scene):\n    def construct(self):\n        self.wait()\n")
+    baseline = tmp_path / "baseline.json"
+    baseline.write_text(json.dumps({"quality": "h", "manim_version": "0.19.0",
+                                    "scenes": {"scenes.py::Intro": {"metrics": {}}}}))
+
+    failed = benchmark_scenes([f"{scene_file}::Intro"], quality="low", baseline_path=str(baseline),
+                              state_dir=str(tmp_path / "state"))
+
+    assert failed == 1
+    assert "recorded at quality -qh, this run is -ql" in capsys.readouterr().out
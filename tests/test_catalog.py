@@ -0,0 +1,101 @@
+import os
+
+import pytest
+
+from manim_batch.catalog import OutputCatalog
+from manim_batch.planning import plan_jobs
+
+SCENES = """class Intro(Scene):
+    def construct(self):
+        self.play(Create(Circle()))
+
+class Thumbnail(Scene):
+    def construct(self):
+        self.add(Text("Episode 1"))
+"""
+
+
+@pytest.fixture
+def catalog(tmp_path):
+    catalog = OutputCatalog(str(tmp_path / "state" / "catalog.db"))
+    yield catalog
+    catalog.close()
+
+
+def write_output(path, data=b"png"):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(data)
+    return str(path)
+
+
+def test_catalog_keeps_one_render_per_media_dir(catalog, make_job, tmp_path):
+    job = dict(make_job(), elapsed=1.0)
+    for media_dir in ("media", "out"):
+        output = write_output(tmp_path / media_dir / "images" / "scenes" / "Intro.png")
+        catalog.record(job, [output], str(tmp_path / media_dir))
+
+    latest = catalog.latest("Intro")
+    assert sorted(row["media_dir"] for row in latest) == [str(tmp_path / "media"), str(tmp_path / "out")]
+    assert catalog.gc() == (0, 0)
+    assert len(catalog.latest("Intro")) == 2
+
+
+def test_catalog_separates_stills_and_qualities(catalog, make_job, tmp_path):
+    output = write_output(tmp_path / "media" / "Intro.png")
+    for job in (make_job(), make_job(still=True), make_job(quality="k")):
+        catalog.record(dict(job, elapsed=1.0), [output], str(tmp_path / "media"))
+
+    assert len(catalog.latest("Intro")) == 3
+    assert len(catalog.latest("Intro", quality="k")) == 1
+    assert catalog.latest("other.py::Intro") == []
+
+
+def test_catalog_gc_deletes_superseded_outputs(catalog, make_job, tmp_path):
+    job = dict(make_job(), elapsed=1.0)
+    media_dir = str(tmp_path / "media")
+    old = write_output(tmp_path / "media" / "old" / "Intro.png", b"old render")
+    shared = write_output(tmp_path / "media" / "Intro.png")
+    catalog.record(job, [old, shared], media_dir)
+    catalog.record(dict(job, fingerprint="edited"), [shared], media_dir)
+
+    assert catalog.gc(dry_run=True) == (1, len(b"old render"))
+    assert os.path.isfile(old)
+    assert catalog.gc() == (1, len(b"old render"))
+    assert not os.path.exists(old)
+    assert os.path.isfile(shared)
+    assert [row["source_hash"] for row in catalog.latest("Intro")] == ["edited"]
+    assert catalog.gc() == (0, 0)
+
+
+def test_catalog_stale_plans_scenes_with_their_stored_options(catalog, tmp_path):
+    scene_file = tmp_path / "ep" / "scenes.py"
+    scene_file.parent.mkdir()
+    scene_file.write_text(SCENES)
+    media_dir = str(tmp_path / "ep" / "media")
+    # The thumbnail is a still at 4k, so its fingerprint differs from a plain -qh plan
+    jobs = plan_jobs([str(scene_file)], "h", still_quality_flag="k")
+    outputs = {}
+    for job in jobs:
+        outputs[job["scene"]] = write_output(tmp_path / "ep" / "media" / f"{job['scene']}.png")
+        catalog.record(dict(job, elapsed=1.0), [outputs[job["scene"]]], media_dir)
+    assert catalog.latest("Thumbnail")[0]["quality"] == "k"
+
+    assert catalog.stale() == []
+
+    scene_file.write_text(SCENES.replace("Circle()", "Square()"))
+    assert [(row["scene"], row["reason"]) for row in catalog.stale()] == [("Intro", "source changed")]
+
+    scene_file.write_text(SCENES.split("class Thumbnail")[0])
+    os.remove(outputs["Intro"])
+    assert sorted((row["scene"], row["reason"]) for row in catalog.stale()) == [
+        ("Intro", "output missing"), ("Thumbnail", "scene removed"),
+    ]
+
+
+def test_catalog_by_hash(catalog, make_job, tmp_path):
+    output = write_output(tmp_path / "Intro.png")
+    catalog.record(dict(make_job(fingerprint="abc123"), elapsed=1.0), [output], str(tmp_path))
+    assert [row["scene"] for row in catalog.by_hash("abc")] == ["Intro"]
+    assert catalog.by_hash("%") == catalog.by_hash("")
+    assert catalog.by_hash("def") == []
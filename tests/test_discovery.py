@@ -0,0 +1,115 @@
+import textwrap
+
+from manim_batch.discovery import (
+    expand_scene_paths, find_project_root, find_scene_classes, import_search_dirs, parse_scene_classes,
+    project_import_path,
+)
+
+
+def parse(source):
+    return parse_scene_classes(textwrap.dedent(source))
+
+
+def test_parse_scene_classes_in_source_order():
+    assert parse("""
+        from manim import *
+
+        class Outro(Scene):
+            pass
+
+        class Helper:
+            pass
+
+        class Intro(ThreeDScene):
+            pass
+    """) == ["Outro", "Intro"]
+
+
+def test_parse_scene_classes_follows_local_bases_and_mixins():
+    assert parse("""
+        from manim import Scene
+
+        class Late(Base):
+            pass
+
+        class Base(Scene):
+            pass
+
+        class Explaining(NNMediaMixin, Base):
+            pass
+    """) == ["Late", "Base", "Explaining"]
+
+
+def test_parse_scene_classes_resolves_aliases():
+    assert parse("""
+        import manim
+        from manim import MovingCameraScene as Camera
+
+        class A(manim.Scene):
+            pass
+
+        class B(Camera):
+            pass
+    """) == ["A", "B"]
+
+
+def test_parse_scene_classes_lists_redefinitions_once():
+    assert parse("""
+        class A(Scene):
+            pass
+
+        class A(Scene):
+            pass
+    """) == ["A"]
+
+
+def test_find_scene_classes_never_imports_the_file(tmp_path):
+    scene_file = tmp_path / "scenes.py"
+    scene_file.write_text("raise RuntimeError('imported')\n\nclass Intro(Scene):\n    pass\n")
+    assert find_scene_classes(str(scene_file)) == ["Intro"]
+
+
+def test_find_scene_classes_rejects_missing_and_non_python_files(tmp_path):
+    notes = tmp_path / "notes.txt"
+    notes.write_text("class Intro(Scene): pass\n")
+    assert find_scene_classes(str(tmp_path / "missing.py")) == []
+    assert find_scene_classes(str(notes)) == []
+
+
+def test_expand_scene_paths(tmp_path, monkeypatch):
+    for name in ["ep1/scenes.py", "ep1/nn.py", "ep1/notes.md", "ep2/scenes.py",
+                 "ep2/media/videos/gen.py", "ep2/.venv/lib.py", "ep2/__pycache__/x.py"]:
+        (tmp_path / name).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / name).write_text("")
+    monkeypatch.chdir(tmp_path)
+
+    assert expand_scene_paths(["ep2", "ep1/*.py", "ep1/scenes.py"]) == [
+        str(tmp_path / "ep2" / "scenes.py"),
+        str(tmp_path / "ep1" / "nn.py"),
+        str(tmp_path / "ep1" / "scenes.py"),
+    ]
+    assert expand_scene_paths(["ep3/*.py"]) == []
+
+
+def test_find_project_root(tmp_path):
+    (tmp_path / "repo" / "ep" / "scenes").mkdir(parents=True)
+    (tmp_path / "repo" / "pyproject.toml").write_text("")
+    assert find_project_root(str(tmp_path / "repo" / "ep" / "scenes" / "a.py")) == str(tmp_path / "repo")
+    assert find_project_root(str(tmp_path / "repo" / "a.py")) == str(tmp_path / "repo")
+
+
+def test_project_import_path_adds_the_project_root(tmp_path):
+    (tmp_path / "repo" / "ep").mkdir(parents=True)
+    (tmp_path / "repo" / "pyproject.toml").write_text("")
+    repo = str(tmp_path / "repo")
+    assert project_import_path(str(tmp_path / "repo" / "ep" / "a.py")) == [str(tmp_path / "repo" / "ep"), repo]
+    assert project_import_path(str(tmp_path / "repo" / "a.py")) == [repo]
+
+
+def test_import_search_dirs_walk_up_to_the_project_root(tmp_path):
+    (tmp_path / "repo" / "ep" / "scenes").mkdir(parents=True)
+    (tmp_path / "repo" / "pyproject.toml").write_text("")
+    scene_dir = tmp_path / "repo" / "ep" / "scenes"
+    assert import_search_dirs(str(scene_dir / "a.py"), str(scene_dir)) == [
+        str(scene_dir), str(scene_dir), str(tmp_path / "repo" / "ep"), str(tmp_path / "repo"),
+    ]
@@ -0,0 +1,55 @@
+import os
+
+from disk_cache import DiskCache
+
+
+class BytesCache(DiskCache):
+    def get(self, key):
+        try:
+            with open(self.path(key), "rb") as f:
+                value = f.read()
+        except OSError:
+            return None
+        os.utime(self.path(key))
+        return value
+
+    def put(self, key, value):
+        self.write(key, lambda f: f.write(value))
+
+
+def test_entries_round_trip_through_files(tmp_path):
+    cache = BytesCache(str(tmp_path), budget=1000)
+    assert cache.get("a") is None
+    cache.put("a", b"x" * 10)
+    assert cache.get("a") == b"x" * 10
+    assert [name for name in os.listdir(tmp_path) if name.endswith(".tmp")] == []
+
+
+def test_writes_over_the_budget_evict_the_least_recently_used(tmp_path):
+    cache = BytesCache(str(tmp_path), budget=250)
+    for age, key in enumerate("abc"):
+        cache.put(key, b"x" * 100)
+        os.utime(cache.path(key), (age, age))
+    # The least recently used entry goes first, down to EVICTION_TARGET of the budget
+    assert cache.get("a") is None
+    assert cache.get("b") == b"x" * 100
+    assert cache.get("c") == b"x" * 100
+
+
+def test_a_hit_protects_an_entry_from_eviction(tmp_path):
+    cache = BytesCache(str(tmp_path), budget=1000)
+    for age, key in enumerate("ab"):
+        cache.put(key, b"x" * 100)
+        os.utime(cache.path(key), (age, age))
+    cache.get("a")
+    cache.evict(100)
+    assert cache.get("a") == b"x" * 100
+    assert cache.get("b") is None
+
+
+def test_loaded_entries_are_capped(tmp_path):
+    cache = DiskCache(str(tmp_path), budget=1000, max_loaded=2)
+    for key in "abc":
+        cache.remember(key, key.upper())
+    assert cache.recall("a") is None
+    assert cache.recall("c") == "C"
@@ -0,0 +1,18 @@
+from manim_batch.dry_run import apply_dry_run_plans
+from manim_batch.state import cache_key
+
+
+def test_apply_dry_run_plans(make_job):
+    measured = {"fingerprint": "fingerprint", "plays": 40, "waits": 12, "seconds": 95.5}
+    jobs = [
+        make_job(),
+        make_job(fingerprint="edited since"),
+        make_job(quality="k"),
+        make_job(still=True),
+    ]
+    plans = {cache_key(jobs[0]["file"], "Intro"): {"l": measured}}
+
+    apply_dry_run_plans(jobs, plans)
+
+    assert jobs[0]["estimate"] == {"plays": 40, "waits": 12, "seconds": 95.5}
+    assert [job["estimate"]["seconds"] for job in jobs[1:]] == [1.0, 1.0, 1.0]
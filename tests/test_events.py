@@ -0,0 +1,80 @@
+import json
+import time
+
+from manim_batch.events import EventStream
+
+PROGRESS = "Animation 0: Write(Text('Hi')):  50%|#####     | 15/30 [00:01<00:01, 21.9it/s]\r"
+
+
+def read_events(path):
+    with open(path) as f:
+        return [json.loads(line) for line in f]
+
+
+def test_event_stream_records_the_scene_lifecycle_in_order(make_job, tmp_path):
+    path = tmp_path / "events" / "run.jsonl"
+    log = tmp_path / "Intro.log"
+    log.write_text(PROGRESS + PROGRESS.replace("15/30", "30/30"))
+    output = tmp_path / "Intro.mp4"
+    output.write_bytes(b"x" * 100)
+    intro = make_job(expected=12.0)
+    outro = make_job(scene="Outro", label="Outro", expected=3.0)
+
+    events = EventStream(str(path), poll_interval=3600)
+    events.queue(intro)
+    events.queue(outro)
+    events.start(intro, str(log))
+    events.start(outro)
+    events.finish(dict(intro, returncode=0, elapsed=2.0), outputs=[str(output)])
+    events.finish(dict(outro, returncode=1, elapsed=1.0, log="Outro.log"))
+    events.close()
+
+    records = read_events(path)
+    assert [(r["event"], r["scene"], r["queued"], r["running"]) for r in records] == [
+        ("queued", "Intro", 1, 0),
+        ("queued", "Outro", 2, 0),
+        ("started", "Intro", 1, 1),
+        ("started", "Outro", 0, 2),
+        ("finished", "Intro", 0, 1),
+        ("failed", "Outro", 0, 0),
+    ]
+    assert records[0]["expected_seconds"] == 12.0
+    assert records[4]["output_bytes"] == 100
+    # Without ffprobe's count the frames come from the progress bars in the log
+    assert records[4]["frames"] == 30
+    assert records[5]["returncode"] == 1
+    assert records[5]["log"] == "Outro.log"
+    assert set(EventStream.FIELDS) <= set(records[0])
+
+
+def test_event_stream_counts_chunks_as_one_scene(make_job, tmp_path):
+    path = tmp_path / "run.jsonl"
+    events = EventStream(str(path), poll_interval=3600)
+    events.queue(make_job(expected=10.0))
+    events.start(make_job(label="Intro [part 1/2]"))
+    events.start(make_job(label="Intro [part 2/2]"))
+    events.finish(dict(make_job(), returncode=0, elapsed=5.0))
+    events.close()
+
+    assert [(r["event"], r["label"]) for r in read_events(path)] == [
+        ("queued", "Intro"), ("started", "Intro"), ("finished", "Intro"),
+    ]
+
+
+def test_event_stream_reports_progress_from_the_log(make_job, tmp_path):
+    path = tmp_path / "run.jsonl"
+    log = tmp_path / "Intro.log"
+    log.write_text("")
+    job = make_job(expected=10.0)
+
+    events = EventStream(str(path), poll_interval=0.01)
+    events.queue(job)
+    events.start(job, str(log))
+    log.write_text(PROGRESS)
+    deadline = time.monotonic() + 5
+    while time.monotonic() < deadline and "progress" not in path.read_text():
+        time.sleep(0.01)
+    events.close()
+
+    progress = [r for r in read_events(path) if r["event"] == "progress"]
+    assert progress and progress[0]["frames"] == 15
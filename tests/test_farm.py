@@ -0,0 +1,42 @@
+import sqlite3
+import threading
+
+from manim_batch.farm import renew_leases
+from manim_batch.render_queue import RenderQueue
+
+
+def test_renew_leases_survives_a_database_error(make_job, tmp_path, monkeypatch, capsys):
+    render_queue = RenderQueue(str(tmp_path / "queue.db"))
+    render_queue.submit("batch", [make_job(expected=1.0)])
+    job_id, _ = render_queue.lease("worker")
+    held = {job_id: threading.Event()}
+    heartbeat = render_queue.heartbeat
+    calls = []
+
+    def locked_once(worker, job_ids):
+        calls.append(job_ids)
+        if len(calls) == 1:
+            raise sqlite3.OperationalError("database is locked")
+        return heartbeat(worker, job_ids)
+
+    monkeypatch.setattr(render_queue, "heartbeat", locked_once)
+
+    renew_leases(render_queue, "worker", held, threading.Lock())
+    assert "retrying: database is locked" in capsys.readouterr().out
+    assert not held[job_id].is_set()
+
+    renew_leases(render_queue, "worker", held, threading.Lock())
+    assert calls == [[job_id], [job_id]]
+    assert not held[job_id].is_set()
+
+
+def test_renew_leases_cancels_jobs_leased_to_another_worker(make_job, tmp_path):
+    render_queue = RenderQueue(str(tmp_path / "queue.db"), lease_seconds=0)
+    render_queue.submit("batch", [make_job(expected=1.0)])
+    job_id, _ = render_queue.lease("worker")
+    assert render_queue.lease("other")[0] == job_id
+    held = {job_id: threading.Event()}
+
+    renew_leases(render_queue, "worker", held, threading.Lock())
+
+    assert held[job_id].is_set()
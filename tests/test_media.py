@@ -0,0 +1,137 @@
+import os
+
+import pytest
+
+from manim_batch import media
+from manim_batch.media import (
+    assemble_episodes, check_output_integrity, find_scene_outputs, format_timestamp, stitch_chunks,
+)
+
+PNG = b"\x89PNG\r\n\x1a\n" + b"\x00" * 20 + b"\x00\x00\x00\x00IEND\xaeB`\x82"
+
+
+def touch(path, mtime):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(b"")
+    os.utime(path, (mtime, mtime))
+
+
+def test_find_scene_outputs_newest_first(tmp_path):
+    touch(tmp_path / "videos" / "ep" / "480p15" / "Intro.mp4", 100)
+    touch(tmp_path / "videos" / "ep" / "1080p60" / "Intro.mp4", 200)
+    touch(tmp_path / "videos" / "ep" / "480p15" / "Intro.log", 300)
+    touch(tmp_path / "videos" / "ep" / "480p15" / "Outro.mp4", 300)
+    touch(tmp_path / "images" / "ep" / "Intro_ManimCE_v0.19.0.png", 50)
+
+    outputs = find_scene_outputs(str(tmp_path), "ep", "Intro")
+    assert [os.path.relpath(p, tmp_path) for p in outputs] == [
+        os.path.join("videos", "ep", "1080p60", "Intro.mp4"),
+        os.path.join("videos", "ep", "480p15", "Intro.mp4"),
+        os.path.join("images", "ep", "Intro_ManimCE_v0.19.0.png"),
+    ]
+    assert len(find_scene_outputs(str(tmp_path), "ep", "Intro", since=150)) == 1
+
+
+def chunk_results(make_job, tmp_path, count, returncodes=None):
+    results = []
+    for index in range(count):
+        output_name = f"Intro_part{index:02d}"
+        touch(tmp_path / "videos" / "scenes" / "480p15" / f"{output_name}.mp4", 1000 + index)
+        results.append(make_job(
+            label=f"Intro [part {index + 1}/{count}]",
+            chunk={"index": index, "count": count, "output_name": output_name},
+            returncode=returncodes[index] if returncodes else 0,
+            elapsed=2.0,
+            started_at=900.0 + index,
+            log=f"Intro.part{index:02d}.log",
+        ))
+    return results[::-1]
+
+
+def test_stitch_chunks_joins_the_movies_in_order(make_job, tmp_path, monkeypatch):
+    joined = []
+    monkeypatch.setattr(media, "concat_videos", lambda inputs, output: joined.append((inputs, output)) or True)
+
+    result = stitch_chunks(chunk_results(make_job, tmp_path, 3), str(tmp_path))
+
+    movies = tmp_path / "videos" / "scenes" / "480p15"
+    assert joined == [([str(movies / f"Intro_part{i:02d}.mp4") for i in range(3)], str(movies / "Intro.mp4"))]
+    assert not list(movies.glob("Intro_part*"))
+    assert result["returncode"] == 0
+    assert result["label"] == "Intro"
+    assert result["elapsed"] == 6.0
+    assert result["started_at"] == 900.0
+    assert result["chunks"] == 3
+    assert "chunk" not in result
+
+
+def test_stitch_chunks_reports_the_first_failed_chunk(make_job, tmp_path, monkeypatch):
+    monkeypatch.setattr(media, "concat_videos", lambda inputs, output: pytest.fail("joined a failed scene"))
+
+    result = stitch_chunks(chunk_results(make_job, tmp_path, 3, returncodes=[0, 2, 1]), str(tmp_path))
+
+    assert result["returncode"] == 2
+    assert result["log"] == "Intro.part01.log"
+
+
+def test_stitch_chunks_moves_a_single_movie(make_job, tmp_path):
+    result = stitch_chunks(chunk_results(make_job, tmp_path, 1), str(tmp_path))
+
+    movies = tmp_path / "videos" / "scenes" / "480p15"
+    assert result["returncode"] == 0
+    assert [path.name for path in movies.iterdir()] == ["Intro.mp4"]
+
+
+def test_format_timestamp():
+    assert format_timestamp(0) == "0:00"
+    assert format_timestamp(245.9) == "4:05"
+    assert format_timestamp(3723) == "1:02:03"
+
+
+def test_assemble_episodes(make_job, tmp_path, monkeypatch):
+    joined = []
+    monkeypatch.setattr(media, "concat_videos", lambda inputs, output: joined.append((inputs, output)) or True)
+    monkeypatch.setattr(media, "probe_duration", lambda path: 65.0)
+    results = [
+        make_job(scene=scene, label=scene, returncode=returncode, outputs=[f"/media/{scene}.mp4"])
+        for scene, returncode in [("Intro", 0), ("Broken", 1), ("Middle", 0), ("Outro", 0)]
+    ]
+
+    episodes = assemble_episodes(results, order=["Outro", "Intro", "Broken"], output_dir=str(tmp_path))
+
+    episode = tmp_path / "episodes" / "scenes.mp4"
+    assert episodes == [str(episode)]
+    assert joined == [(["/media/Outro.mp4", "/media/Intro.mp4"], str(episode))]
+    assert (tmp_path / "episodes" / "scenes.chapters.txt").read_text() == "0:00 Outro\n1:05 Intro\n"
+
+
+def box(kind, payload=b""):
+    return (8 + len(payload)).to_bytes(4, "big") + kind + payload
+
+
+def without_ffprobe(*args, **kwargs):
+    raise OSError("ffprobe not found")
+
+
+def test_check_output_integrity_of_pngs(tmp_path):
+    png = tmp_path / "Thumbnail.png"
+    png.write_bytes(PNG)
+    assert check_output_integrity(str(png))
+    png.write_bytes(PNG[:-6])
+    assert not check_output_integrity(str(png))
+    png.write_bytes(b"")
+    assert not check_output_integrity(str(png))
+
+
+def test_check_output_integrity_of_movies_without_ffprobe(tmp_path, monkeypatch):
+    monkeypatch.setattr(media.subprocess, "run", without_ffprobe)
+    movie = tmp_path / "Intro.mp4"
+    complete = box(b"ftyp", b"isom") + box(b"mdat", b"\x00" * 64) + box(b"moov", b"\x00" * 16)
+
+    movie.write_bytes(complete)
+    assert check_output_integrity(str(movie))
+    # The writer was cut off before the index
+    movie.write_bytes(complete[:-24])
+    assert not check_output_integrity(str(movie))
+    movie.write_bytes(complete[:-5])
+    assert not check_output_integrity(str(movie))
@@ -0,0 +1,154 @@
+import os
+import textwrap
+
+from manim_batch.planning import (
+    estimate_scene_durations, is_still_scene, plan_jobs, quality_to_flag, record_timing, schedule_jobs,
+    split_jobs,
+)
+from manim_batch.state import cache_key
+
+
+def test_quality_to_flag():
+    assert quality_to_flag("4k") == "k"
+    assert quality_to_flag("low") == "l"
+    assert quality_to_flag("m") == "m"
+    assert quality_to_flag("ultra") == "h"
+
+
+def test_plan_jobs(tmp_path):
+    ep1 = tmp_path / "ep1"
+    ep2 = tmp_path / "ep2"
+    ep1.mkdir()
+    ep2.mkdir()
+    (ep1 / "scenes.py").write_text("class Intro(Scene):\n    pass\n\nclass Outro(Scene):\n    pass\n")
+    (ep1 / "manim.cfg").write_text("[CLI]\n")
+    (ep2 / "helpers.py").write_text("def helper():\n    pass\n")
+    (ep2 / "scenes.py").write_text("class Intro(Scene):\n    pass\n")
+    files = [str(ep1 / "scenes.py"), str(ep2 / "helpers.py"), str(ep2 / "scenes.py")]
+
+    jobs = plan_jobs(files, "l", log_dir=str(tmp_path / "logs"))
+
+    assert [(job["cwd"], job["scene"]) for job in jobs] == [
+        (str(ep1), "Intro"), (str(ep1), "Outro"), (str(ep2), "Intro"),
+    ]
+    assert jobs[0]["config_file"] == str(ep1 / "manim.cfg")
+    assert jobs[2]["config_file"] is None
+    assert jobs[0]["label"] == f"{os.path.relpath(files[0])}::Intro"
+    assert jobs[0]["log"] == str(tmp_path / "logs" / "scenes" / "Intro.log")
+    assert jobs[0]["fingerprint"] != jobs[2]["fingerprint"]
+
+
+def test_plan_jobs_labels_scenes_by_name_for_one_file(tmp_path):
+    (tmp_path / "scenes.py").write_text("class Intro(Scene):\n    pass\n")
+    jobs = plan_jobs([str(tmp_path / "scenes.py")], "l")
+    assert [job["label"] for job in jobs] == ["Intro"]
+    assert jobs[0]["log"] is None
+
+
+def test_estimate_scene_durations(tmp_path):
+    scene_file = tmp_path / "scenes.py"
+    scene_file.write_text(textwrap.dedent("""
+        class Base(Scene):
+            def intro(self):
+                self.play(Write(title), run_time=2)
+
+        class Intro(Base):
+            def construct(self):
+                self.intro()
+                for _ in range(3):
+                    self.play(Create(dot))
+                    self.wait(0.5)
+                for item in items:
+                    self.play(FadeIn(item), run_time=x)
+                self.wait()
+    """))
+
+    estimate = estimate_scene_durations(str(scene_file), ["Intro"])["Intro"]
+    assert estimate == {"plays": 5, "waits": 4, "seconds": 2 + 3 * 1.5 + 1 + 1}
+
+
+def test_record_timing_keeps_recent_history(make_job):
+    timings = {}
+    for elapsed in range(7):
+        record_timing(timings, dict(make_job(), elapsed=float(elapsed)), frames=30)
+    history = timings[cache_key(make_job()["file"], "Intro")]["l"]
+    assert [run["duration"] for run in history] == [2.0, 3.0, 4.0, 5.0, 6.0]
+    assert history[0]["frames"] == 30
+
+
+def test_schedule_jobs_longest_first(make_job):
+    seconds = {"A": 10.0, "B": 2.0, "C": 6.0, "D": 2.0}
+    jobs = [make_job(scene=name, estimate={"plays": 1, "waits": 0, "seconds": s}) for name, s in seconds.items()]
+    # B has renders on record: 3 render seconds per animation second
+    timings = {cache_key(jobs[1]["file"], "B"): {"l": [{"duration": 5.0}, {"duration": 6.0}, {"duration": 7.0}]}}
+
+    scheduled = schedule_jobs(jobs, timings)
+
+    assert [(job["scene"], job["expected"], job["expected_from"]) for job in scheduled] == [
+        ("A", 30.0, "estimate"), ("C", 18.0, "estimate"), ("B", 6.0, "history"), ("D", 6.0, "estimate"),
+    ]
+
+
+def test_split_jobs(make_job):
+    long_scene = make_job(scene="Long", label="Long", estimate={"plays": 20, "waits": 5, "seconds": 30.0}, expected=30.0,
+                          log="logs/scenes/Long.log")
+    short_scene = make_job(scene="Short", label="Short", estimate={"plays": 10, "waits": 0, "seconds": 10.0}, expected=12.0)
+
+    jobs = split_jobs([long_scene, short_scene], max_chunks=4)
+
+    assert [job["label"] for job in jobs] == [
+        "Short", "Long [part 1/3]", "Long [part 2/3]", "Long [part 3/3]",
+    ]
+    chunks = [job["chunk"] for job in jobs[1:]]
+    assert [(c["from"], c["upto"]) for c in chunks] == [(0, 7), (8, 16), (17, None)]
+    assert [c["output_name"] for c in chunks] == ["Long_part00", "Long_part01", "Long_part02"]
+    assert jobs[1]["expected"] == 10.0
+    assert jobs[1]["log"] == "logs/scenes/Long.part00.log"
+    assert "chunk" not in jobs[0]
+
+
+def test_split_jobs_disabled(make_job):
+    jobs = [make_job(estimate={"plays": 100, "waits": 0, "seconds": 100.0}, expected=100.0)]
+    assert split_jobs(jobs, max_chunks=1) == jobs
+
+
+def test_is_still_scene_by_name():
+    animated = {"plays": 3, "waits": 1, "seconds": 4.0}
+    assert is_still_scene("EpisodeThumbnail", animated)
+    assert is_still_scene("ThankYou", animated)
+    assert not is_still_scene("ThankYouAll", animated)
+
+
+def test_is_still_scene_detection_is_opt_in():
+    empty = {"plays": 0, "waits": 0, "seconds": 0.0}
+    assert not is_still_scene("Intro", empty)
+    assert is_still_scene("Intro", empty, detect=True)
+
+
+def test_plan_jobs_keeps_scenes_animated_by_a_mixin_or_helper(tmp_path):
+    scene_file = tmp_path / "scenes.py"
+    scene_file.write_text(textwrap.dedent("""
+        from nn import NNMediaMixin
+
+        def animate_title(scene):
+            scene.play(Write(Text("Attention")))
+
+        class Explaining(NNMediaMixin, Scene):
+            def construct(self):
+                self.show_network()
+
+        class Title(Scene):
+            def construct(self):
+                animate_title(self)
+
+        class Thumbnail(Scene):
+            def construct(self):
+                self.play(Create(Square()))
+    """))
+
+    jobs = plan_jobs([str(scene_file)], "h", still_quality_flag="k")
+
+    assert [(job["scene"], job["still"], job["quality"]) for job in jobs] == [
+        ("Explaining", False, "h"), ("Title", False, "h"), ("Thumbnail", True, "k"),
+    ]
+    assert jobs[2]["estimate"]["plays"] == 0
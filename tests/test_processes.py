@@ -0,0 +1,152 @@
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+from manim_batch import processes
+from manim_batch.processes import (
+    ResourceLimits, build_scene_command, job_cpu_set, parse_size, render_scene, render_with_retries,
+    thread_limit_env,
+)
+
+
+def test_build_scene_command(make_job):
+    assert build_scene_command(make_job()) == ["manim", "-ql", "scenes.py", "Intro"]
+
+
+def test_build_scene_command_with_play_config_and_media_dir(make_job):
+    job = make_job(config_file=os.path.join(make_job()["cwd"], "manim.cfg"))
+    cmd = build_scene_command(job, play=True, output_dir="out")
+    assert cmd == ["manim", "-p", "-ql", "--config_file", "manim.cfg",
+                   "--media_dir", os.path.abspath("out"), "scenes.py", "Intro"]
+
+
+def test_build_scene_command_for_a_chunk(make_job, tmp_path):
+    chunk = {"index": 0, "count": 2, "from": 0, "upto": 7, "output_name": "Intro_part00"}
+    config_file = str(tmp_path / "work" / "manim.cfg")
+    cmd = build_scene_command(make_job(chunk=chunk, config_file=config_file), play=True)
+    assert cmd == ["manim", "-ql", "-n", "0,7", "-o", "Intro_part00",
+                   "--config_file", os.path.join("..", "work", "manim.cfg"), "scenes.py", "Intro"]
+
+    last = dict(chunk, index=1, **{"from": 8, "upto": None, "output_name": "Intro_part01"})
+    assert build_scene_command(make_job(chunk=last))[2:6] == ["-n", "8", "-o", "Intro_part01"]
+
+
+def test_build_scene_command_for_a_still(make_job):
+    cmd = build_scene_command(make_job(scene="Thumbnail", still=True))
+    assert cmd == ["manim", "-ql", "-s", "-o", "Thumbnail", "scenes.py", "Thumbnail"]
+
+
+def test_render_scene_runs_in_the_job_directory(make_job, tmp_path):
+    job = make_job(cwd=str(tmp_path))
+    log = tmp_path / "logs" / "Intro.log"
+    result = render_scene(job, [sys.executable, "-c", "import os; print(os.getcwd())"], str(log))
+
+    assert result["scene"] == "Intro"
+    assert result["returncode"] == 0
+    assert result["log"] == str(log)
+    assert log.read_text().strip() == str(tmp_path)
+
+
+def test_render_scene_puts_the_project_root_on_the_import_path(make_job, tmp_path):
+    (tmp_path / "pyproject.toml").write_text("")
+    (tmp_path / "ep").mkdir()
+    job = make_job(cwd=str(tmp_path / "ep"), file=str(tmp_path / "ep" / "scenes.py"))
+    log = tmp_path / "Intro.log"
+    render_scene(job, [sys.executable, "-c", "import os; print(os.environ['PYTHONPATH'])"], str(log))
+    assert log.read_text().strip().split(os.pathsep)[0] == str(tmp_path)
+
+
+def test_render_scene_reports_the_exit_code(make_job, tmp_path):
+    job = make_job(cwd=str(tmp_path))
+    result = render_scene(job, [sys.executable, "-c", "raise SystemExit(3)"], str(tmp_path / "Intro.log"))
+    assert result["returncode"] == 3
+
+
+def test_render_scene_without_manim(make_job, tmp_path):
+    result = render_scene(make_job(cwd=str(tmp_path)), [str(tmp_path / "no-such-manim")])
+    assert result["returncode"] == -1
+
+
+def test_render_scene_kills_a_render_over_its_wall_time(make_job, tmp_path):
+    log = tmp_path / "Intro.log"
+    result = render_scene(make_job(cwd=str(tmp_path)), [sys.executable, "-c", "import time; time.sleep(30)"],
+                          str(log), limits=ResourceLimits(wall_time=0.2))
+
+    assert result["returncode"] != 0
+    assert result["limit"] == "wall-time"
+    assert result["elapsed"] < 10
+    assert "timed out" in log.read_text()
+
+
+def test_render_scene_pins_cores_and_caps_threads(make_job, tmp_path, monkeypatch):
+    pinned = []
+    monkeypatch.setattr(processes, "limit_to_cpus", lambda pid, cpus: pinned.append(cpus))
+    log = tmp_path / "Intro.log"
+    result = render_scene(make_job(cwd=str(tmp_path)),
+                          [sys.executable, "-c", "import os; print(os.environ['OMP_NUM_THREADS'])"],
+                          str(log), cpus={0, 1})
+
+    assert result["returncode"] == 0
+    assert pinned == [{0, 1}]
+    assert log.read_text().strip() == "2"
+
+
+def test_parse_size():
+    assert parse_size("1500000") == 1500000
+    assert parse_size("512M") == 512 * 1024 ** 2
+    assert parse_size(" 4gb ") == 4 * 1024 ** 3
+    assert parse_size("1.5K") == 1536
+    with pytest.raises(ValueError):
+        parse_size("lots")
+
+
+def test_resource_limits():
+    assert not ResourceLimits()
+    assert ResourceLimits(memory=parse_size("4G"))
+    limits = ResourceLimits(wall_time=10)
+    assert limits.check(pid=0, start=time.monotonic()) is None
+    assert limits.check(pid=0, start=time.monotonic() - 11) == "wall-time"
+
+
+def test_job_cpu_set(monkeypatch):
+    monkeypatch.setattr(os, "sched_getaffinity", lambda pid: {0, 1, 2, 3, 4, 5}, raising=False)
+    assert job_cpu_set(0, 2) == {0, 1}
+    assert job_cpu_set(1, 2) == {2, 3}
+    # Slots past the last group of cores wrap around
+    assert job_cpu_set(3, 2) == {0, 1}
+    assert job_cpu_set(0, 8) == {0, 1, 2, 3, 4, 5}
+    assert job_cpu_set(0, 0) is None
+
+
+def test_thread_limit_env():
+    env = thread_limit_env(2)
+    assert env["OMP_NUM_THREADS"] == "2"
+    assert set(env.values()) == {"2"}
+
+
+def test_render_with_retries(make_job):
+    returncodes = iter([1, -9, 0])
+    result = render_with_retries(make_job(), lambda: {"returncode": next(returncodes), "limit": None},
+                                 retries=3, retry_backoff=0)
+    assert result["returncode"] == 0
+    assert result["attempts"] == 3
+
+
+def test_render_with_retries_gives_up(make_job, capsys):
+    result = render_with_retries(make_job(), lambda: {"returncode": 1, "limit": "memory"},
+                                 retries=1, retry_backoff=0)
+    assert (result["returncode"], result["attempts"]) == (1, 2)
+    assert "Intro failed (over the memory limit), retrying in 0s (attempt 2/2)" in capsys.readouterr().out
+
+
+def test_render_with_retries_stops_when_cancelled(make_job):
+    cancel = threading.Event()
+    cancel.set()
+    attempts = []
+    result = render_with_retries(make_job(), lambda: attempts.append(1) or {"returncode": 1, "limit": None},
+                                 retries=5, retry_backoff=0, cancel=cancel)
+    assert result["attempts"] == 1
+    assert len(attempts) == 1
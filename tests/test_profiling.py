@@ -0,0 +1,42 @@
+import json
+
+from manim_batch import profiling
+from manim_batch.profiling import profile_scenes
+
+
+def call(line, seconds, animations):
+    return {"line": line, "seconds": seconds, "animations": animations, "frames": 15, "family_size": 3,
+            "interpolate_seconds": seconds / 2, "rasterize_seconds": seconds / 4,
+            "encode_seconds": seconds / 4}
+
+
+class FakeWorkerPool:
+    """Stands in for warm workers: every scene 'renders' three calls."""
+
+    def __init__(self, jobs, output_dir=None):
+        pass
+
+    def render(self, job, log_path):
+        calls = [call(4, 0.5, ["Write"]), call(5, 2.0, ["FadeIn", "FadeIn", "Dot.animate"]), call(6, 0.1, [])]
+        return dict(job, returncode=0, calls=calls)
+
+    def close(self):
+        pass
+
+
+def test_profile_scenes_ranks_calls_and_saves_reports(tmp_path, monkeypatch, capsys):
+    monkeypatch.setattr(profiling, "WarmWorkerPool", FakeWorkerPool)
+    scene_file = tmp_path / "scenes.py"
+    scene_file.write_text("class Intro(Scene):\n    def construct(self):\n        self.wait()\n")
+    state_dir = tmp_path / "state"
+
+    results = profile_scenes([str(scene_file)], state_dir=str(state_dir), top=2)
+
+    assert [r["scene"] for r in results] == ["Intro"]
+    with open(state_dir / "profiles" / "scenes" / "Intro.json") as f:
+        report = json.load(f)
+    assert [c["line"] for c in report["calls"]] == [4, 5, 6]
+    out = capsys.readouterr().out
+    assert "Intro: 3 call(s), 2.60s" in out
+    assert out.index("2x FadeIn, Dot.animate") < out.index("Write")
+    assert "... 1 faster call(s) in the report" in out
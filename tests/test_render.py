@@ -0,0 +1,61 @@
+import json
+
+from manim_batch.catalog import OutputCatalog
+from manim_batch.render import tiered_render
+
+
+def write_scenes(tmp_path):
+    episode = tmp_path / "ep"
+    episode.mkdir()
+    (episode / "scenes.py").write_text(
+        "class Intro(Scene):\n    def construct(self):\n        self.wait()\n\n"
+        "class Outro(Scene):\n    def construct(self):\n        self.wait(3)\n"
+    )
+    return str(episode / "scenes.py")
+
+
+def test_tiered_render_previews_every_scene_before_promoting(tmp_path, fake_manim):
+    scene_file = write_scenes(tmp_path)
+    state_dir = str(tmp_path / "state")
+
+    results = tiered_render([scene_file], "low", "4k", state_dir=state_dir, interval=0.05)
+
+    assert [(r["scene"], r["quality"], r["returncode"]) for r in results] == [
+        ("Intro", "k", 0), ("Outro", "k", 0),
+    ]
+    qualities = [call.split()[0] for call in fake_manim()]
+    assert qualities == ["-ql", "-ql", "-qk", "-qk"]
+    # Each tier is cached under its own quality
+    with open(tmp_path / "state" / "render_cache.json") as f:
+        cache = json.load(f)
+    assert sorted(key.split("@")[1].split(":")[0] for key in cache) == ["k", "k", "l", "l"]
+    catalog = OutputCatalog(str(tmp_path / "state" / "catalog.db"))
+    assert sorted(row["quality"] for row in catalog.latest("Intro")) == ["k", "l"]
+    catalog.close()
+
+    assert [r.get("cached") for r in tiered_render([scene_file], "low", "4k", state_dir=state_dir,
+                                                   interval=0.05)] == [True, True]
+    assert len(fake_manim()) == 4
+
+
+def test_tiered_render_promotes_a_cached_preview(tmp_path, fake_manim):
+    scene_file = write_scenes(tmp_path)
+    state_dir = str(tmp_path / "state")
+    tiered_render([scene_file], "low", "low", state_dir=state_dir, interval=0.05)
+    calls = len(fake_manim())
+
+    results = tiered_render([scene_file], "low", "high", state_dir=state_dir, interval=0.05)
+
+    assert [r["returncode"] for r in results] == [0, 0]
+    assert [call.split()[0] for call in fake_manim()[calls:]] == ["-qh", "-qh"]
+
+
+def test_tiered_render_stops_at_a_failed_preview(tmp_path, fake_manim, monkeypatch):
+    monkeypatch.setenv("FAKE_MANIM_FAIL", "Outro")
+    scene_file = write_scenes(tmp_path)
+
+    results = tiered_render([scene_file], "low", "high", state_dir=str(tmp_path / "state"), interval=0.05)
+
+    assert [(r["scene"], r["quality"], r["returncode"]) for r in results] == [
+        ("Intro", "h", 0), ("Outro", "l", 3),
+    ]
@@ -0,0 +1,90 @@
+import time
+
+import pytest
+
+from manim_batch.render_queue import MAX_LEASES, RenderQueue
+
+LEASE = 0.2
+
+
+@pytest.fixture
+def render_queue(make_job, tmp_path):
+    render_queue = RenderQueue(str(tmp_path / "queue.db"), lease_seconds=LEASE)
+    jobs = [make_job(scene=scene, expected=expected)
+            for scene, expected in [("Short", 1.0), ("Long", 9.0), ("Mid", 5.0)]]
+    render_queue.submit("batch", jobs, output_dir=str(tmp_path / "out"))
+    return render_queue
+
+
+def states(render_queue):
+    return {job["scene"]: state for _, state, job, _ in render_queue.poll("batch")}
+
+
+def test_lease_hands_out_longest_first_then_nothing(render_queue, tmp_path):
+    leased = [render_queue.lease("worker") for _ in range(3)]
+    assert [job["scene"] for _, job in leased] == ["Long", "Mid", "Short"]
+    assert render_queue.lease("worker") is None
+    # Paths are absolute for workers on other hosts
+    assert leased[0][1]["output_dir"] == str(tmp_path / "out")
+    assert set(states(render_queue).values()) == {"leased"}
+
+
+def test_complete_records_the_result(render_queue):
+    job_id, _ = render_queue.lease("worker")
+    assert render_queue.complete(job_id, "worker", {"returncode": 0})
+    other_id, _ = render_queue.lease("worker")
+    assert render_queue.complete(other_id, "worker", {"returncode": 1})
+
+    assert states(render_queue) == {"Long": "done", "Mid": "failed", "Short": "queued"}
+    results = {job["scene"]: result for _, _, job, result in render_queue.poll("batch")}
+    assert results["Long"] == {"returncode": 0}
+    assert results["Short"] is None
+
+
+def test_heartbeat_keeps_a_lease(render_queue):
+    job_id, _ = render_queue.lease("worker")
+    for _ in range(3):
+        time.sleep(LEASE / 2)
+        assert render_queue.heartbeat("worker", [job_id]) == {job_id}
+    assert states(render_queue)["Long"] == "leased"
+    assert render_queue.heartbeat("other", [job_id]) == set()
+
+
+def test_expired_lease_is_reissued_and_the_late_result_rejected(render_queue):
+    job_id, _ = render_queue.lease("crashed")
+    time.sleep(LEASE * 1.5)
+
+    reissued_id, job = render_queue.lease("worker")
+    assert (reissued_id, job["scene"]) == (job_id, "Long")
+    assert render_queue.heartbeat("crashed", [job_id]) == set()
+    assert not render_queue.complete(job_id, "crashed", {"returncode": 0})
+    assert render_queue.complete(job_id, "worker", {"returncode": 0})
+    assert states(render_queue)["Long"] == "done"
+
+
+def test_job_fails_after_max_leases(render_queue):
+    for _ in range(MAX_LEASES):
+        job_id, job = render_queue.lease("crashing")
+        assert job["scene"] == "Long"
+        time.sleep(LEASE * 1.5)
+
+    assert states(render_queue)["Long"] == "failed"
+    results = {job["scene"]: result for _, _, job, result in render_queue.poll("batch")}
+    assert results["Long"] == {"returncode": -1, "lease_expired": True}
+    assert render_queue.lease("worker")[1]["scene"] == "Mid"
+
+
+def test_cancel_drops_unfinished_jobs(render_queue):
+    job_id, _ = render_queue.lease("worker")
+    render_queue.complete(job_id, "worker", {"returncode": 0})
+    render_queue.lease("worker")
+    render_queue.cancel("batch")
+
+    assert states(render_queue) == {"Long": "done", "Mid": "cancelled", "Short": "cancelled"}
+    assert render_queue.lease("worker") is None
+
+
+def test_batches_are_polled_separately(render_queue, make_job):
+    render_queue.submit("other", [make_job(scene="Extra", expected=100.0)])
+    assert sorted(states(render_queue)) == ["Long", "Mid", "Short"]
+    assert render_queue.lease("worker")[1]["scene"] == "Extra"
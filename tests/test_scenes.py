@@ -0,0 +1,48 @@
+import pytest
+
+manim = pytest.importorskip("manim")
+np = pytest.importorskip("numpy")
+
+import warp_fields
+
+
+def per_point_wobble(original_points, alpha, amplitude=0.2, wave_freq=2):
+    """WobbleTransform.interpolate_mobject as it was before vectorizing, for one submobject."""
+    time_var = alpha * 2 * np.pi
+    points = np.empty_like(original_points)
+    for i in range(len(original_points)):
+        x, y, z = original_points[i]
+        dx = amplitude * np.sin(wave_freq * y + time_var)
+        dy = amplitude * np.sin(wave_freq * x + time_var)
+        dx += amplitude * 0.5 * np.sin(wave_freq * 2 * y - time_var)
+        dy += amplitude * 0.5 * np.sin(wave_freq * 2 * x - time_var)
+        points[i] = [x + dx, y + dy, z]
+    return points
+
+
+def test_wobble_matches_the_per_point_loop():
+    group = manim.VGroup(manim.Circle(), manim.Square().shift(manim.RIGHT * 2), manim.Text("KL"))
+    originals = [mob.points.copy() for mob in group.family_members_with_points()]
+    wobble = warp_fields.Wobble(group)
+    wobble.begin()
+
+    for alpha in (0.0, 0.3, 0.75, 1.0):
+        wobble.interpolate_mobject(alpha)
+        for mob, original_points in zip(wobble.members, originals):
+            np.testing.assert_allclose(mob.points, per_point_wobble(original_points, alpha),
+                                       rtol=1e-12, atol=1e-12)
+
+
+@pytest.mark.parametrize("field", [warp_fields.ripple, warp_fields.twist, warp_fields.noise_jitter])
+def test_fields_start_and_end_at_rest(field):
+    points = np.random.default_rng(0).uniform(-3, 3, (50, 3))
+    out = np.empty_like(points)
+    for alpha in (0.0, 1.0):
+        field(points, alpha, out)
+        np.testing.assert_allclose(out, points, atol=1e-12)
+
+
+def test_warp_transform_splits_field_and_animation_arguments():
+    ripple = warp_fields.Ripple(manim.Circle(), amplitude=0.3, run_time=2)
+    assert ripple.field_params == {"amplitude": 0.3}
+    assert ripple.run_time == 2
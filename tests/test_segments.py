@@ -0,0 +1,82 @@
+import configparser
+import os
+
+from manim_batch.segments import SegmentStore, job_workspace, private_partial_movies, workspace_result
+
+
+def test_private_partial_movies(make_job, tmp_path):
+    config_file = tmp_path / "manim.cfg"
+    config_file.write_text("[CLI]\nframe_rate = 30\n")
+    job = make_job(config_file=str(config_file))
+
+    with private_partial_movies(job, str(tmp_path / "work")) as private_job:
+        parser = configparser.ConfigParser()
+        parser.read(private_job["config_file"])
+        assert parser.get("CLI", "frame_rate") == "30"
+        assert parser.get("CLI", "partial_movie_dir") == private_job["partial_dir"]
+        assert parser.get("CLI", "max_files_cached") == "-1"
+        assert os.path.isdir(private_job["partial_dir"])
+        work_dir = os.path.dirname(private_job["config_file"])
+
+    assert not os.path.exists(work_dir)
+    assert job["config_file"] == str(config_file)
+
+
+def test_job_workspace_only_isolates_chunks(make_job, tmp_path):
+    job = make_job()
+    with job_workspace(job) as workspace_job:
+        assert workspace_job is job
+
+    chunk = make_job(chunk={"index": 0, "count": 2, "output_name": "Intro_part00"})
+    with job_workspace(chunk, output_dir=str(tmp_path / "out")) as workspace_job:
+        assert workspace_job["partial_dir"].startswith(str(tmp_path / "out" / "partial_chunks"))
+        result = workspace_result(dict(workspace_job, returncode=0), chunk)
+
+    assert result["config_file"] is None
+    assert "partial_dir" not in result
+
+
+def test_segment_store_shares_published_segments(make_job, tmp_path):
+    store = SegmentStore(str(tmp_path / "store"))
+    job = make_job()
+
+    with store.checkout(job) as first:
+        assert os.listdir(first["partial_dir"]) == []
+        with open(os.path.join(first["partial_dir"], "1234_abcd.mp4"), "wb") as f:
+            f.write(b"segment")
+        with open(os.path.join(first["partial_dir"], "partial_movie_file_list.txt"), "w") as f:
+            f.write("file '1234_abcd.mp4'\n")
+        store.publish(first)
+
+    assert os.listdir(store.segment_dir(job)) == ["1234_abcd.mp4"]
+    with store.checkout(make_job(scene="Outro")) as second:
+        assert os.listdir(second["partial_dir"]) == ["1234_abcd.mp4"]
+        store.publish(second)
+    # Other qualities encode different frames
+    with store.checkout(make_job(quality="k")) as other:
+        assert os.listdir(other["partial_dir"]) == []
+
+
+def test_segment_store_groups_by_config(make_job, tmp_path):
+    store = SegmentStore(str(tmp_path / "store"))
+    config_file = tmp_path / "manim.cfg"
+    config_file.write_text("[CLI]\nframe_rate = 30\n")
+    with_config = store.segment_dir(make_job(config_file=str(config_file)))
+    assert with_config != store.segment_dir(make_job())
+    config_file.write_text("[CLI]\nframe_rate = 60\n")
+    assert store.segment_dir(make_job(config_file=str(config_file))) != with_config
+
+
+def test_segment_store_evicts_least_recently_used(make_job, tmp_path):
+    store = SegmentStore(str(tmp_path / "store"), budget=250)
+    segment_dir = store.segment_dir(make_job())
+    os.makedirs(segment_dir)
+    for name, atime in [("old.mp4", 100), ("new.mp4", 300), ("used.mp4", 200)]:
+        path = os.path.join(segment_dir, name)
+        with open(path, "wb") as f:
+            f.write(b"x" * 100)
+        os.utime(path, (atime, atime))
+
+    store.evict()
+
+    assert sorted(os.listdir(segment_dir)) == ["new.mp4", "used.mp4"]
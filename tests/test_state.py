@@ -0,0 +1,190 @@
+import os
+import textwrap
+
+from manim_batch.state import (
+    RenderJournal, cache_entry, cache_key, is_cached, load_state_file, render_cache_key, save_state_file,
+    scene_fingerprints,
+)
+
+PNG = b"\x89PNG\r\n\x1a\n" + b"\x00" * 20 + b"\x00\x00\x00\x00IEND\xaeB`\x82"
+
+SCENES = """
+    from manim import *
+    from helpers import make_title
+
+    def wobble(mob):
+        return mob
+
+    class Intro(Scene):
+        def construct(self):
+            self.add(SVGMobject("logo.svg"), make_title())
+
+    class Outro(Scene):
+        def construct(self):
+            self.add(wobble(Circle()))
+"""
+
+
+def write(path, text):
+    path.write_text(textwrap.dedent(text))
+
+
+def fingerprints(project):
+    return scene_fingerprints(str(project / "scenes.py"), ["Intro", "Outro"], "l", asset_root=str(project))
+
+
+def make_project(tmp_path):
+    write(tmp_path / "scenes.py", SCENES)
+    write(tmp_path / "helpers.py", "from styles import TITLE\n\ndef make_title():\n    return TITLE\n")
+    write(tmp_path / "styles.py", "TITLE = 'Hello'\n")
+    (tmp_path / "logo.svg").write_text("<svg/>")
+    return tmp_path
+
+
+def test_fingerprints_ignore_comment_edits(tmp_path):
+    project = make_project(tmp_path)
+    before = fingerprints(project)
+    write(project / "scenes.py", SCENES.replace("class Intro", "# Episode 1\n    class Intro")
+                                       .replace("(Scene):", "(Scene):  # the scene"))
+    assert fingerprints(project) == before
+
+
+def test_fingerprints_change_with_the_scene_code(tmp_path):
+    project = make_project(tmp_path)
+    before = fingerprints(project)
+    write(project / "scenes.py", SCENES.replace("Circle()", "Square()"))
+    after = fingerprints(project)
+    assert after["Outro"] != before["Outro"]
+    assert after["Intro"] == before["Intro"]
+
+
+def test_fingerprints_change_with_a_local_helper(tmp_path):
+    project = make_project(tmp_path)
+    before = fingerprints(project)
+    write(project / "scenes.py", SCENES.replace("return mob", "return mob.scale(2)"))
+    after = fingerprints(project)
+    assert after["Outro"] != before["Outro"]
+    assert after["Intro"] == before["Intro"]
+
+
+def test_fingerprints_change_with_an_asset(tmp_path):
+    project = make_project(tmp_path)
+    before = fingerprints(project)
+    (project / "logo.svg").write_text("<svg><circle/></svg>")
+    after = fingerprints(project)
+    assert after["Intro"] != before["Intro"]
+    assert after["Outro"] == before["Outro"]
+
+
+def test_fingerprints_follow_transitive_imports(tmp_path):
+    project = make_project(tmp_path)
+    before = fingerprints(project)
+    write(project / "styles.py", "TITLE = 'Goodbye'\n")
+    assert fingerprints(project)["Intro"] != before["Intro"]
+
+
+def test_fingerprints_follow_shared_modules_at_the_project_root(tmp_path):
+    (tmp_path / "pyproject.toml").write_text("")
+    (tmp_path / "ep").mkdir()
+    write(tmp_path / "ep" / "scenes.py", "from manim import *\nfrom warp_fields import Wobble\n\n"
+                                         "class Intro(Scene):\n    def construct(self):\n"
+                                         "        self.play(Wobble(Circle()))\n")
+    write(tmp_path / "warp_fields.py", "def wobble(points):\n    return points\n")
+    scene_file = str(tmp_path / "ep" / "scenes.py")
+    before = scene_fingerprints(scene_file, ["Intro"], "l", str(tmp_path / "ep"))
+    write(tmp_path / "warp_fields.py", "def wobble(points):\n    return points * 2\n")
+    assert scene_fingerprints(scene_file, ["Intro"], "l", str(tmp_path / "ep")) != before
+
+
+def test_fingerprints_report_each_scenes_dependencies(tmp_path):
+    project = make_project(tmp_path)
+    (project / "manim.cfg").write_text("[CLI]\n")
+    dependencies = {}
+    scene_fingerprints(str(project / "scenes.py"), ["Intro", "Outro"], "l", asset_root=str(project),
+                       config_files=[str(project / "manim.cfg")], dependencies=dependencies)
+
+    shared = {str(project / name) for name in ("helpers.py", "styles.py", "manim.cfg")}
+    assert dependencies == {"Intro": shared | {str(project / "logo.svg")}, "Outro": shared}
+
+
+def test_fingerprints_change_with_quality(tmp_path):
+    project = make_project(tmp_path)
+    scene_file = str(project / "scenes.py")
+    assert (scene_fingerprints(scene_file, ["Intro"], "l", str(project))
+            != scene_fingerprints(scene_file, ["Intro"], "k", str(project)))
+
+
+def test_render_cache_key_separates_quality_still_and_media_dir(make_job, tmp_path):
+    job = make_job()
+    keys = {
+        render_cache_key(job),
+        render_cache_key(make_job(quality="k")),
+        render_cache_key(make_job(still=True)),
+        render_cache_key(job, output_dir=str(tmp_path / "out")),
+    }
+    assert len(keys) == 4
+    assert render_cache_key(job).startswith(cache_key(job["file"], job["scene"]) + "@")
+
+
+def test_render_cache_key_defaults_to_media_next_to_the_scene_file(make_job):
+    job = make_job()
+    assert render_cache_key(job) == render_cache_key(job, output_dir=os.path.join(job["cwd"], "media"))
+
+
+def test_is_cached(tmp_path):
+    output = tmp_path / "Intro.mp4"
+    output.write_bytes(b"video")
+    cache = {"key": cache_entry({"fingerprint": "abc", "quality": "l"}, [str(output)])}
+
+    assert is_cached(cache, "key", "abc")
+    assert not is_cached(cache, "key", "changed")
+    assert not is_cached(cache, "other", "abc")
+    assert not is_cached({"key": {"fingerprint": "abc", "outputs": []}}, "key", "abc")
+    output.unlink()
+    assert not is_cached(cache, "key", "abc")
+
+
+def test_state_file_round_trip(tmp_path):
+    path = str(tmp_path / ".manim_batch" / "render_cache.json")
+    assert load_state_file(path) == {}
+    save_state_file(path, {"key": {"fingerprint": "abc"}})
+    assert load_state_file(path) == {"key": {"fingerprint": "abc"}}
+
+
+def test_load_state_file_ignores_a_corrupt_file(tmp_path):
+    path = tmp_path / "render_cache.json"
+    path.write_text("{not json")
+    assert load_state_file(str(path)) == {}
+
+
+def test_render_journal_resume(make_job, tmp_path):
+    path = str(tmp_path / ".manim_batch" / "journal.jsonl")
+    thumbnail = tmp_path / "Thumbnail.png"
+    thumbnail.write_bytes(PNG)
+    job = make_job(scene="Thumbnail")
+    chunk = make_job(chunk={"index": 0, "count": 2, "from": 0, "upto": 7})
+
+    journal = RenderJournal(path)
+    journal.record(dict(job, started_at=1.0, elapsed=2.0), [str(thumbnail)])
+    journal.close()
+    with open(path, "a") as f:
+        f.write('{"job": "cut short by the cr')
+
+    resumed = RenderJournal(path, resume=True)
+    assert resumed.completed(job)["outputs"][0]["size"] == len(PNG)
+    assert resumed.completed(make_job(scene="Thumbnail", fingerprint="edited")) is None
+    assert resumed.completed(make_job(scene="Thumbnail", quality="k")) is None
+    assert resumed.completed(chunk) is None
+    resumed.close()
+
+    thumbnail.write_bytes(PNG[:-1])
+    assert RenderJournal(path, resume=True).completed(job) is None
+    thumbnail.write_bytes(PNG)
+    assert RenderJournal(path).completed(job) is None
+
+
+def test_render_journal_keys_chunks_by_range(make_job):
+    first = make_job(chunk={"index": 0, "count": 2, "from": 0, "upto": 7})
+    last = make_job(chunk={"index": 1, "count": 2, "from": 8, "upto": None})
+    keys = {RenderJournal.job_key(make_job()), RenderJournal.job_key(first), RenderJournal.job_key(last)}
+    assert len(keys) == 3
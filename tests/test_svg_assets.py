@@ -0,0 +1,68 @@
+import pytest
+
+manim = pytest.importorskip("manim")
+np = pytest.importorskip("numpy")
+
+import svg_assets
+from svg_assets import LazySVG, load_svg
+
+pytestmark = pytest.mark.skipif(not svg_assets.CACHING,
+                                reason=f"svg_assets is not enabled on manim {svg_assets.MANIM_VERSION}")
+
+SVG = """<svg xmlns="http://www.w3.org/2000/svg" width="100" height="50">
+  <rect x="0" y="0" width="40" height="40" fill="#ff0000"/>
+  <circle cx="70" cy="20" r="{radius}" fill="#0000ff" stroke="#000000"/>
+</svg>
+"""
+
+
+@pytest.fixture
+def svgs(tmp_path, monkeypatch):
+    cache = svg_assets.SVGCache(str(tmp_path / "svgs"), budget=10 * 1024 ** 2)
+    monkeypatch.setattr(svg_assets, "_cache", cache)
+    monkeypatch.setattr(svg_assets, "_loaded", {})
+    path = tmp_path / "diagram.svg"
+    path.write_text(SVG.format(radius=20))
+    return path
+
+
+def assert_same_shapes(mob, other):
+    assert len(mob.submobjects) == len(other.submobjects)
+    for shape, other_shape in zip(mob.submobjects, other.submobjects):
+        np.testing.assert_allclose(shape.points, other_shape.points)
+        np.testing.assert_allclose(shape.get_fill_rgbas(), other_shape.get_fill_rgbas())
+        np.testing.assert_allclose(shape.get_stroke_rgbas(), other_shape.get_stroke_rgbas())
+
+
+def test_a_cache_hit_matches_a_fresh_svg(svgs):
+    svg_assets.SVGMobject(str(svgs))
+    assert len(svg_assets.svg_cache().scan()[0]) == 1
+    assert_same_shapes(svg_assets.SVGMobject(str(svgs)), manim.SVGMobject(str(svgs), use_svg_cache=False))
+
+
+def test_editing_the_file_misses_the_cache(svgs):
+    before = svg_assets.SVGMobject(str(svgs))
+    svgs.write_text(SVG.format(radius=10))
+    after = svg_assets.SVGMobject(str(svgs))
+    assert len(svg_assets.svg_cache().scan()[0]) == 2
+    assert not np.allclose(before.submobjects[1].points, after.submobjects[1].points)
+
+
+def test_load_svg_hands_out_independent_copies(svgs):
+    first = load_svg(str(svgs), scale=2, stroke_width=2)
+    first.shift(manim.RIGHT)
+    second = load_svg(str(svgs), scale=2, stroke_width=2)
+    assert second is not first
+    assert not np.allclose(second.get_center(), first.get_center())
+
+
+def test_lazy_svgs_load_on_first_access_and_forget(svgs):
+    class Diagrams:
+        diagram = LazySVG(str(svgs), fill_opacity=0.7)
+
+    scene = Diagrams()
+    assert "diagram" not in vars(scene)
+    diagram = scene.diagram
+    assert scene.diagram is diagram
+    LazySVG.forget(scene)
+    assert scene.diagram is not diagram
@@ -0,0 +1,117 @@
+import shutil
+import textwrap
+
+import pytest
+
+from manim_batch import tex
+from manim_batch.tex import collect_tex_calls, precompile_tex, precompile_tex_in_process
+
+SCENES = r"""
+    from manim import *
+
+    class Intro(Scene):
+        def construct(self):
+            title = MathTex(r"H(p, q)", "=", r"-\sum_x p(x) \log q(x)")
+            again = MathTex(r"H(p, q)", "=", r"-\sum_x p(x) \log q(x)")
+            label = Tex("Cross entropy", tex_environment="flushleft")
+            colored = MathTex(r"D_{KL}(p \| q)", tex_to_color_map={"p": BLUE, "q": RED})
+            computed = MathTex(f"x = {1 + 1}")
+            custom = MathTex(r"\alpha", tex_template=TexTemplate())
+"""
+
+
+@pytest.fixture
+def scene_file(tmp_path):
+    path = tmp_path / "scenes.py"
+    path.write_text(textwrap.dedent(SCENES))
+    return path
+
+
+def test_collect_tex_calls_keeps_distinct_literal_calls(scene_file):
+    assert collect_tex_calls(str(scene_file)) == [
+        ["MathTex", [r"H(p, q)", "=", r"-\sum_x p(x) \log q(x)"], {}],
+        ["Tex", ["Cross entropy"], {"tex_environment": "flushleft"}],
+        ["MathTex", [r"D_{KL}(p \| q)"], {"substrings_to_isolate": ["p", "q"]}],
+    ]
+
+
+class FakeWorkerPool:
+    """Stands in for warm workers: records the files it is asked to compile."""
+
+    started = []
+
+    def __init__(self, jobs, output_dir=None):
+        self.jobs = []
+        FakeWorkerPool.started.append(self)
+
+    def render(self, job, log_path):
+        self.jobs.append(job)
+        return dict(job, returncode=0, tex={"found": 4, "compiled": 4, "batch": True})
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def fake_pool(monkeypatch):
+    FakeWorkerPool.started = []
+    monkeypatch.setattr(tex, "WarmWorkerPool", FakeWorkerPool)
+    monkeypatch.setattr(tex.shutil, "which", lambda name: f"/usr/bin/{name}")
+    monkeypatch.setattr(tex, "installed_manim_version", lambda: "0.19.0")
+    return FakeWorkerPool
+
+
+def test_precompile_tex_compiles_each_file_once(make_job, scene_file, fake_pool, capsys):
+    jobs = [make_job(file=str(scene_file)), make_job(file=str(scene_file), scene="Outro", label="Outro")]
+    precompile_tex(jobs, workers=4)
+
+    [pool] = fake_pool.started
+    assert [job["file"] for job in pool.jobs] == [str(scene_file)]
+    assert len(pool.jobs[0]["tex_calls"]) == 3
+    assert "✓ Compiled 4 LaTeX expression(s)" in capsys.readouterr().out
+
+
+def test_precompile_tex_reuses_the_warm_backends_workers(make_job, scene_file, fake_pool):
+    pool = FakeWorkerPool(1)
+    precompile_tex([make_job(file=str(scene_file))], worker_pool=pool)
+    assert fake_pool.started == [pool]
+    assert len(pool.jobs) == 1
+
+
+def test_precompile_tex_starts_nothing_without_tex(make_job, tmp_path, fake_pool):
+    plain = tmp_path / "plain.py"
+    plain.write_text("from manim import *\n\nclass Intro(Scene):\n    pass\n")
+    precompile_tex([make_job(file=str(plain))])
+    assert fake_pool.started == []
+
+
+def test_precompile_tex_skips_unchecked_manim_releases(make_job, scene_file, fake_pool, monkeypatch, capsys):
+    monkeypatch.setattr(tex, "installed_manim_version", lambda: "0.20.0")
+    precompile_tex([make_job(file=str(scene_file))])
+    assert fake_pool.started == []
+    assert "not been checked against manim 0.20.0" in capsys.readouterr().out
+
+
+def svg_files(directory):
+    return {path.name: path.read_bytes() for path in directory.glob("*.svg")}
+
+
+@pytest.mark.skipif(not (shutil.which("latex") and shutil.which("dvisvgm")), reason="needs latex and dvisvgm")
+def test_batched_svgs_are_byte_identical_to_manims_own(make_job, scene_file, tmp_path):
+    manim = pytest.importorskip("manim")
+    if not manim.__version__.startswith(tex.TEX_PREPASS_MANIM_VERSIONS):
+        pytest.skip(f"the LaTeX prepass is not enabled on manim {manim.__version__}")
+    job = make_job(file=str(scene_file), tex_calls=collect_tex_calls(str(scene_file)))
+
+    result = precompile_tex_in_process(job, str(tmp_path / "batched"))
+    assert result["returncode"] == 0
+    assert result["tex"] == {"found": result["tex"]["found"], "compiled": result["tex"]["found"], "batch": True}
+    batched = svg_files(tmp_path / "batched" / "Tex")
+
+    with tex.job_config(job, str(tmp_path / "single")):
+        for name, strings, kwargs in job["tex_calls"]:
+            getattr(manim, name)(*strings, **kwargs)
+    single = svg_files(tmp_path / "single" / "Tex")
+
+    assert len(batched) == result["tex"]["found"]
+    assert batched == {name: single[name] for name in batched}
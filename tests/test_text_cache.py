@@ -0,0 +1,60 @@
+import importlib.util
+import os
+
+import pytest
+
+manim = pytest.importorskip("manim")
+np = pytest.importorskip("numpy")
+
+import disk_cache
+import text_cache
+
+pytestmark = pytest.mark.skipif(text_cache.Text is manim.Text,
+                                reason=f"text_cache is not enabled on manim {disk_cache.MANIM_VERSION}")
+
+
+@pytest.fixture
+def glyphs(tmp_path, monkeypatch):
+    cache = text_cache.GlyphCache(str(tmp_path / "glyphs"))
+    monkeypatch.setattr(text_cache, "_cache", cache)
+    return cache
+
+
+def glyph_points(text):
+    return [glyph.points for glyph in text.submobjects]
+
+
+def test_a_cache_hit_matches_a_fresh_text(glyphs):
+    text_cache.Text("Cross Entropy", font_size=72)
+    assert len(os.listdir(glyphs.root)) == 1
+
+    cached = text_cache.Text("Cross Entropy", font_size=72, color=manim.RED)
+    fresh = manim.Text("Cross Entropy", font_size=72, color=manim.RED)
+    assert len(cached.submobjects) == len(fresh.submobjects)
+    for cached_points, fresh_points in zip(glyph_points(cached), glyph_points(fresh)):
+        np.testing.assert_allclose(cached_points, fresh_points)
+    np.testing.assert_allclose(cached.get_center(), fresh.get_center())
+    assert cached.get_color() == fresh.get_color()
+
+
+@pytest.mark.parametrize("change", [{"font": "Serif"}, {"font_size": 24}])
+def test_typesetting_changes_miss_the_cache(glyphs, change):
+    text_cache.Text("Cross Entropy", font="Sans", font_size=72)
+    text_cache.Text("Cross Entropy", **dict({"font": "Sans", "font_size": 72}, **change))
+    assert len(os.listdir(glyphs.root)) == 2
+
+
+def test_a_manim_upgrade_misses_the_cache(glyphs, monkeypatch):
+    key = text_cache.Text("Cross Entropy")._glyph_key()
+    monkeypatch.setattr(text_cache, "MANIM_VERSION", "0.0.0")
+    assert text_cache.Text("Cross Entropy")._glyph_key() != key
+    assert len(os.listdir(glyphs.root)) == 2
+
+
+def test_unchecked_manim_releases_get_manims_own_text(monkeypatch):
+    monkeypatch.setattr(disk_cache, "MANIM_VERSION", "99.0.0")
+    spec = importlib.util.spec_from_file_location("text_cache_copy", text_cache.__file__)
+    module = importlib.util.module_from_spec(spec)
+    with pytest.warns(UserWarning, match="99.0.0"):
+        spec.loader.exec_module(module)
+    assert module.Text is manim.Text
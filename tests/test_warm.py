@@ -0,0 +1,45 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+from manim_batch.warm import redirect_output, scene_environment
+
+
+def test_redirect_output_captures_child_processes(tmp_path):
+    log = tmp_path / "logs" / "Intro.log"
+    with redirect_output(str(log)):
+        os.write(1, b"from stdout\n")
+        os.write(2, b"from stderr\n")
+        subprocess.run([sys.executable, "-c", "print('from a child')"], check=True)
+    os.write(1, b"back on the terminal\n")
+
+    assert log.read_text().splitlines() == ["from stdout", "from stderr", "from a child"]
+
+
+def test_redirect_output_without_a_log(capfd):
+    with redirect_output(None):
+        print("on the terminal")
+    assert capfd.readouterr().out == "on the terminal\n"
+
+
+def test_shared_modules_stay_imported_until_their_file_changes(make_job, tmp_path):
+    pytest.importorskip("manim")
+    (tmp_path / "pyproject.toml").write_text("")
+    shared = tmp_path / "shared_assets.py"
+    shared.write_text("LOADED = []\n")
+    (tmp_path / "ep").mkdir()
+    scene_file = tmp_path / "ep" / "scenes.py"
+    scene_file.write_text("from manim import *\nfrom shared_assets import LOADED\n\n"
+                          "class Intro(Scene):\n    loaded = LOADED\n")
+    job = make_job(file=str(scene_file), cwd=str(tmp_path / "ep"), dependencies=[str(shared)])
+
+    def scene_loaded():
+        with scene_environment(job) as scene:
+            return scene.loaded
+
+    first = scene_loaded()
+    assert scene_loaded() is first
+    shared.write_text("LOADED = ['edited']\n")
+    assert scene_loaded() == ["edited"]
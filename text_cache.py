@@ -0,0 +1,151 @@
+"""
+A Text that parses each distinct string once, ever.
+
+manim turns every Text into an SVG with Pango and parses that SVG into
+Bézier paths each time a scene is rendered, which is most of the cost of
+building a Text. This module's Text keeps the parsed glyph outlines in a
+cache directory shared by every scene, process and run: a Text whose
+string and typesetting were seen before is built from the cached points
+without calling Pango or parsing anything.
+
+The cache key covers everything that shapes the outlines (string, font,
+size, slant, weight, spacing, per-substring fonts and manim version) but
+neither the colour nor the render quality, so Text("Title", color=BLACK)
+and Text("Title", color=RED) share an entry. Entries are .npy files read
+through memory maps, so parallel renders share them in the page cache.
+Once the directory grows past its budget the least recently used entries
+are deleted.
+
+Scene files import this module's Text right after manim's star import,
+which it replaces. The caching relies on private parts of manim's Text, so
+on a manim release outside CACHED_TEXT_MANIM_VERSIONS Text is manim's own.
+
+The cache directory and budget can be set with the MANIM_GLYPH_CACHE and
+MANIM_GLYPH_CACHE_BUDGET (bytes) environment variables.
+"""
+
+import os
+import tempfile
+import warnings
+
+import manim
+import numpy as np
+from manim import config
+
+from disk_cache import MANIM_VERSION, DiskCache
+
+DEFAULT_GLYPH_CACHE = os.path.join(os.path.expanduser("~"), ".cache", "manim_batch", "glyphs")
+DEFAULT_GLYPH_BUDGET = 256 * 1024 ** 2
+
+# manim releases whose private Text hooks CachedText overrides (_text2svg,
+# _font_size, and generate_mobject running right after _text2svg) it was
+# checked against; other releases get manim's own Text
+CACHED_TEXT_MANIM_VERSIONS = ("0.18.", "0.19.")
+
+
+class GlyphCache(DiskCache):
+    """
+    Directory of parsed glyph outlines, one memory-mapped .npy file per key.
+
+    Each file holds a flat float64 array: the number of submobjects, the
+    number of points of each, then all points. Writes and eviction work as
+    in DiskCache.
+    """
+
+    suffix = ".npy"
+
+    def __init__(self, root=DEFAULT_GLYPH_CACHE, budget=DEFAULT_GLYPH_BUDGET, **kwargs):
+        super().__init__(root, budget, **kwargs)
+
+    def get(self, key):
+        """
+        Look up the outlines stored under key.
+
+        Returns:
+            list: Read-only (n, 3) point arrays, one per submobject, or None
+        """
+        outlines = self.recall(key)
+        if outlines is not None:
+            return outlines
+        path = self.path(key)
+        try:
+            data = np.load(path, mmap_mode="r")
+            os.utime(path)
+        except (OSError, ValueError):
+            return None
+        count = int(data[0])
+        bounds = np.cumsum(np.concatenate([[1 + count], data[1:1 + count]])).astype(int)
+        outlines = [data[start:end].reshape(-1, 3) for start, end in zip(bounds[:-1], bounds[1:])]
+        self.remember(key, outlines)
+        return outlines
+
+    def put(self, key, outlines):
+        """Store one (n, 3) point array per submobject under key."""
+        header = [len(outlines)] + [points.size for points in outlines]
+        data = np.concatenate([np.array(header, dtype=float)] + [np.ravel(points) for points in outlines])
+        self.write(key, lambda f: np.save(f, data))
+
+
+_cache = None
+
+
+def glyph_cache():
+    """The process-wide GlyphCache, created on first use."""
+    global _cache
+    if _cache is None:
+        _cache = GlyphCache(os.environ.get("MANIM_GLYPH_CACHE", DEFAULT_GLYPH_CACHE),
+                            int(os.environ.get("MANIM_GLYPH_CACHE_BUDGET", DEFAULT_GLYPH_BUDGET)))
+    return _cache
+
+
+def _placeholder_svg():
+    # manim post-processes the SVG file it gets back from Pango, so a hit
+    # hands it a harmless empty one instead
+    path = os.path.join(tempfile.gettempdir(), f"text_cache_placeholder_{os.getpid()}.svg")
+    if not os.path.exists(path):
+        with open(path, "w") as f:
+            f.write("<svg></svg>\n")
+    return path
+
+
+class CachedText(manim.Text):
+    """manim's Text, with its glyph outlines cached by GlyphCache."""
+
+    def _glyph_key(self):
+        return repr((
+            MANIM_VERSION, config.renderer,
+            self.text, self.font, self.slant, self.weight, self._font_size, self.line_spacing,
+            sorted(self.t2f.items()), sorted(self.t2s.items()), sorted(self.t2w.items()),
+            self.disable_ligatures,
+        ))
+
+    def _text2svg(self, color):
+        self._glyph_color = color
+        self._glyph_outlines = None
+        # Colours given per substring are baked into the SVG's paths
+        if not (self.t2c or self.t2g or self.gradient):
+            self._glyph_outlines = glyph_cache().get(self._glyph_key())
+        if self._glyph_outlines is not None:
+            return _placeholder_svg()
+        return super()._text2svg(color)
+
+    def generate_mobject(self):
+        if self._glyph_outlines is not None:
+            for points in self._glyph_outlines:
+                glyph = manim.VMobject(fill_color=self._glyph_color, fill_opacity=1.0)
+                glyph.set_points(np.array(points))
+                self.add(glyph)
+            # Keep the memory maps out of copies of this Text
+            self._glyph_outlines = None
+            return
+        super().generate_mobject()
+        if not (self.t2c or self.t2g or self.gradient):
+            glyph_cache().put(self._glyph_key(), [glyph.points for glyph in self.submobjects])
+
+
+if MANIM_VERSION.startswith(CACHED_TEXT_MANIM_VERSIONS):
+    Text = CachedText
+else:
+    warnings.warn(f"text_cache has not been checked against manim {MANIM_VERSION}, "
+                  f"its Text is manim's own, without glyph caching")
+    Text = manim.Text
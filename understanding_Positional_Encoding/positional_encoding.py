@@ -1,4 +1,5 @@
 from manim import *
+from text_cache import Text
 import random 
 
 class YoutubeThumbnailWithoutUnderline(Scene):
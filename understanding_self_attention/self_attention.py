@@ -1,4 +1,5 @@
 from manim import *
+from text_cache import Text
 
 class TextSelfAttention(Scene):
     def construct(self):
@@ -0,0 +1,133 @@
+"""
+Displacement-field animations shared by the scene directories.
+
+A warp field is a function field(points, alpha, out, **params) that writes
+the displaced copy of an (n, 3) array of points into out, for the whole
+array at once. WarpTransform gathers the points of every family member of a
+mobject into one array, runs the field over it once per frame and scatters
+the result back, so warping a VGroup or a large SVG costs a few numpy
+calls per frame instead of Python work per point or per submobject.
+Scenes use the classes at the bottom, e.g. self.play(Ripple(group)).
+"""
+
+import inspect
+
+from manim import *
+
+
+def wobble(points, alpha, out, amplitude=0.2, frequency=2):
+    """Organic wobble: x and y sway with two sine waves along the other axis."""
+    time_var = alpha * 2 * PI
+    # out's z column doubles as scratch space until the end
+    wave = out[:, 2]
+    for axis, other in ((0, 1), (1, 0)):
+        coords = points[:, other]
+        column = out[:, axis]
+
+        np.multiply(coords, frequency, out=wave)
+        wave += time_var
+        np.sin(wave, out=wave)
+        np.multiply(wave, amplitude, out=column)
+
+        # Secondary wave for a more organic feel
+        np.multiply(coords, frequency * 2, out=wave)
+        wave -= time_var
+        np.sin(wave, out=wave)
+        wave *= amplitude * 0.5
+        column += wave
+        column += points[:, axis]
+    out[:, 2] = points[:, 2]
+
+
+def ripple(points, alpha, out, center=ORIGIN, amplitude=0.1, wavelength=1.0, cycles=2):
+    """Circular waves travelling outwards from center, fading in and out."""
+    offsets = points - center
+    radii = np.linalg.norm(offsets[:, :2], axis=1)
+    strength = amplitude * np.sin(PI * alpha)
+    push = strength * np.sin(2 * PI * (radii / wavelength - cycles * alpha))
+    # Points at the center have no outward direction and stay put
+    np.divide(push, radii, out=push, where=radii > 1e-9)
+    push[radii <= 1e-9] = 0
+    np.copyto(out, points)
+    out[:, :2] += offsets[:, :2] * push[:, None]
+
+
+def twist(points, alpha, out, center=ORIGIN, angle=PI / 2, radius=3.0):
+    """Rotate points about center, most near it and not at all beyond radius."""
+    offsets = points - center
+    radii = np.linalg.norm(offsets[:, :2], axis=1)
+    theta = angle * np.sin(PI * alpha) * np.clip(1 - radii / radius, 0, 1)
+    cos, sin = np.cos(theta), np.sin(theta)
+    np.copyto(out, points)
+    out[:, 0] = center[0] + offsets[:, 0] * cos - offsets[:, 1] * sin
+    out[:, 1] = center[1] + offsets[:, 0] * sin + offsets[:, 1] * cos
+
+
+def noise_jitter(points, alpha, out, amplitude=0.05, frequency=6):
+    """Hand-drawn style jitter: each point shakes along its own smooth path."""
+    # A fixed pseudo-random phase per point, derived from its position
+    phase = np.sin(points[:, 0] * 12.9898 + points[:, 1] * 78.233) * 43758.5453
+    strength = amplitude * np.sin(PI * alpha)
+    time_var = 2 * PI * frequency * alpha
+    np.copyto(out, points)
+    out[:, 0] += strength * np.sin(phase + time_var)
+    out[:, 1] += strength * np.cos(phase * 1.618 + time_var)
+
+
+class WarpTransform(Animation):
+    """
+    Animate a mobject and its whole family through a warp field.
+
+    The field's parameters are passed as keyword arguments, e.g.
+    WarpTransform(group, ripple, center=LEFT, run_time=3). Like the
+    WobbleTransform it replaces, the field sees the animation's linear
+    progress and rate_func is ignored, unless use_rate_func=True.
+    """
+
+    def __init__(self, mobject, field, use_rate_func=False, **kwargs):
+        animation_kwargs = {
+            key: kwargs.pop(key) for key in list(kwargs)
+            if key not in inspect.signature(field).parameters
+        }
+        super().__init__(mobject, **animation_kwargs)
+        self.field = field
+        self.field_params = kwargs
+        self.use_rate_func = use_rate_func
+
+    def begin(self):
+        # Gather every family member's points into one array, once per play()
+        self.members = self.mobject.family_members_with_points()
+        self.bounds = np.cumsum([0] + [len(mob.points) for mob in self.members])
+        if self.members:
+            self.original_points = np.concatenate([mob.points for mob in self.members])
+        else:
+            self.original_points = np.zeros((0, 3))
+        self.warped_points = np.empty_like(self.original_points)
+        super().begin()
+
+    def interpolate_mobject(self, alpha):
+        if self.use_rate_func:
+            alpha = self.rate_func(alpha)
+        self.field(self.original_points, alpha, self.warped_points, **self.field_params)
+        for mob, start, end in zip(self.members, self.bounds[:-1], self.bounds[1:]):
+            mob.points[:] = self.warped_points[start:end]
+
+
+class Wobble(WarpTransform):
+    def __init__(self, mobject, **kwargs):
+        super().__init__(mobject, wobble, **kwargs)
+
+
+class Ripple(WarpTransform):
+    def __init__(self, mobject, **kwargs):
+        super().__init__(mobject, ripple, **kwargs)
+
+
+class Twist(WarpTransform):
+    def __init__(self, mobject, **kwargs):
+        super().__init__(mobject, twist, **kwargs)
+
+
+class NoiseJitter(WarpTransform):
+    def __init__(self, mobject, **kwargs):
+        super().__init__(mobject, noise_jitter, **kwargs)